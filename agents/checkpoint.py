@@ -0,0 +1,197 @@
+import copy
+import os
+import pickle
+import random
+import threading
+import time
+
+# Bumped when the contents of a checkpoint change, so older files are rejected instead of half restored
+CHECKPOINT_VERSION = 1
+
+
+class Checkpointer:
+    """
+    Saves training checkpoints every every_episodes episodes and/or every every_seconds seconds, without holding up
+    training. The episode interval counts from the start of training, so it is the same after resuming.
+
+    The agent calls due() after each episode and hands a snapshot (see training_state) to save(), which returns
+    straight away. A background thread pickles the latest snapshot to a temporary file next to filename, flushes it
+    to disk and renames it over filename, so the file always holds a complete checkpoint, even if the process is
+    killed mid-write. If the writer is still busy when a newer snapshot arrives, the older unwritten one is dropped
+    (and counted in skipped).
+
+    Checkpoints are only taken between episodes; the time interval is checked when an episode ends. If writing
+    fails, the next call to save() or close() raises RuntimeError. Use close() (or a with block) to write the last
+    snapshot and stop the thread.
+    """
+
+    def __init__(self, filename, every_episodes=None, every_seconds=None):
+        """
+        :param filename: Checkpoint file; its directory is created if needed.
+        :param every_episodes: Save after every multiple of this many episodes (None or 0: never).
+        :param every_seconds: Save at the end of the first episode this many seconds after the last checkpoint
+            (None or 0: never).
+        """
+        self.filename = filename
+        self.every_episodes = every_episodes
+        self.every_seconds = every_seconds
+        self.saved_episode = None  # Episode of the last snapshot handed to save()
+        self.written = 0
+        self.skipped = 0
+        self.closed = False
+        self._error = None
+        self._pending = None
+        self._stopping = False
+        self._last_time = time.monotonic()
+        self._condition = threading.Condition()
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name='Checkpointer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError(f"Checkpointer failed writing {self.filename}") from self._error
+        if self.closed:
+            raise RuntimeError("Checkpointer is closed")
+
+    def due(self, episode, final=False):
+        """
+        Whether a checkpoint should be taken now that episode episodes have been completed.
+        :param final: Training is over; any episode not yet saved is due.
+        """
+        if episode == self.saved_episode:
+            return False
+        if final:
+            return True
+        if self.every_episodes and episode % self.every_episodes == 0:
+            return True
+        return bool(self.every_seconds) and time.monotonic() - self._last_time >= self.every_seconds
+
+    def save(self, state):
+        """
+        Queue a snapshot for writing. The snapshot must not be modified afterwards.
+        """
+        self._check()
+        with self._condition:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = state
+            self._condition.notify()
+        self.saved_episode = state['episode']
+        self._last_time = time.monotonic()
+
+    def close(self):
+        """
+        Write the snapshot still waiting, if any, and stop the writer thread. Safe to call more than once.
+        """
+        if self.closed:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join()
+        self.closed = True
+        if self._error is not None:
+            raise RuntimeError(f"Checkpointer failed writing {self.filename}") from self._error
+
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopping:
+                    self._condition.wait()
+                state, self._pending = self._pending, None
+            if state is None:
+                break
+            if self._error is not None:
+                continue
+            try:
+                write_checkpoint(state, self.filename)
+                self.written += 1
+            except Exception as error:
+                self._error = error
+
+
+def write_checkpoint(state, filename):
+    """
+    Atomically replace filename with the pickled checkpoint: written to a temporary file, synced to disk and renamed.
+    """
+    temp_filename = f"{filename}.tmp"
+    with open(temp_filename, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_filename, filename)
+
+
+def load_checkpoint(filename):
+    """
+    Load a checkpoint written by write_checkpoint.
+    :raise ValueError: If it was written by an incompatible version.
+    """
+    with open(filename, 'rb') as f:
+        state = pickle.load(f)
+    if not isinstance(state, dict) or state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f"{filename} is not a version {CHECKPOINT_VERSION} training checkpoint")
+    return state
+
+
+def training_state(agent, total_rewards, collected_pellets_all, total_steps):
+    """
+    Snapshot of an agent's training between episodes: a copy of its Q-table, epsilon, the number of completed
+    episodes, the random generators it and its environment draw from, and the training metrics so far. The
+    hyperparameters it was trained with are recorded too, for callers that must not mix runs (see pacmanrl/sweep.py);
+    restoring does not check them, so training can go on with new ones. Agents that learn from more than the Q-table
+    (DynaQ's replay buffer) add it with checkpoint_state() and restore_checkpoint_state(), as the environment does.
+    """
+    env_state = getattr(agent.env, 'checkpoint_state', None)
+    agent_state = getattr(agent, 'checkpoint_state', None)
+    return {
+        'version': CHECKPOINT_VERSION,
+        'algorithm': type(agent).__name__,
+        'state_encoding': agent._state_encoding(),
+        'episode': len(total_rewards),
+        'epsilon': agent.epsilon,
+        'hyperparameters': {'alpha': agent.alpha, 'gamma': agent.gamma, 'epsilon_decay': agent.epsilon_decay,
+                            'min_epsilon': agent.min_epsilon},
+        'q_table': copy.deepcopy(agent.q_table),
+        'random': random.getstate(),
+        'agent': agent_state() if agent_state is not None else None,
+        'env': env_state() if env_state is not None else
+               {'action_space': agent.env.action_space.np_random.bit_generator.state},
+        'metrics': {'total_rewards': list(total_rewards), 'collected_pellets': list(collected_pellets_all),
+                    'total_steps': total_steps},
+    }
+
+
+def restore_training_state(agent, state):
+    """
+    Put an agent and its environment back in the state a training_state() snapshot was taken in.
+    :return: Tuple (episode rewards, collected pellets per episode, total steps) of the episodes already trained.
+    :raise ValueError: If the checkpoint was saved by another algorithm or for another state encoding.
+    """
+    if state['algorithm'] != type(agent).__name__:
+        raise ValueError(f"The checkpoint was saved by {state['algorithm']}, not {type(agent).__name__}")
+    if state['state_encoding'] != agent._state_encoding():
+        raise ValueError(f"The checkpoint was saved for states {state['state_encoding']}, "
+                         f"not {agent._state_encoding()}")
+
+    agent.q_table = state['q_table']
+    agent.epsilon = state['epsilon']
+    random.setstate(state['random'])
+    if state.get('agent') is not None:
+        agent.restore_checkpoint_state(state['agent'])
+    restore_env_state = getattr(agent.env, 'restore_checkpoint_state', None)
+    if restore_env_state is not None:
+        restore_env_state(state['env'])
+    else:
+        agent.env.action_space.np_random.bit_generator.state = state['env']['action_space']
+    metrics = state['metrics']
+    return list(metrics['total_rewards']), list(metrics['collected_pellets']), metrics['total_steps']
@@ -0,0 +1,68 @@
+import random
+import numpy as np
+
+from .q_learning import QLearning
+from .q_table import DenseQTable
+from .replay_buffer import ReplayBuffer
+
+
+class DynaQ(QLearning):
+    """
+    Dyna-Q: Q-learning that also learns from a model of the game. Every real step is stored in a ReplayBuffer, and
+    after each Q-learning update planning_steps transitions are drawn from the buffer and replayed as Q-learning
+    updates, so each (expensive) environment step is learned from many times.
+
+    The planning updates of a step are applied as one vectorized batch (DenseQTable.update_batch): their targets are
+    computed from the Q-values before the batch, and updates to the same pair add up. Needs integer state ids
+    (obs_mode='id'), so that the transitions fit in the buffer's arrays.
+    """
+
+    def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=1.0, epsilon_decay=0.995, min_epsilon=0.1,
+                 planning_steps=10, replay_capacity=100000, seed=None):
+        """
+        :param planning_steps: Planning updates after every real step (K); 0 learns as QLearning.
+        :param replay_capacity: Transitions kept in the replay buffer.
+        :param seed: Seed of the planning draws; by default taken from the random module, so seeding random makes
+            training repeatable.
+        :raise ValueError: If the environment's observations are not integer state ids.
+        """
+        super().__init__(env, alpha=alpha, gamma=gamma, epsilon=epsilon, epsilon_decay=epsilon_decay,
+                         min_epsilon=min_epsilon)
+        if not isinstance(self.q_table, DenseQTable):
+            raise ValueError("DynaQ needs integer state ids as observations (obs_mode='id')")
+        self.planning_steps = planning_steps
+        self.model = ReplayBuffer(replay_capacity)
+        self.planning_rng = np.random.default_rng(random.getrandbits(64) if seed is None else seed)
+
+    def plan(self):
+        """
+        Replay planning_steps transitions drawn from the buffer as one batch of Q-learning updates.
+        """
+        states, actions, rewards, next_states = self.model.sample(self.planning_steps, self.planning_rng)
+        targets = rewards + np.float32(self.gamma) * self.q_table.max_values(next_states)
+        self.q_table.update_batch(states, actions, targets, self.alpha)
+
+    def _learn(self, state_key, action, reward, next_state_key):
+        """
+        The Q-learning update, then the step goes into the buffer and planning_steps transitions are replayed.
+        """
+        super()._learn(state_key, action, reward, next_state_key)
+        self.model.add(state_key, action, reward, next_state_key)
+        if self.planning_steps:
+            self.plan()
+
+    def checkpoint_state(self):
+        """
+        The replay buffer and the planning generator, saved with training checkpoints (see training_state).
+        """
+        return {'model': self.model.get_state(), 'planning_rng': self.planning_rng.bit_generator.state}
+
+    def restore_checkpoint_state(self, state):
+        self.model.set_state(state['model'])
+        self.planning_rng.bit_generator.state = state['planning_rng']
+
+    def save_q_table(self, filename='models/dyna_q_solution.qtable'):
+        super().save_q_table(filename)
+
+    def load_q_table(self, filename='models/dyna_q_solution.qtable'):
+        super().load_q_table(filename)
@@ -0,0 +1,109 @@
+import copy
+from collections import defaultdict
+
+from .q_learning import QLearning
+from .sweep_queue import SweepQueue
+
+
+class PrioritizedSweeping(QLearning):
+    """
+    Prioritized sweeping: Q-learning that spends its planning budget where values are changing, instead of replaying
+    transitions uniformly as DynaQ does.
+
+    The agent learns a model of the game: for every state-action pair taken, the sum of its rewards, how often it
+    was taken and how often it led to each next state, plus the reverse index from each state to the pairs that led
+    to it (its predecessors). The ghosts move at random, so planning uses the expected target under the observed
+    outcomes, R(s, a) + gamma * sum over s' of P(s' | s, a) * max Q(s'), rather than one sampled outcome.
+
+    After every real step's Q-learning update, the predecessors of the state whose value may have changed are
+    queued by the size of their TD error against the model (see SweepQueue). Then up to planning_steps pairs with
+    the largest errors are updated, each queueing its own predecessors in turn, so a reward flows back along the
+    paths that lead to it. Errors below threshold are not queued.
+    """
+
+    def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=1.0, epsilon_decay=0.995, min_epsilon=0.1,
+                 planning_steps=10, threshold=1e-3, queue_size=10000):
+        """
+        :param planning_steps: Queued pairs updated after every real step.
+        :param threshold: Smallest TD error worth queueing.
+        :param queue_size: Pairs the queue keeps, see SweepQueue.
+        """
+        super().__init__(env, alpha=alpha, gamma=gamma, epsilon=epsilon, epsilon_decay=epsilon_decay,
+                         min_epsilon=min_epsilon)
+        self.planning_steps = planning_steps
+        self.threshold = threshold
+        self.queue = SweepQueue(queue_size)
+        self.model = {}  # (s, a) -> [reward sum, times taken, {s': times it followed}]
+        self.predecessors = defaultdict(set)  # s' -> {(s, a) that led to it}
+
+    def observe(self, state_key, action, reward, next_state_key):
+        """
+        Add a real transition to the model.
+        """
+        outcome = self.model.get((state_key, action))
+        if outcome is None:
+            outcome = self.model[(state_key, action)] = [0.0, 0, {}]
+        outcome[0] += reward
+        outcome[1] += 1
+        successors = outcome[2]
+        successors[next_state_key] = successors.get(next_state_key, 0) + 1
+        self.predecessors[next_state_key].add((state_key, action))
+
+    def expected_target(self, state_key, action):
+        """
+        Expected TD target of a pair under the model.
+        """
+        reward_sum, count, successors = self.model[(state_key, action)]
+        max_value = self.q_table.max_value
+        return (reward_sum + self.gamma * sum(n * max_value(s) for s, n in successors.items())) / count
+
+    def queue_predecessors(self, state_key):
+        """
+        Queue the pairs leading to a state whose value changed by their TD error against the model.
+        """
+        value = self.q_table.value
+        for pair in self.predecessors.get(state_key, ()):
+            priority = abs(self.expected_target(*pair) - value(*pair))
+            if priority > self.threshold:
+                self.queue.push(pair, priority)
+
+    def plan(self):
+        """
+        Update up to planning_steps queued pairs, the largest TD errors first, towards their expected targets.
+        """
+        queue = self.queue
+        for _ in range(self.planning_steps):
+            if not queue:
+                break
+            (state_key, action), _ = queue.pop()
+            self.q_table.update(state_key, action, self.expected_target(state_key, action), self.alpha)
+            self.queue_predecessors(state_key)
+
+    def _learn(self, state_key, action, reward, next_state_key):
+        """
+        The Q-learning update, then the step goes into the model, the pairs leading to the updated state are queued
+        and the queue is swept.
+        """
+        super()._learn(state_key, action, reward, next_state_key)
+        self.observe(state_key, action, reward, next_state_key)
+        if self.planning_steps:
+            self.queue_predecessors(state_key)
+            self.plan()
+
+    def checkpoint_state(self):
+        """
+        The model and the queue, saved with training checkpoints (see training_state).
+        """
+        return copy.deepcopy({'model': self.model, 'predecessors': self.predecessors, 'queue': self.queue})
+
+    def restore_checkpoint_state(self, state):
+        state = copy.deepcopy(state)
+        self.model = state['model']
+        self.predecessors = state['predecessors']
+        self.queue = state['queue']
+
+    def save_q_table(self, filename='models/prioritized_sweeping_solution.qtable'):
+        super().save_q_table(filename)
+
+    def load_q_table(self, filename='models/prioritized_sweeping_solution.qtable'):
+        super().load_q_table(filename)
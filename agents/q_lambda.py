@@ -0,0 +1,41 @@
+from .q_learning import QLearning
+from .traces import EligibilityTraces
+
+
+class WatkinsQLambda(QLearning):
+    """
+    Watkins's Q(λ): Q-learning with replacing eligibility traces. Each TD error (towards the greedy value of the
+    next state) updates every state-action pair taken since the last exploratory move, weighted by
+    (gamma * lambda) ** steps since it was taken. The traces are cut when the agent takes a non-greedy action,
+    because the moves before it no longer lead to the greedy policy's return. The traces are sparse (see
+    EligibilityTraces).
+    """
+
+    def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=1.0, epsilon_decay=0.995, min_epsilon=0.1, lam=0.9,
+                 trace_cutoff=0.01):
+        super().__init__(env, alpha=alpha, gamma=gamma, epsilon=epsilon, epsilon_decay=epsilon_decay,
+                         min_epsilon=min_epsilon)
+        self.lam = lam  # Trace decay (lambda)
+        self.trace_cutoff = trace_cutoff  # Traces below this are dropped
+        self.traces = EligibilityTraces(gamma * lam, trace_cutoff)
+
+    def _start_episode(self):
+        self.traces.clear()
+
+    def _learn(self, state_key, action, reward, next_state_key):
+        """
+        The Q(λ) update: the pair's TD error towards the greedy value of the next state, applied to every pair of
+        the trajectory by its trace. The action was chosen just before the step, from the current Q-values, so if
+        it is not greedy the traces of the pairs before it are cut first.
+        """
+        if self.q_table.value(state_key, action) != self.q_table.max_value(state_key):
+            self.traces.clear()
+        delta = reward + self.gamma * self.q_table.max_value(next_state_key) - self.q_table.value(state_key, action)
+        self.traces.visit(state_key, action)
+        self.traces.update(self.q_table, self.alpha * delta)
+
+    def save_q_table(self, filename='models/q_lambda_solution.qtable'):
+        super().save_q_table(filename)
+
+    def load_q_table(self, filename='models/q_lambda_solution.qtable'):
+        super().load_q_table(filename)
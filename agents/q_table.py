@@ -0,0 +1,274 @@
+import json
+import os
+import pickle
+
+import numpy as np
+from gymnasium.spaces import Discrete
+
+# Q-table file format (see write_q_table): magic, header length, JSON header, then the arrays at aligned offsets
+MAGIC = b'PACQTAB\x01'
+ALIGNMENT = 64
+
+
+class DictQTable(dict):
+    """
+    Q-table stored as a dict of dicts ({state_key: {action: value}}). Entries are created lazily, so it works with
+    any hashable state key. This is the fallback for observations that cannot be turned into an integer state id.
+    """
+
+    def best_action(self, state_key):
+        """
+        Return the greedy action for the state, or None if no action has been valued yet.
+        """
+        state_actions = self.get(state_key)
+        if not state_actions:
+            return None
+        return max(state_actions, key=state_actions.get)
+
+    def max_value(self, state_key):
+        """
+        Return the highest value among the state's valued actions (0.0 for a new state). See DenseQTable for how
+        the two backends differ on untried actions.
+        """
+        state_actions = self.setdefault(state_key, {})
+        return max(state_actions.values()) if state_actions else 0.0
+
+    def value(self, state_key, action):
+        """
+        Return the value of a state-action pair, initialising it to 0.0 if needed.
+        """
+        return self.setdefault(state_key, {}).setdefault(action, 0.0)
+
+    def update(self, state_key, action, target, alpha):
+        """
+        Move Q(s, a) towards the TD target: Q(s, a) += alpha * (target - Q(s, a)).
+        """
+        state_actions = self.setdefault(state_key, {})
+        old_value = state_actions.get(action, 0.0)
+        state_actions[action] = old_value + alpha * (target - old_value)
+
+    def add(self, state_key, action, increment):
+        """
+        Q(s, a) += increment.
+        """
+        state_actions = self.setdefault(state_key, {})
+        state_actions[action] = state_actions.get(action, 0.0) + increment
+
+
+class DenseQTable:
+    """
+    Q-table preallocated as a float32 array of shape (n_states, n_actions), indexed by integer state ids (see
+    PacmanEnv.state_id). Lookups and updates are plain array indexing, with no hashing or allocation per step.
+
+    Single-transition methods go through a flat memoryview of the same buffer, because numpy scalar indexing and
+    arithmetic cost more than the dict lookups they replace. The *_batch methods work on whole arrays.
+
+    Unlike DictQTable, which only compares the actions it has values for, every action of a row has a value here:
+    untried actions keep their initial 0.0. Once a state's tried actions are all negative, max_value is 0.0 and
+    best_action picks an untried action, where DictQTable returns the least negative tried one.
+    """
+
+    def __init__(self, n_states, n_actions, values=None):
+        self.n_states = n_states
+        self.n_actions = n_actions
+        self.values = np.zeros((n_states, n_actions), dtype=np.float32) if values is None else values
+        # States that have been updated at least once; the agents explore randomly from unseen states
+        self.seen = np.zeros(n_states, dtype=bool)
+        self._bind_views()
+
+    def _bind_views(self):
+        self._flat = memoryview(self.values).cast('B').cast('f')
+        self._seen = memoryview(self.seen.view(np.uint8))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_flat'], state['_seen']  # memoryviews can't be pickled
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._bind_views()
+
+    def __len__(self):
+        return int(np.count_nonzero(self.seen))
+
+    def __contains__(self, state_key):
+        return bool(self._seen[state_key])
+
+    def best_action(self, state_key):
+        """
+        Return the greedy action for the state, or None if the state has never been updated. Untried actions
+        count as 0.0.
+        """
+        if not self._seen[state_key]:
+            return None
+        row = self._flat[state_key * self.n_actions:(state_key + 1) * self.n_actions].tolist()
+        return row.index(max(row))
+
+    def max_value(self, state_key):
+        """
+        Return the highest action value of the state, untried actions counting as 0.0.
+        """
+        row = state_key * self.n_actions
+        return max(self._flat[row:row + self.n_actions])
+
+    def value(self, state_key, action):
+        """
+        Return the value of a state-action pair.
+        """
+        return self._flat[state_key * self.n_actions + action]
+
+    def update(self, state_key, action, target, alpha):
+        """
+        Move Q(s, a) towards the TD target: Q(s, a) += alpha * (target - Q(s, a)).
+        """
+        i = state_key * self.n_actions + action
+        old_value = self._flat[i]
+        self._flat[i] = old_value + alpha * (target - old_value)
+        self._seen[state_key] = 1
+
+    def add(self, state_key, action, increment):
+        """
+        Q(s, a) += increment.
+        """
+        self._flat[state_key * self.n_actions + action] += increment
+        self._seen[state_key] = 1
+
+    def best_actions(self, state_keys):
+        """
+        Greedy actions for an array of states.
+        """
+        return self.values[state_keys].argmax(axis=1)
+
+    def max_values(self, state_keys):
+        """
+        Highest action values for an array of states.
+        """
+        return self.values[state_keys].max(axis=1)
+
+    def update_batch(self, state_keys, actions, targets, alpha):
+        """
+        Apply a batch of TD updates at once. Repeated state-action pairs in the batch have their increments
+        summed, as with several sequential updates computed from the same starting values.
+        """
+        errors = np.asarray(targets, dtype=np.float32) - self.values[state_keys, actions]
+        np.add.at(self.values, (state_keys, actions), np.float32(alpha) * errors)
+        self.seen[state_keys] = True
+
+
+def make_q_table(env):
+    """
+    Pick the Q-table backend for an environment: a DenseQTable when observations are integer state ids
+    (Discrete observation space), otherwise a DictQTable.
+    """
+    if isinstance(env.observation_space, Discrete) and isinstance(env.action_space, Discrete):
+        return DenseQTable(int(env.observation_space.n), int(env.action_space.n))
+    return DictQTable()
+
+
+def as_q_table(table):
+    """
+    Wrap Q-tables loaded from older pickles (plain dicts) in a DictQTable.
+    """
+    if isinstance(table, (DictQTable, DenseQTable)):
+        return table
+    return DictQTable(table)
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_q_table(table, filename, state_encoding=None):
+    """
+    Save a Q-table. A DenseQTable is written in the compact Q-table format, which read_q_table can memory-map:
+
+    - MAGIC (8 bytes) and the length of the header (uint32, little endian)
+    - a JSON header with n_states, n_actions, n_seen, the byte offsets of the arrays and the state encoding
+    - the values, float32 (n_states, n_actions) in C order, row i holding state id i
+    - the ids of the states that have been updated at least once, int64 (n_seen,)
+
+    Both arrays start at 64-byte boundaries. A DictQTable (observations that are not integer state ids) is pickled.
+    The file is written next to its destination and renamed into place, so processes that have the old file
+    mapped never see a partial write.
+    :param state_encoding: Optional description of the state ids (see PacmanEnv.state_encoding), stored in the
+        header and checked when the table is loaded for an environment.
+    """
+    temp_filename = f"{filename}.tmp"
+    if not isinstance(table, DenseQTable):
+        with open(temp_filename, 'wb') as f:
+            pickle.dump(table, f)
+        os.replace(temp_filename, filename)
+        return
+
+    seen_ids = np.flatnonzero(table.seen).astype('<i8')
+    values = np.ascontiguousarray(table.values, dtype='<f4')
+    header = {'version': 1, 'n_states': table.n_states, 'n_actions': table.n_actions, 'n_seen': len(seen_ids),
+              'state_encoding': state_encoding}
+    # The offsets depend on the header length, which depends on the offsets; reserve room for them first
+    header.update(values_offset=0, ids_offset=0)
+    header_size = len(MAGIC) + 4 + len(json.dumps(header)) + 40  # Two offsets of up to 20 digits
+    header['values_offset'] = _aligned(header_size)
+    header['ids_offset'] = _aligned(header['values_offset'] + values.nbytes)
+    header_bytes = json.dumps(header).encode()
+
+    with open(temp_filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint32(len(header_bytes)).astype('<u4').tobytes())
+        f.write(header_bytes)
+        f.write(b'\0' * (header['values_offset'] - f.tell()))
+        f.write(values.tobytes())
+        f.write(b'\0' * (header['ids_offset'] - f.tell()))
+        f.write(seen_ids.tobytes())
+    os.replace(temp_filename, filename)
+
+
+def read_q_table_header(filename):
+    """
+    Read the JSON header of a file in the Q-table format, or return None for other files (pickles).
+    """
+    with open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return None
+        header_length = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+        return json.loads(f.read(header_length))
+
+
+def read_q_table(filename, mmap_mode='c', state_encoding=None):
+    """
+    Load a Q-table saved by write_q_table, or a pickled one from older versions.
+
+    Files in the Q-table format are memory-mapped: loading costs the same for any table size, pages are read when
+    they are first used, and processes that map the same file share them. With the default copy-on-write mode,
+    updates stay private to the process and never reach the file.
+    :param mmap_mode: np.memmap mode for the values ('c', 'r' or 'r+'), or None to read them into memory.
+    :param state_encoding: If given, the state encoding the table must have been saved with. Pickles carry no
+        encoding, so they are only accepted if their states are integer ids.
+    :raise ValueError: If the table was saved for a different state encoding, or is a pickle keyed by observations
+        (as older versions saved them) while state ids are expected.
+    """
+    header = read_q_table_header(filename)
+    if header is None:
+        with open(filename, 'rb') as f:
+            table = as_q_table(pickle.load(f))
+        if state_encoding is not None and isinstance(table, DictQTable) and \
+                not all(isinstance(state_key, (int, np.integer)) for state_key in table):
+            raise ValueError(f"{filename} is keyed by observations, not by state ids: load it with obs_mode='image'")
+        return table
+
+    if state_encoding is not None and header['state_encoding'] not in (None, state_encoding):
+        raise ValueError(f"{filename} was saved for states {header['state_encoding']}, not {state_encoding}")
+
+    shape = (header['n_states'], header['n_actions'])
+    if mmap_mode is None:
+        with open(filename, 'rb') as f:
+            f.seek(header['values_offset'])
+            values = np.fromfile(f, dtype='<f4', count=shape[0] * shape[1]).reshape(shape)
+    else:
+        values = np.memmap(filename, dtype='<f4', mode=mmap_mode, offset=header['values_offset'], shape=shape)
+    table = DenseQTable(*shape, values=values)
+    if header['n_seen']:
+        seen_ids = np.memmap(filename, dtype='<i8', mode='r', offset=header['ids_offset'],
+                             shape=(header['n_seen'],))
+        table.seen[seen_ids] = True
+    return table
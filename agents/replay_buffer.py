@@ -0,0 +1,70 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring buffer of transitions (s, a, r, s') in preallocated NumPy arrays, used by DynaQ as its model
+    of the environment.
+
+    Once full, each new transition overwrites the oldest. Drawing stored transitions uniformly samples the (s, a)
+    pairs in proportion to how often they were recently taken, and each outcome (r, s') from the distribution
+    actually observed for its pair. The ghosts move at random, so a table with only the last outcome per pair would
+    plan as if the game were deterministic.
+    """
+
+    def __init__(self, capacity):
+        """
+        :param capacity: Most transitions kept.
+        """
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int32)
+        self.actions = np.zeros(capacity, dtype=np.int32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.int32)
+        self.size = 0  # Transitions stored
+        self.position = 0  # Where the next transition goes
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state):
+        """
+        Store a transition, overwriting the oldest once the buffer is full.
+        """
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.position = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def sample(self, n, rng):
+        """
+        Draw n stored transitions uniformly, with replacement.
+        :param rng: np.random.Generator to draw from.
+        :return: Arrays (states, actions, rewards, next states) of length n.
+        """
+        i = rng.integers(self.size, size=n)
+        return self.states[i], self.actions[i], self.rewards[i], self.next_states[i]
+
+    def get_state(self):
+        """
+        Copy of the stored transitions, for checkpoints (see set_state).
+        """
+        return {'capacity': self.capacity, 'size': self.size, 'position': self.position,
+                'states': self.states.copy(), 'actions': self.actions.copy(), 'rewards': self.rewards.copy(),
+                'next_states': self.next_states.copy()}
+
+    def set_state(self, state):
+        """
+        Restore transitions saved by get_state.
+        """
+        self.capacity = state['capacity']
+        self.size = state['size']
+        self.position = state['position']
+        self.states = state['states'].copy()
+        self.actions = state['actions'].copy()
+        self.rewards = state['rewards'].copy()
+        self.next_states = state['next_states'].copy()
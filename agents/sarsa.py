@@ -1,7 +1,10 @@
-import pickle
 import random
+import time
 import numpy as np
 
+from .checkpoint import load_checkpoint, restore_training_state, training_state
+from .q_table import DenseQTable, make_q_table, read_q_table, write_q_table
+
 
 class SARSA:
     def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=1.0, epsilon_decay=0.995, min_epsilon=0.1):
@@ -11,10 +14,13 @@ class SARSA:
         self.epsilon = epsilon  # Exploration rate
         self.epsilon_decay = epsilon_decay  # Decay rate for epsilon
         self.min_epsilon = min_epsilon  # Minimum epsilon value
-        self.q_table = {}  # Q-table for storing state-action values
+        self.q_table = make_q_table(env)  # Q-table for storing state-action values
 
     def state_to_key(self, state):
-        if isinstance(state, np.ndarray):
+        if isinstance(state, (int, np.integer)):
+            # Compact state ids (obs_mode='id') are already hashable keys
+            return int(state)
+        elif isinstance(state, np.ndarray):
             return tuple(state.flatten())
         elif isinstance(state, (list, tuple)):
             return tuple(self.state_to_key(s) for s in state)
@@ -28,10 +34,10 @@ class SARSA:
         if random.uniform(0, 1) < self.epsilon:
             return self.env.action_space.sample()
         else:
-            state_actions = self.q_table.get(state_key, {})
-            if not state_actions:
+            action = self.q_table.best_action(state_key)
+            if action is None:
                 return self.env.action_space.sample()
-            return max(state_actions, key=state_actions.get)
+            return action
 
     def decay_epsilon(self):
         """
@@ -39,23 +45,40 @@ class SARSA:
         """
         self.epsilon = max(self.min_epsilon, self.epsilon * self.epsilon_decay)
 
-    def train(self, num_episodes=1000):
+    def train(self, num_episodes=1000, progress=None, cancel=None, checkpoint=None, resume=None):
         """
         Train the agent using SARSA. It updates the Q-values for state-action pairs based on the rewards received
         and the Q-value of the next state-action pair.
         :param num_episodes: Number of episodes to train the agent for.
+        :param progress: Optional callable progress(episode, epsilon, episode_reward, steps_per_sec), called after
+            every episode.
+        :param cancel: Optional event (threading or multiprocessing); training stops after the current episode once
+            it is set.
+        :param checkpoint: Optional Checkpointer, handed a snapshot of the training (see training_state) whenever it
+            is due and once more when training stops.
+        :param resume: Optional checkpoint file to continue from. Training picks up after the episode it was saved
+            at, with its Q-table, epsilon, random generators and metrics, so it goes on exactly as it would have
+            without stopping, until num_episodes episodes in total.
         :return: Q-table with learned state-action values.
         """
         total_rewards = []
         collected_pellets_all = []
-
-        for episode in range(num_episodes):
+        total_steps = 0
+        if resume is not None:
+            total_rewards, collected_pellets_all, total_steps = restore_training_state(self, load_checkpoint(resume))
+        first_steps = total_steps
+        start_time = time.perf_counter()
+
+        for episode in range(len(total_rewards), num_episodes):
+            if cancel is not None and cancel.is_set():
+                break
             state = self.env.reset()[0]
             state_key = self.state_to_key(state)
             action = self.get_action(state)
             done = False
             episode_reward = 0
             self.env.current_episode = episode + 1
+            self._start_episode()
 
             while not done:
                 next_state, reward, terminated, truncated, _ = self.env.step(action)
@@ -63,30 +86,29 @@ class SARSA:
                 next_state_key = self.state_to_key(next_state)
                 next_action = self.get_action(next_state)
 
-                # Inicializa os dicionários se necessário
-                if state_key not in self.q_table:
-                    self.q_table[state_key] = {}
-                if action not in self.q_table[state_key]:
-                    self.q_table[state_key][action] = 0.0
-                if next_state_key not in self.q_table:
-                    self.q_table[next_state_key] = {}
-                if next_action not in self.q_table[next_state_key]:
-                    self.q_table[next_state_key][next_action] = 0.0
-
-                # Atualiza a Q-table com a fórmula SARSA
-                old_value = self.q_table[state_key][action]
-                next_value = self.q_table[next_state_key][next_action]
-                self.q_table[state_key][action] = old_value + self.alpha * (reward + self.gamma * next_value - old_value)
-                
+                self._learn(state_key, action, reward, next_state_key, next_action)
+
                 episode_reward += reward
                 state_key = next_state_key
                 action = next_action
+                total_steps += 1
 
             total_rewards.append(episode_reward)
             collected_pellets = 30 - self.env.remaining_pellets  #começa com 30
             collected_pellets_all.append(collected_pellets)
 
             self.decay_epsilon()
+            if progress is not None:
+                progress(episode + 1, self.epsilon, episode_reward,
+                         (total_steps - first_steps) / (time.perf_counter() - start_time))
+            if checkpoint is not None and checkpoint.due(episode + 1):
+                checkpoint.save(training_state(self, total_rewards, collected_pellets_all, total_steps))
+
+        if checkpoint is not None and checkpoint.due(len(total_rewards), final=True):
+            checkpoint.save(training_state(self, total_rewards, collected_pellets_all, total_steps))
+
+        if not total_rewards:
+            return self.q_table
 
         avg_reward = np.mean(total_rewards)
         avg_collected = np.mean(collected_pellets_all)
@@ -94,11 +116,26 @@ class SARSA:
         print(f"Média de pellets recolhidas durante o treino: {round(avg_collected, 2)}")
 
         return self.q_table
-    
+
+    def _start_episode(self):
+        """
+        Called by train before every episode.
+        """
+
+    def _learn(self, state_key, action, reward, next_state_key, next_action):
+        """
+        Learn from one real step of train: the SARSA update of the pair taken, towards the pair taken next. Agents
+        built on SARSA override this rather than train.
+        """
+        # Atualiza a Q-table com a fórmula SARSA
+        next_value = self.q_table.value(next_state_key, next_action)
+        self.q_table.update(state_key, action, reward + self.gamma * next_value, self.alpha)
+
     def test(self, num_episodes=100, load_model=True):
         """
         Run the environment using the learned policy to evaluate performance.
         :param num_episodes: Number of episodes to run for testing.
+        :return: Tuple (episode rewards, collected pellets per episode).
         """
         if load_model:
             try:
@@ -135,24 +172,31 @@ class SARSA:
         print(f"Recompensa média durante o teste: {round(avg_reward,2)}")
         print(f"Média de pellets recolhidas durante o teste: {(avg_collected)}")
 
+        return total_rewards, collected_pellets_all
+
     def set_epsilon_to_min(self):
         """
         Set epsilon to its minimum value to focus on exploitation.
         """
         self.epsilon = self.min_epsilon
 
-    def save_q_table(self, filename='models/sarsa_solution.pkl'):
+    def save_q_table(self, filename='models/sarsa_solution.qtable'):
         """
-        Save the Q-table to a file using pickle.
+        Save the Q-table to a file (see write_q_table for the format).
         :param filename: Name of the file to save the Q-table to.
         """
-        with open(filename, 'wb') as f:
-            pickle.dump(self.q_table, f)
+        write_q_table(self.q_table, filename, state_encoding=self._state_encoding())
 
-    def load_q_table(self, filename='models/sarsa_solution.pkl'):
+    def load_q_table(self, filename='models/sarsa_solution.qtable'):
         """
-        Load the Q-table from a file using pickle.
+        Load the Q-table from a file, memory-mapped if it is in the Q-table format. Pickles from older versions
+        still load.
         :param filename: Name of the file to load the Q-table from.
         """
-        with open(filename, 'rb') as f:
-            self.q_table = pickle.load(f)
+        # Only tables of integer state ids are checked against the environment's state encoding
+        state_encoding = self._state_encoding() if isinstance(self.q_table, DenseQTable) else None
+        self.q_table = read_q_table(filename, state_encoding=state_encoding)
+
+    def _state_encoding(self):
+        state_encoding = getattr(self.env, 'state_encoding', None)
+        return state_encoding() if state_encoding is not None else None
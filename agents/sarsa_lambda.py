@@ -0,0 +1,37 @@
+from .sarsa import SARSA
+from .traces import EligibilityTraces
+
+
+class SARSALambda(SARSA):
+    """
+    SARSA(λ): SARSA with replacing eligibility traces. Each TD error updates every state-action pair of the recent
+    trajectory, weighted by (gamma * lambda) ** steps since it was taken, instead of the last pair only, so a reward
+    reaches the moves that led to it within one episode. The traces are sparse (see EligibilityTraces); with lam=0
+    the agent learns exactly as SARSA.
+    """
+
+    def __init__(self, env, alpha=0.1, gamma=0.9, epsilon=1.0, epsilon_decay=0.995, min_epsilon=0.1, lam=0.9,
+                 trace_cutoff=0.01):
+        super().__init__(env, alpha=alpha, gamma=gamma, epsilon=epsilon, epsilon_decay=epsilon_decay,
+                         min_epsilon=min_epsilon)
+        self.lam = lam  # Trace decay (lambda)
+        self.trace_cutoff = trace_cutoff  # Traces below this are dropped
+        self.traces = EligibilityTraces(gamma * lam, trace_cutoff)
+
+    def _start_episode(self):
+        self.traces.clear()
+
+    def _learn(self, state_key, action, reward, next_state_key, next_action):
+        """
+        The SARSA(λ) update: the pair's TD error applied to every pair of the trajectory by its trace.
+        """
+        delta = (reward + self.gamma * self.q_table.value(next_state_key, next_action)
+                 - self.q_table.value(state_key, action))
+        self.traces.visit(state_key, action)
+        self.traces.update(self.q_table, self.alpha * delta)
+
+    def save_q_table(self, filename='models/sarsa_lambda_solution.qtable'):
+        super().save_q_table(filename)
+
+    def load_q_table(self, filename='models/sarsa_lambda_solution.qtable'):
+        super().load_q_table(filename)
@@ -0,0 +1,59 @@
+import heapq
+from operator import itemgetter
+
+
+class SweepQueue:
+    """
+    Bounded max-priority queue of state-action pairs for prioritized sweeping, on a heapq binary heap.
+
+    A pair is queued at most once, at its highest pending priority: pushing it with a higher priority adds a new heap
+    entry and leaves the old one stale, to be skipped when it reaches the top; pushing it with a lower one does
+    nothing. push() and pop() are O(log n). When stale entries make the heap grow past twice max_size, it is rebuilt
+    from the max_size highest pending pairs, dropping the stale entries and the lowest priorities (counted in
+    dropped), so memory stays bounded and the rebuild costs O(log n) amortized per push.
+    """
+
+    def __init__(self, max_size=10000):
+        """
+        :param max_size: Pairs kept when the heap is rebuilt.
+        """
+        self.max_size = max_size
+        self.heap = []  # (-priority, pair), the highest priority first
+        self.pending = {}  # pair -> priority of its live heap entry
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    def push(self, pair, priority):
+        """
+        Queue a pair, or raise its priority if it is already queued lower.
+        """
+        if self.pending.get(pair, 0.0) >= priority:
+            return
+        self.pending[pair] = priority
+        heapq.heappush(self.heap, (-priority, pair))
+        if len(self.heap) > 2 * self.max_size:
+            self._rebuild()
+
+    def pop(self):
+        """
+        Remove the pair with the highest priority.
+        :return: Tuple (pair, priority).
+        :raise IndexError: If the queue is empty.
+        """
+        heap = self.heap
+        pending = self.pending
+        while heap:
+            negative_priority, pair = heapq.heappop(heap)
+            if pending.get(pair) == -negative_priority:
+                del pending[pair]
+                return pair, -negative_priority
+        raise IndexError("pop from an empty SweepQueue")
+
+    def _rebuild(self):
+        kept = heapq.nlargest(self.max_size, self.pending.items(), key=itemgetter(1))
+        self.dropped += len(self.pending) - len(kept)
+        self.pending = dict(kept)
+        self.heap = [(-priority, pair) for pair, priority in kept]
+        heapq.heapify(self.heap)
@@ -0,0 +1,62 @@
+import math
+
+
+class EligibilityTraces:
+    """
+    Sparse replacing eligibility traces for the λ agents (SARSALambda, WatkinsQLambda).
+
+    Only state-action pairs visited in the last few steps hold a trace, as a dict {(state_key, action): trace}. A
+    visit sets the pair's trace to 1, every step multiplies all traces by decay (gamma * lambda), and a trace is
+    dropped as soon as it falls below cutoff. At most max_length() pairs are ever held, so the cost of a step is
+    bounded however long the episode runs, and an update touches the recent pairs instead of the whole table.
+    """
+
+    def __init__(self, decay, cutoff=0.01):
+        """
+        :param decay: Factor applied to every trace after each step, gamma * lambda.
+        :param cutoff: Traces below this are dropped.
+        """
+        self.decay = decay
+        self.cutoff = cutoff
+        self.traces = {}
+
+    def __len__(self):
+        return len(self.traces)
+
+    def max_length(self):
+        """
+        Most pairs that can hold a trace at once: a trace survives the steps until decay ** steps < cutoff.
+        """
+        if self.decay <= 0:
+            return 1
+        if self.decay >= 1:
+            return math.inf
+        return int(math.log(self.cutoff) / math.log(self.decay)) + 1
+
+    def visit(self, state_key, action):
+        """
+        Replace the trace of the pair just taken with 1.
+        """
+        self.traces[(state_key, action)] = 1.0
+
+    def update(self, q_table, step):
+        """
+        Apply a TD error to every traced pair, Q(s, a) += step * e(s, a) with step = alpha * delta, then decay the
+        traces and drop those below the cutoff.
+        """
+        add = q_table.add
+        decay = self.decay
+        cutoff = self.cutoff
+        kept = {}
+        for key, trace in self.traces.items():
+            add(key[0], key[1], step * trace)
+            trace *= decay
+            if trace >= cutoff:
+                kept[key] = trace
+        self.traces = kept
+
+    def clear(self):
+        """
+        Drop all traces (at the start of an episode, or after an exploratory action in Watkins's Q(λ)).
+        """
+        self.traces = {}
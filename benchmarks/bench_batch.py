@@ -0,0 +1,56 @@
+"""
+Game steps/sec of one headless PacmanEnv versus BatchPacmanEnv at several batch sizes.
+
+Run from the repository root:
+    python -m benchmarks.bench_batch [--steps 2000] [--sizes 1 16 64 256 1024]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from game.batch_env import BatchPacmanEnv
+from game.environment import PacmanEnv
+
+
+def run_single(steps, seed=1):
+    env = PacmanEnv(mode='Training', algorithm='Q-Learning', seed=seed, render_mode=None, obs_mode='id')
+    random.seed(seed)
+    env.reset()
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(random.randrange(3))
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def run_batch(n_envs, steps, seed=1):
+    env = BatchPacmanEnv(n_envs, seed=seed)
+    env.reset()
+    actions = np.random.default_rng(seed).integers(0, 3, size=(steps, n_envs))
+
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t])
+    return steps * n_envs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 16, 64, 256, 1024])
+    args = parser.parse_args()
+
+    single = run_single(args.steps)
+    print(f"PacmanEnv            : {single:12.0f} steps/s")
+    for n_envs in args.sizes:
+        # Keep the total number of game steps roughly constant across batch sizes
+        batch = run_batch(n_envs, max(args.steps // n_envs, 50))
+        print(f"BatchPacmanEnv x{n_envs:<5d}: {batch:12.0f} steps/s ({batch / single:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
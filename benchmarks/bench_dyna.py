@@ -0,0 +1,59 @@
+"""
+Sample efficiency versus wall-clock time of Dyna-Q for several numbers of planning updates per real step (K).
+
+Run from the repository root:
+    python -m benchmarks.bench_dyna [--planning-steps 0 5 10 25 50 --episodes 600 --target -600 --seeds 1 2]
+
+Each K trains a DynaQ agent the way benchmarks/bench_traces.py trains its agents (default settings, fixed layout
+of each seed, until the mean reward of the last --window episodes reaches --target). Averaged over the seeds that
+reached the target: episodes, real environment steps and seconds to the target. us/step is the cost of a real step
+with its planning, over all runs. K=0 learns as Q-Learning.
+
+Measured on a single core, Python 3.11, with the defaults (target -600 over 50 episodes, at most 600 episodes, seeds
+1 and 2):
+
+       K | reached | episodes | env steps | seconds | us/step
+       0 |   1/2   |      201 |    140670 |    28.6 |     207
+       5 |   2/2   |      272 |    179158 |    40.8 |     228
+      10 |   2/2   |      258 |    172936 |    41.2 |     238
+      25 |   2/2   |      362 |    238202 |    55.6 |     233
+      50 |   2/2   |      224 |    144194 |    37.9 |     263
+
+With planning the agent reached the target on both layouts; without it, only on seed 1. Planning costs 10-30% more
+per real step, and K=50 still runs at about 80% of Q-Learning's steps/sec. The environment step (~200 us) dominates,
+and a batch of K planning updates is a handful of NumPy calls (~20 us, nearly flat in K). Fewer episodes to the
+target are not visible here: epsilon decays per episode whatever K is, so early rewards are limited by exploration
+rather than by how fast values spread.
+"""
+import argparse
+
+import numpy as np
+
+from agents.dyna_q import DynaQ
+from benchmarks.bench_traces import run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--planning-steps', type=int, nargs='+', default=[0, 5, 10, 25, 50])
+    parser.add_argument('--episodes', type=int, default=600, help="Give up after this many episodes")
+    parser.add_argument('--target', type=float, default=-600, help="Target mean reward over the window")
+    parser.add_argument('--window', type=int, default=50)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2])
+    args = parser.parse_args()
+
+    print(f"{'K':>4s} | {'reached':>7s} | {'episodes':>8s} | {'env steps':>9s} | {'seconds':>7s} | us/step")
+    for planning_steps in args.planning_steps:
+        results = [run(DynaQ, seed, args.episodes, args.target, args.window, planning_steps=planning_steps)
+                   for seed in args.seeds]
+        hits = [(episodes, steps, seconds) for episodes, seconds, _, steps in results if episodes is not None]
+        steps = sum(result[3] for result in results)
+        seconds = sum(result[1] for result in results)
+        to_target = (f"{np.mean([h[0] for h in hits]):8.0f} | {np.mean([h[1] for h in hits]):9.0f} | "
+                     f"{np.mean([h[2] for h in hits]):7.1f}" if hits else f"{'-':>8s} | {'-':>9s} | {'-':>7s}")
+        print(f"{planning_steps:4d} | {len(hits):3d}/{len(results):<3d} | {to_target} | "
+              f"{1e6 * seconds / steps:7.0f}")
+
+
+if __name__ == '__main__':
+    main()
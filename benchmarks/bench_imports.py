@@ -0,0 +1,101 @@
+"""
+Import time of the project's entry points, from python -X importtime.
+
+Run from the repository root:
+    python -m benchmarks.bench_imports [--repeat 5] [--top 15 --target game.game]
+
+Every target is imported in a fresh interpreter. The total is the sum of the top-level cumulative times reported by
+-X importtime minus the same sum for an empty interpreter, so Python's own start-up is not counted. --top lists the
+heaviest modules (cumulative time, including their own imports) pulled in by one target.
+
+Measured with -X importtime on a single core, Python 3.11, with pygame-ce and pygame_gui installed (best of 45,
+milliseconds). Before: the tree before the environment, agents, ManualControl and pygame were made lazy in
+game/game.py and Game/TrainingWorker in gui/splash_screen.py. After: with those changes, and with PacmanRL-v0
+registered by game.environment instead of game/__init__.py:
+
+    target                                   before    after
+    gui.splash_screen                           284      161
+    game.game                                   258        7
+    game.training_worker                        197       20
+    pacmanrl --help                             197       12
+    game.environment                            171      183
+
+The GUI no longer loads gymnasium, minigrid, numpy or the agents until a session starts; what it still imports is
+pygame and pygame_gui, for its own windows. game.game imports nothing heavy: pygame is imported by the sessions that
+open a window (Game.start_game) or handle its events. Registering the environment used to import gymnasium (and
+numpy) with the game package, so anything importing game.settings paid for it: the command line's start-up was
+almost all gymnasium. game.environment is the same within noise (single runs vary by 30 ms here, and best-of runs
+by as much for gui.splash_screen): it needs gymnasium, numpy and minigrid anyway, and minigrid.minigrid_env imports
+pygame and pygame.freetype itself, so the environment cannot defer them.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+TARGETS = {
+    'game': 'import game',
+    'game.environment': 'import game.environment',
+    'game.game': 'import game.game',
+    'game.training_worker': 'import game.training_worker',
+    'pacmanrl --help': "import sys; sys.argv = ['pacmanrl', '--help']; import runpy; runpy.run_module('pacmanrl')",
+    'gui.splash_screen': 'import gui.splash_screen',
+}
+
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def import_times(code):
+    """
+    Run code in a fresh interpreter with -X importtime.
+    :return: List of (module, cumulative microseconds, depth), or None if the code failed.
+    """
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1', SDL_VIDEODRIVER='dummy')
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if process.returncode != 0:
+        return None
+    times = []
+    for line in process.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            times.append((match.group(4), int(match.group(2)), len(match.group(3)) // 2))
+    return times
+
+
+def total_ms(times):
+    return sum(cumulative for _, cumulative, depth in times if depth == 0) / 1000
+
+
+def measure(code, repeat, baseline):
+    totals = []
+    for _ in range(repeat):
+        times = import_times(code)
+        if times is None:
+            return None
+        totals.append(total_ms(times) - baseline)
+    return min(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help="List the heaviest modules of --target")
+    parser.add_argument('--target', choices=TARGETS, default='game.game')
+    args = parser.parse_args()
+
+    baseline = min(total_ms(import_times('pass')) for _ in range(args.repeat))
+    for name, code in TARGETS.items():
+        ms = measure(code, args.repeat, baseline)
+        print(f"{name:28s}: " + ("import failed" if ms is None else f"{ms:8.1f} ms"))
+
+    if args.top:
+        times = import_times(TARGETS[args.target]) or []
+        print(f"\nHeaviest imports of {args.target} (cumulative):")
+        for module, cumulative, depth in sorted(times, key=lambda item: -item[1])[:args.top]:
+            print(f"{cumulative / 1000:8.1f} ms  {'  ' * depth}{module}")
+
+
+if __name__ == '__main__':
+    main()
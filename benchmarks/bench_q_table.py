@@ -0,0 +1,40 @@
+"""
+Q-learning updates/sec of the dict and dense Q-table backends, without an environment in the loop.
+
+Run from the repository root:
+    python -m benchmarks.bench_q_table [--updates 500000]
+"""
+import argparse
+import random
+import time
+
+from agents.q_table import DenseQTable, DictQTable
+
+N_STATES = 24 * 24 * 4
+N_ACTIONS = 3
+
+
+def run(q_table, transitions, alpha=0.1, gamma=0.9):
+    start = time.perf_counter()
+    for state, action, reward, next_state in transitions:
+        q_table.best_action(state)
+        next_max = q_table.max_value(next_state)
+        q_table.update(state, action, reward + gamma * next_max, alpha)
+    return len(transitions) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--updates', type=int, default=500000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    transitions = [(rng.randrange(N_STATES), rng.randrange(N_ACTIONS), rng.uniform(-1, 1), rng.randrange(N_STATES))
+                   for _ in range(args.updates)]
+
+    print(f"dict  : {run(DictQTable(), transitions):12.0f} updates/s")
+    print(f"dense : {run(DenseQTable(N_STATES, N_ACTIONS), transitions):12.0f} updates/s")
+
+
+if __name__ == '__main__':
+    main()
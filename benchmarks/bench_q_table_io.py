@@ -0,0 +1,83 @@
+"""
+Save and load times of a Q-table as a pickle versus the memory-mappable Q-table format (agents/q_table.py).
+
+Run from the repository root:
+    python -m benchmarks.bench_q_table_io [--states 2304 1000000 10000000]
+
+"load + first action" is what test() waits for before its first step: the pickle has to be read and unpickled in
+full, while the Q-table format maps the file and only reads the pages it touches.
+
+Measured on a single core, Python 3.11 (milliseconds, tables with 3 actions and half of the states seen):
+
+        states | save pickle save qtable | load + first action pickle/qtable | size (MB) pickle/qtable
+          2304 |         0.2         0.2 |                   0.1        0.2 |   0.0 / 0.0
+       1000000 |        11.8        23.4 |                   3.4        1.7 |  13.0 / 16.0
+      10000000 |       168.2       365.7 |                  83.1       20.9 | 130.0 / 160.0
+
+Saving is slower (the seen ids are stored as int64 instead of a bool mask) and the file is larger, but loading no
+longer grows with the table, and the file is only ever written whole (temp file and rename).
+"""
+import argparse
+import os
+import pickle
+import tempfile
+import time
+
+import numpy as np
+
+from agents.q_table import DenseQTable, read_q_table, write_q_table
+
+N_ACTIONS = 3
+
+
+def make_table(n_states, seed=0):
+    rng = np.random.default_rng(seed)
+    table = DenseQTable(n_states, N_ACTIONS)
+    table.values[:] = rng.normal(size=table.values.shape)
+    table.seen[rng.random(n_states) < 0.5] = True
+    return table
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(n_states, directory):
+    table = make_table(n_states)
+    pickle_path = os.path.join(directory, 'table.pkl')
+    qtable_path = os.path.join(directory, 'table.qtable')
+
+    def pickle_save():
+        with open(pickle_path, 'wb') as f:
+            pickle.dump(table, f)
+
+    def pickle_load():
+        with open(pickle_path, 'rb') as f:
+            return pickle.load(f).best_action(n_states - 1)
+
+    _, pickle_save_ms = timed(pickle_save)
+    _, qtable_save_ms = timed(lambda: write_q_table(table, qtable_path))
+    _, pickle_load_ms = timed(pickle_load)
+    _, qtable_load_ms = timed(lambda: read_q_table(qtable_path).best_action(n_states - 1))
+    return (pickle_save_ms, qtable_save_ms, pickle_load_ms, qtable_load_ms,
+            os.path.getsize(pickle_path), os.path.getsize(qtable_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--states', type=int, nargs='+', default=[2304, 1000000, 10000000])
+    args = parser.parse_args()
+
+    print(f"{'states':>10} | {'save pickle':>11} {'save qtable':>11} | {'load + first action':>29} | size (MB)")
+    with tempfile.TemporaryDirectory() as directory:
+        for n_states in args.states:
+            pickle_save, qtable_save, pickle_load, qtable_load, pickle_size, qtable_size = run(n_states, directory)
+            print(f"{n_states:10d} | {pickle_save:9.1f}ms {qtable_save:9.1f}ms | "
+                  f"pickle {pickle_load:8.1f}ms qtable {qtable_load:6.1f}ms | "
+                  f"{pickle_size / 1e6:.1f} / {qtable_size / 1e6:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Frames/sec of PacmanEnv.render() (rgb_array) with 30 pellets and 4 ghosts.
+
+Run from the repository root:
+    python -m benchmarks.bench_render [--frames 200]
+
+minigrid caches rendered tiles, so in a long run each pellet and ghost tile is composited once. The "cold" numbers
+clear that cache before every frame, which is what the first frames (and every new tile size) pay for the sprite
+compositing in CustomSprite.render.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from minigrid.core.grid import Grid
+from minigrid.core.world_object import Goal
+
+from game.custom_sprite import CustomSprite
+from game.environment import PacmanEnv
+
+
+def run(frames, cold, seed=1):
+    env = PacmanEnv(mode='Training', n_pellets=30, n_ghosts=4, render_mode='rgb_array', obs_mode='id')
+    env.reset(seed=seed)
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        if cold:
+            Grid.tile_cache.clear()
+        env.render()
+        _, _, terminated, truncated, _ = env.step(rng.randrange(3))
+        if terminated or truncated:
+            env.reset()
+    return frames / (time.perf_counter() - start)
+
+
+def run_sprite(calls, tile_size=96):
+    """
+    Microseconds per CustomSprite.render call on a tile of the size minigrid renders at (tile_size * 3 subdivisions).
+    """
+    env = PacmanEnv(mode='Training', render_mode='rgb_array', obs_mode='id')
+    sprite = CustomSprite(Goal(), env.pellet_image)
+    img = np.zeros((tile_size, tile_size, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        sprite.render(img)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"cold tile cache : {run(args.frames, cold=True):8.1f} frames/s")
+    print(f"warm tile cache : {run(args.frames, cold=False):8.1f} frames/s")
+    print(f"sprite composite: {run_sprite(args.frames):8.1f} us/tile")
+
+
+if __name__ == '__main__':
+    main()
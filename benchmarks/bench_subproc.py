@@ -0,0 +1,58 @@
+"""
+Steps/sec of SubprocPacmanEnv as the number of worker processes grows, next to a single in-process PacmanEnv.
+
+Run from the repository root:
+    python -m benchmarks.bench_subproc [--steps 2000] [--workers 1 2 4 8]
+
+Each worker runs one headless environment, so the numbers stop scaling once there are more workers than cores.
+"""
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+
+from game.environment import PacmanEnv
+from game.subproc_env import SubprocPacmanEnv
+
+
+def run_single(steps, seed=1):
+    env = PacmanEnv(mode='Training', seed=seed, render_mode=None, obs_mode='id')
+    random.seed(seed)
+    env.reset()
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, terminated, truncated, _ = env.step(random.randrange(3))
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def run_workers(n_workers, steps, seed=1):
+    actions = np.random.default_rng(seed).integers(0, 3, size=(steps, n_workers))
+    with SubprocPacmanEnv(n_workers, seed=seed) as env:
+        env.reset()
+        start = time.perf_counter()
+        for t in range(steps):
+            env.step(actions[t])
+        return steps * n_workers / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"cores available       : {os.cpu_count()}")
+    single = run_single(args.steps)
+    print(f"in-process PacmanEnv  : {single:10.0f} steps/s")
+    for n_workers in args.workers:
+        rate = run_workers(n_workers, args.steps)
+        print(f"{n_workers:3d} worker(s)          : {rate:10.0f} steps/s ({rate / single:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Real environment steps and wall-clock time until the greedy policy is good: Q-Learning versus the planning agents,
+Dyna-Q (uniform replay) and prioritized sweeping, with the same planning budget.
+
+Run from the repository root:
+    python -m benchmarks.bench_sweeping [--planning-steps 10 --episodes 300 --target -1000 --seeds 1 2]
+
+Training rewards mostly follow the epsilon schedule, which decays per episode whatever the agent learns, so here
+the greedy policy is what is measured: every --eval-every training episodes it plays --eval-episodes episodes
+with epsilon 0 on a separate environment with the same layout. Reported per agent, over the seeds: the training
+steps taken when the greedy mean reward first reached --target (averaged over the seeds that reached it), the mean
+greedy reward over the second half of training, and the cost of a training step.
+
+Measured on a single core, Python 3.11, with the defaults (10 planning updates per step, 300 episodes, greedy target
+-1000 over 5 episodes evaluated every 25, seeds 1 and 2):
+
+    agent                | reached | steps to target | greedy reward | us/step
+    Q-Learning           |   0/2   |               - |         -2400 |     224
+    Dyna-Q               |   1/2   |           41108 |         -2469 |     249
+    Prioritized Sweeping |   2/2   |           40682 |         -1193 |     509
+
+Prioritized sweeping got a greedy policy to the target on both layouts within about 41,000 real steps (about 60
+episodes), where Q-Learning had not after 300 episodes (over 200,000 steps), and its greedy policy stayed about
+twice as good for the rest of training. Its steps cost about 2.3 times as much: each planning update computes the
+expected targets of the predecessors it queues, in Python.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from agents.dyna_q import DynaQ
+from agents.prioritized_sweeping import PrioritizedSweeping
+from agents.q_learning import QLearning
+from game.environment import PacmanEnv
+from game.settings import DEFAULT_SETTINGS
+
+
+def greedy_reward(agent, env, episodes):
+    """
+    Mean reward of the agent's greedy policy on env, without learning.
+    """
+    epsilon, agent.epsilon = agent.epsilon, 0.0
+    total = 0
+    for _ in range(episodes):
+        state = env.reset()[0]
+        done = False
+        while not done:
+            state, reward, terminated, truncated, _ = env.step(agent.get_action(state))
+            total += reward
+            done = terminated or truncated
+    agent.epsilon = epsilon
+    return total / episodes
+
+
+def run(agent_class, seed, args, **options):
+    """
+    :return: Tuple (training steps when the greedy reward reached the target or None, greedy rewards, training
+        steps, training seconds).
+    """
+    env = PacmanEnv(mode='Training', seed=seed, render_mode=None, obs_mode='id')
+    eval_env = PacmanEnv(mode='Testing', seed=seed, render_mode=None, obs_mode='id')
+    env.action_space.seed(seed)
+    random.seed(seed)
+    agent = agent_class(env, alpha=DEFAULT_SETTINGS['learning_rate'], gamma=DEFAULT_SETTINGS['discount_factor'],
+                        epsilon=DEFAULT_SETTINGS['epsilon'], epsilon_decay=DEFAULT_SETTINGS['epsilon_decay'],
+                        min_epsilon=DEFAULT_SETTINGS['min_epsilon'], **options)
+    steps = [0]
+    rewards = []
+    reached = []
+    eval_seconds = [0.0]
+
+    def progress(episode, epsilon, episode_reward, steps_per_sec):
+        steps[0] += env.step_count  # Steps of the episode that just ended
+        if episode % args.eval_every == 0:
+            start = time.perf_counter()
+            rewards.append(greedy_reward(agent, eval_env, args.eval_episodes))
+            eval_seconds[0] += time.perf_counter() - start
+            if not reached and rewards[-1] >= args.target:
+                reached.append(steps[0])
+
+    start = time.perf_counter()
+    agent.train(num_episodes=args.episodes, progress=progress)
+    seconds = time.perf_counter() - start - eval_seconds[0]
+    return (reached[0] if reached else None), rewards, steps[0], seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--planning-steps', type=int, default=DEFAULT_SETTINGS['planning_steps'])
+    parser.add_argument('--episodes', type=int, default=300)
+    parser.add_argument('--target', type=float, default=-1000, help="Target greedy mean reward")
+    parser.add_argument('--eval-every', type=int, default=25)
+    parser.add_argument('--eval-episodes', type=int, default=5)
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2])
+    args = parser.parse_args()
+
+    agents = {
+        'Q-Learning': (QLearning, {}),
+        'Dyna-Q': (DynaQ, {'planning_steps': args.planning_steps}),
+        'Prioritized Sweeping': (PrioritizedSweeping, {'planning_steps': args.planning_steps}),
+    }
+    print(f"{'agent':20s} | {'reached':>7s} | {'steps to target':>15s} | {'greedy reward':>13s} | us/step")
+    for name, (agent_class, options) in agents.items():
+        results = [run(agent_class, seed, args, **options) for seed in args.seeds]
+        hits = [steps for steps, _, _, _ in results if steps is not None]
+        late_rewards = [np.mean(rewards[len(rewards) // 2:]) for _, rewards, _, _ in results]
+        steps = sum(result[2] for result in results)
+        seconds = sum(result[3] for result in results)
+        to_target = f"{np.mean(hits):15.0f}" if hits else f"{'-':>15s}"
+        print(f"{name:20s} | {len(hits):3d}/{len(results):<3d} | {to_target} | {np.mean(late_rewards):13.0f} | "
+              f"{1e6 * seconds / steps:7.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Episodes and wall-clock time the agents need to reach a target reward, one-step (Q-Learning, SARSA) versus
+eligibility traces (Watkins Q(lambda), SARSA(lambda)).
+
+Run from the repository root:
+    python -m benchmarks.bench_traces [--episodes 600 --target -600 --window 50 --seeds 1 2]
+
+Every agent trains headless on the fixed layout of each seed, with the game's default settings, until the mean reward
+of the last --window episodes reaches --target or --episodes have been played. Reported per agent, averaged over the
+seeds that reached the target: episodes and seconds to the target, plus the cost of an episode and a step.
+
+Measured on a single core, Python 3.11, with the defaults (lambda 0.9, trace cutoff 0.01, target -600 over 50 episodes,
+at most 600 episodes, seeds 1 and 2):
+
+    agent          | reached | episodes | seconds | ms/episode | steps/s
+    Q-Learning     |   1/2   |      209 |    33.6 |      170.8 |    4389
+    SARSA          |   1/2   |      209 |    31.5 |      174.7 |    4391
+    Q(lambda)      |   2/2   |      216 |    35.3 |      163.1 |    4034
+    SARSA(lambda)  |   2/2   |      224 |    41.1 |      183.6 |    3876
+
+Both trace agents reached the target on both layouts; the one-step agents never did on seed 2 within 600 episodes.
+A step costs 8-12% more with traces: at most 22 pairs are traced (0.81 ** 22 < 0.01), and the environment step
+dominates. The runs are noisy, so use more seeds to compare settings.
+"""
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from agents.q_lambda import WatkinsQLambda
+from agents.q_learning import QLearning
+from agents.sarsa import SARSA
+from agents.sarsa_lambda import SARSALambda
+from game.environment import PacmanEnv
+from game.settings import DEFAULT_SETTINGS
+
+AGENTS = {'Q-Learning': QLearning, 'SARSA': SARSA, 'Q(lambda)': WatkinsQLambda, 'SARSA(lambda)': SARSALambda}
+
+
+def run(agent_class, seed, episodes, target, window, **options):
+    """
+    Train a new agent_class(env, **options) with the default settings until it reaches the target.
+    :return: Tuple (episodes to the target or None, seconds to the target or to the end, episodes played, steps).
+    """
+    env = PacmanEnv(mode='Training', seed=seed, render_mode=None, obs_mode='id')
+    env.action_space.seed(seed)
+    random.seed(seed)
+    agent = agent_class(env, alpha=DEFAULT_SETTINGS['learning_rate'], gamma=DEFAULT_SETTINGS['discount_factor'],
+                        epsilon=DEFAULT_SETTINGS['epsilon'], epsilon_decay=DEFAULT_SETTINGS['epsilon_decay'],
+                        min_epsilon=DEFAULT_SETTINGS['min_epsilon'], **options)
+    rewards = []
+    reached = []
+    steps = []
+    cancel = threading.Event()
+
+    def progress(episode, epsilon, episode_reward, steps_per_sec):
+        rewards.append(episode_reward)
+        steps.append(env.step_count)  # Steps of the episode that just ended
+        if len(rewards) >= window and np.mean(rewards[-window:]) >= target:
+            reached.append(episode)
+            cancel.set()
+
+    start = time.perf_counter()
+    agent.train(num_episodes=episodes, progress=progress, cancel=cancel)
+    elapsed = time.perf_counter() - start
+    return (reached[0] if reached else None), elapsed, len(rewards), sum(steps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--episodes', type=int, default=600, help="Give up after this many episodes")
+    parser.add_argument('--target', type=float, default=-600, help="Target mean reward over the window")
+    parser.add_argument('--window', type=int, default=50)
+    parser.add_argument('--lam', type=float, default=DEFAULT_SETTINGS['trace_decay'])
+    parser.add_argument('--seeds', type=int, nargs='+', default=[1, 2])
+    args = parser.parse_args()
+
+    print(f"{'agent':14s} | {'reached':>7s} | {'episodes':>8s} | {'seconds':>7s} | {'ms/episode':>10s} | steps/s")
+    for name, agent_class in AGENTS.items():
+        options = {'lam': args.lam} if agent_class in (WatkinsQLambda, SARSALambda) else {}
+        results = [run(agent_class, seed, args.episodes, args.target, args.window, **options) for seed in args.seeds]
+        hits = [(episodes, seconds) for episodes, seconds, _, _ in results if episodes is not None]
+        played = sum(result[2] for result in results)
+        steps = sum(result[3] for result in results)
+        seconds = sum(result[1] for result in results)
+        to_target = (f"{np.mean([h[0] for h in hits]):8.0f} | {np.mean([h[1] for h in hits]):7.1f}" if hits
+                     else f"{'-':>8s} | {'-':>7s}")
+        print(f"{name:14s} | {len(hits):3d}/{len(results):<3d} | {to_target} | {1000 * seconds / played:10.1f} | "
+              f"{steps / seconds:7.0f}")
+
+
+if __name__ == '__main__':
+    main()
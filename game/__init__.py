@@ -1 +1,5 @@
-
+# gymnasium.make('PacmanRL-v0') builds a headless PacmanEnv with integer state ids as observations. Every
+# PacmanEnv argument can be overridden, e.g. gymnasium.make('PacmanRL-v0', render_mode='human', obs_mode='image').
+# The id is registered by game.environment, which loads gymnasium anyway, so importing the package or game.settings
+# stays cheap; gymnasium.make('game.environment:PacmanRL-v0') imports it first.
+ENV_ID = 'PacmanRL-v0'
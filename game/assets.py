@@ -0,0 +1,50 @@
+import pygame
+
+# Asset paths
+PACMAN_IMAGE_PATH = 'assets/images/pacman.png'
+GHOST_IMAGE_PATHS = {
+    'red': 'assets/images/ghosts/red.png',
+    'blue': 'assets/images/ghosts/blue.png',
+    'purple': 'assets/images/ghosts/purple.png',
+    'yellow': 'assets/images/ghosts/yellow.png'
+}
+PELLET_IMAGE_PATH = 'assets/images/orb.png'
+
+# Process-wide sprite cache shared by every PacmanEnv, its CustomSprites and its renderer:
+# path -> (converted for the display, the image in the four directions)
+_sprites = {}
+# (path, direction, size) -> image scaled to a square tile
+_scaled = {}
+
+
+def sprite(path, direction=0):
+    """
+    The image at path turned clockwise by direction quarter turns, in minigrid's direction order (0: right,
+    1: down, 2: left, 3: up). Each image is read from disk and rotated in all four directions once per process.
+
+    With a display the images are converted to its format for faster blits. Images first needed without a display
+    (headless environments that render to arrays) stay unconverted until a display exists, and are then loaded again
+    and converted once.
+    """
+    has_display = pygame.display.get_surface() is not None
+    entry = _sprites.get(path)
+    if entry is None or (has_display and not entry[0]):
+        image = pygame.image.load(path)
+        if has_display:
+            image = image.convert_alpha()
+        entry = _sprites[path] = (has_display, [pygame.transform.rotate(image, -90 * turn) for turn in range(4)])
+        # Scaled copies of the replaced images are stale
+        for key in [key for key in _scaled if key[0] == path]:
+            del _scaled[key]
+    return entry[1][direction % 4]
+
+
+def scaled_sprite(path, direction, size):
+    """
+    sprite(path, direction) scaled to a size x size tile, computed once per process.
+    """
+    key = (path, direction % 4, size)
+    image = _scaled.get(key)
+    if image is None:
+        image = _scaled[key] = pygame.transform.scale(sprite(path, direction), (size, size))
+    return image
@@ -0,0 +1,382 @@
+import numpy as np
+
+from .board import EMPTY, WALL, PELLET, GHOST
+from .maze_graph import compile_maze
+
+# Same vectors as minigrid.core.constants.DIR_TO_VEC (0: right, 1: down, 2: left, 3: up)
+DIR_TO_VEC = np.array([(1, 0), (0, 1), (-1, 0), (0, -1)])
+# Order in which PacmanEnv.step tries the ghost moves
+GHOST_MOVES = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)])
+
+LEFT, RIGHT, FORWARD = 0, 1, 2
+TOTAL_LIVES = 3
+GHOSTS_START_AFTER = 50  # Ghosts only move once the agent has taken this many actions
+
+
+class BatchPacmanEnv:
+    """
+    N independent Pacman games stepped in lockstep with NumPy arrays instead of N PacmanEnv objects.
+
+    Every game follows the rules of PacmanEnv: the same ghost movement, collisions, lives and respawn, and the
+    reward shaping of PacmanEnv.__calculate_rewards. That includes its quirks. The visited cells, the last-10
+    position history and the collision cooldown carry over between episodes of a game, just like the attributes
+    of a PacmanEnv instance do. Observations are the integer state ids of PacmanEnv.state_id.
+
+    The loops only run over ghosts (4 by default); everything else is vectorised over the games. Finished games
+    are reset automatically inside step(). Each game draws from its own counter-based random stream derived from
+    (seed, game index), so a game's trajectory depends only on the seed, its index and its actions, not on the
+    batch size or on the other games.
+    """
+
+    def __init__(self, n_envs, grid_size=24, agent_start_pos=(1, 1), agent_start_dir=0, n_pellets=30, n_ghosts=4,
+                 max_steps=2000, seed=None):
+        self.n_envs = n_envs
+        self.width = self.height = grid_size
+        self.agent_start_dir = agent_start_dir
+        self.n_pellets = n_pellets
+        self.n_ghosts = n_ghosts
+        self.max_steps = max_steps
+        self.n_actions = 3
+        self.n_states = self.width * self.height * 4
+
+        self.maze = compile_maze(self.width, self.height)
+        self.__compile_tables(agent_start_pos)
+
+        # Game state, one row per game
+        n, size = n_envs, self.width * self.height
+        self.cells = np.empty((n, size + 1), dtype=np.int8)  # Last column: wall standing in for off-grid cells
+        self.ghost_index = np.full((n, size), -1, dtype=np.int8)
+        self.ghost_pos = np.zeros((n, n_ghosts), dtype=np.int64)  # Flat positions (x * height + y)
+        self.agent_pos = np.zeros(n, dtype=np.int64)
+        self.agent_dir = np.zeros(n, dtype=np.int64)
+        self.step_count = np.zeros(n, dtype=np.int64)
+        self.agent_steps = np.zeros(n, dtype=np.int64)
+        self.pellets_collected = np.zeros(n, dtype=np.int64)
+        self.remaining_pellets = np.zeros(n, dtype=np.int64)
+        self.ghost_hits = np.zeros(n, dtype=np.int64)
+        self.cumulative_reward = np.zeros(n, dtype=np.float64)
+        # Persist across episodes, as in PacmanEnv
+        self.collision_cooldown = np.zeros(n, dtype=np.int64)
+        self.collision_cooldown_duration = 10
+        self.visited = np.zeros((n, size), dtype=bool)
+        self.history = np.full((n, 10), -1, dtype=np.int64)
+        self.history_len = np.zeros(n, dtype=np.int64)
+
+        self.seed(seed)
+
+    def __compile_tables(self, agent_start_pos):
+        maze, height = self.maze, self.height
+        size = self.width * self.height
+        xs, ys = np.divmod(np.arange(size), height)
+        self.flat_xy = np.stack([xs, ys], axis=1)
+        self.free_index = maze.index.ravel()  # Flat position -> maze cell index (-1 for walls)
+        self.free_flat = maze.cells[:, 0] * height + maze.cells[:, 1]  # Maze cell index -> flat position
+        self.free_row_major = self.free_flat[maze.row_major]
+        self.start_flat = agent_start_pos[0] * height + agent_start_pos[1]
+        self.template = np.append(np.where(maze.walls.ravel(), WALL, EMPTY), WALL).astype(np.int8)
+
+        # Flat position of every neighbour (DIR_TO_VEC order), `size` when it falls off the grid
+        neighbours = self.flat_xy[:, None, :] + DIR_TO_VEC[None, :, :]
+        inside = ((neighbours >= 0) & (neighbours < (self.width, self.height))).all(axis=2)
+        self.neighbours = np.where(inside, neighbours[..., 0] * height + neighbours[..., 1], size)
+        self.dir_offset = DIR_TO_VEC[:, 0] * height + DIR_TO_VEC[:, 1]
+        self.ghost_offset = GHOST_MOVES[:, 0] * height + GHOST_MOVES[:, 1]
+
+    # Random streams
+
+    def seed(self, seed=None):
+        """
+        Give every game its own random stream, keyed by (seed, game index).
+        """
+        entropy = np.random.SeedSequence(seed).entropy
+        self.rng_keys = np.array([np.random.SeedSequence(entropy, spawn_key=(i,)).generate_state(1, np.uint64)[0]
+                                  for i in range(self.n_envs)], dtype=np.uint64)
+        self.rng_counters = np.zeros(self.n_envs, dtype=np.uint64)
+
+    def _random(self, games, n):
+        """
+        Draw n uniform floats in [0, 1) from the stream of each selected game (splitmix64 over a per-game counter).
+        :return: Array of shape (len(games), n).
+        """
+        with np.errstate(over='ignore'):
+            counters = self.rng_counters[games][:, None] + np.arange(n, dtype=np.uint64)[None, :]
+            z = self.rng_keys[games][:, None] + counters * np.uint64(0x9E3779B97F4A7C15)
+            z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            z = z ^ (z >> np.uint64(31))
+        self.rng_counters[games] += np.uint64(n)
+        return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+    # Observations
+
+    def state_ids(self):
+        """
+        PacmanEnv.state_id of every game.
+        """
+        x, y = np.divmod(self.agent_pos, self.height)
+        return (y * self.width + x) * 4 + self.agent_dir
+
+    # Episode control
+
+    def reset(self, seed=None):
+        """
+        Start a new episode in every game.
+        :param seed: Reseeds every game's random stream, see seed().
+        :return: Tuple (state ids, info)
+        """
+        if seed is not None:
+            # A new seed starts a new run: also forget the state that carries over between episodes
+            self.seed(seed)
+            self.collision_cooldown[:] = 0
+            self.visited[:] = False
+            self.history[:] = -1
+            self.history_len[:] = 0
+        self._reset_games(np.arange(self.n_envs))
+        return self.state_ids(), {}
+
+    def _reset_games(self, games):
+        """
+        Lay out new pellets, ghosts and agent positions for the selected games, like PacmanEnv.reset: pellets on
+        random free cells, ghosts on the free cells left (never on the agent start cell) and the agent on a random
+        empty cell.
+        """
+        k = len(games)
+        if k == 0:
+            return
+        n_free = self.maze.n_cells
+        rows = np.arange(k)[:, None]
+
+        pellets = np.argsort(self._random(games, n_free), axis=1)[:, :self.n_pellets]
+
+        taken = np.zeros((k, n_free), dtype=bool)
+        taken[rows, pellets] = True
+        start = self.free_index[self.start_flat]
+        keys = np.where(taken, 2.0, self._random(games, n_free))
+        if start >= 0:
+            keys[:, start] = 2.0
+        ghosts = np.argsort(keys, axis=1)[:, :self.n_ghosts]
+
+        taken[rows, ghosts] = True
+        agent = np.where(taken, 2.0, self._random(games, n_free)).argmin(axis=1)
+
+        self.cells[games] = self.template
+        self.cells[games[:, None], self.free_flat[pellets]] = PELLET
+        self.cells[games[:, None], self.free_flat[ghosts]] = GHOST
+        self.ghost_index[games] = -1
+        self.ghost_index[games[:, None], self.free_flat[ghosts]] = np.arange(self.n_ghosts)
+        self.ghost_pos[games] = self.free_flat[ghosts]
+        self.agent_pos[games] = self.free_flat[agent]
+        self.agent_dir[games] = self.agent_start_dir
+        self.step_count[games] = 0
+        self.agent_steps[games] = 0
+        self.pellets_collected[games] = 0
+        self.remaining_pellets[games] = self.n_pellets
+        self.ghost_hits[games] = 0
+        self.cumulative_reward[games] = 0.0
+
+    def step(self, actions):
+        """
+        Step every game with one action each.
+        :param actions: Array of N actions (0: turn left, 1: turn right, 2: move forward). Invalid actions turn left,
+            as in PacmanEnv.
+        :return: Tuple (state ids, rewards, terminated, truncated, info). Finished games are reset before returning,
+            so their state id is the first state of the next episode; info['final_state'], info['episode_reward']
+            and info['collected_pellets'] hold the end of the finished episodes.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        actions = np.where((actions >= 0) & (actions < self.n_actions), actions, LEFT)
+
+        self.agent_steps += 1
+        self._move_ghosts(np.flatnonzero(self.agent_steps >= GHOSTS_START_AFTER))
+        truncated = self._move_agents(actions)
+        rewards, terminated = self._rewards(actions)
+        self.cumulative_reward += rewards
+
+        done = terminated | truncated
+        info = {
+            'final_state': self.state_ids(),
+            'episode_reward': self.cumulative_reward.copy(),
+            'collected_pellets': self.n_pellets - self.remaining_pellets,
+        }
+        self._reset_games(np.flatnonzero(done))
+
+        return self.state_ids(), rewards, terminated, truncated, info
+
+    # Game rules
+
+    def _move_ghosts(self, games):
+        """
+        Move every ghost of the selected games one cell in a random direction, if any is free. Ghosts move one at a
+        time, so a ghost sees the cells freed or taken by the ghosts before it.
+        """
+        if len(games) == 0:
+            return
+        draws = self._random(games, self.n_ghosts * 4).reshape(len(games), self.n_ghosts, 4)
+        for ghost in range(self.n_ghosts):
+            old = self.ghost_pos[games, ghost]
+            targets = old[:, None] + self.ghost_offset[None, :]
+            free = self.cells[games[:, None], targets] == EMPTY
+            # Trying random directions until one is free picks uniformly among the free ones
+            choice = np.where(free, draws[:, ghost], -1.0).argmax(axis=1)
+            moving = free.any(axis=1)
+            movers = games[moving]
+            new = targets[moving, choice[moving]]
+            old = old[moving]
+            self.cells[movers, new] = GHOST
+            self.ghost_index[movers, new] = ghost
+            self.cells[movers, old] = EMPTY
+            self.ghost_index[movers, old] = -1
+            self.ghost_pos[movers, ghost] = new
+
+    def _move_agents(self, actions):
+        """
+        Turn or move every agent (forward moves into walls are ignored).
+        :return: Truncation flags.
+        """
+        self.step_count += 1
+        self.agent_dir = np.where(actions == LEFT, (self.agent_dir - 1) % 4,
+                                  np.where(actions == RIGHT, (self.agent_dir + 1) % 4, self.agent_dir))
+        front = self.agent_pos + self.dir_offset[self.agent_dir]
+        moves = (actions == FORWARD) & (self.cells[np.arange(self.n_envs), front] != WALL)
+        self.agent_pos = np.where(moves, front, self.agent_pos)
+        return self.step_count >= self.max_steps
+
+    def _ghosts_in_grid(self):
+        rows = np.arange(self.n_envs)[:, None]
+        return self.ghost_index[rows, self.ghost_pos] == np.arange(self.n_ghosts)[None, :]
+
+    def _nearest(self, sources, targets, valid):
+        """
+        Nearest target of each game, chosen like a BFS from the source cell.
+        :param sources: Flat position of each game's source cell.
+        :param targets: (N, K) flat positions of the candidate targets.
+        :param valid: (N, K) mask of the targets that count.
+        :return: Tuple (flat position of the nearest target, found mask).
+        """
+        ranks = self.maze.order[self.free_index[sources][:, None], self.free_index[targets]]
+        ranks = np.where(valid, ranks, self.maze.n_cells)
+        best = ranks.argmin(axis=1)
+        rows = np.arange(len(sources))
+        return targets[rows, best], ranks[rows, best] < self.maze.n_cells
+
+    def _safe_spawns(self, games):
+        """
+        Respawn cells for the selected games, picked like PacmanEnv._find_safe_spawn: a random pellet cell at least
+        3 cells (straight line) from every ghost, else a random pellet or ghost cell, else the current cell.
+        """
+        k = len(games)
+        cells = self.free_row_major[None, :]
+        contents = self.cells[games[:, None], cells]
+        cell_xy = self.flat_xy[self.free_row_major]
+        ghost_xy = self.flat_xy[self.ghost_pos[games]]
+        offsets = cell_xy[None, :, None, :] - ghost_xy[:, None, :, :]
+        far = ((offsets ** 2).sum(axis=3) >= 9).all(axis=2)
+
+        safe = (contents == PELLET) & far
+        fallback = (contents == PELLET) | (contents == GHOST)
+        candidates = np.where(safe.any(axis=1)[:, None], safe, fallback)
+        counts = candidates.sum(axis=1)
+
+        pick = np.minimum((self._random(games, 1)[:, 0] * counts).astype(np.int64), np.maximum(counts - 1, 0))
+        chosen = (np.cumsum(candidates, axis=1) == (pick + 1)[:, None]) & candidates
+        spawn = self.free_row_major[chosen.argmax(axis=1)]
+        return np.where(counts > 0, spawn, self.agent_pos[games]).reshape(k)
+
+    def _rewards(self, actions):
+        """
+        Vectorised PacmanEnv.__calculate_rewards, applied after the agents moved.
+        :return: Tuple (rewards, terminated)
+        """
+        n = self.n_envs
+        games = np.arange(n)
+        rewards = np.zeros(n, dtype=np.float64)
+        terminated = np.zeros(n, dtype=bool)
+
+        front = self.agent_pos + self.dir_offset[self.agent_dir]
+        rewards -= (actions == FORWARD) & (self.cells[games, front] == WALL)
+
+        # Pellets
+        eating = self.cells[games, self.agent_pos] == PELLET
+        rewards += np.where(eating, 20 + 0.5 * self.pellets_collected, 0.0)
+        self.pellets_collected += eating
+        self.cells[games[eating], self.agent_pos[eating]] = EMPTY
+        self.remaining_pellets -= eating
+
+        # Ghost collisions
+        collision = (self.ghost_pos == self.agent_pos[:, None]).any(axis=1) | (self.cells[games, front] == GHOST)
+        hit = collision & (self.collision_cooldown == 0)
+        self.collision_cooldown = np.where(hit, self.collision_cooldown_duration,
+                                           np.where(collision, self.collision_cooldown,
+                                                    np.maximum(0, self.collision_cooldown - 1)))
+        self.ghost_hits += hit
+        game_over = hit & (self.ghost_hits >= TOTAL_LIVES)
+        rewards -= np.where(game_over, 50, np.where(hit, 30, 0))
+        terminated |= game_over
+
+        respawn = np.flatnonzero(hit & ~game_over)
+        if len(respawn):
+            spawns = self._safe_spawns(respawn)
+            old = self.agent_pos[respawn]
+            self.cells[respawn, old] = EMPTY  # Takes a ghost standing there off the grid, as in PacmanEnv
+            self.ghost_index[respawn, old] = -1
+            self.agent_pos[respawn] = spawns
+            self.agent_dir[respawn] = (self._random(respawn, 1)[:, 0] * 4).astype(np.int64)
+
+        agent_xy = self.flat_xy[self.agent_pos]
+
+        # Distance to the nearest pellet, before and after repeating the action
+        pellet_cells = np.broadcast_to(self.free_flat, (n, self.maze.n_cells))
+        pellet_pos, pellet_found = self._nearest(self.agent_pos, pellet_cells, self.cells[:, self.free_flat] == PELLET)
+        pellet_xy = np.where(pellet_found[:, None], self.flat_xy[pellet_pos], agent_xy)
+        pellet_offset = pellet_xy - agent_xy
+        current_distance = np.sqrt((pellet_offset ** 2).sum(axis=1))
+
+        new_dir = np.where(actions == LEFT, (self.agent_dir - 1) % 4,
+                           np.where(actions == RIGHT, (self.agent_dir + 1) % 4, self.agent_dir))
+        new_xy = agent_xy + np.where((actions == FORWARD)[:, None], DIR_TO_VEC[self.agent_dir], 0)
+        new_pos = new_xy[:, 0] * self.height + new_xy[:, 1]
+        new_distance = np.sqrt(((new_xy - pellet_xy) ** 2).sum(axis=1))
+
+        distance_penalized = new_distance > current_distance
+        closer = new_distance < current_distance
+        rewards -= np.where(distance_penalized, 0.5, 0.0)
+        rewards += np.where(closer, current_distance - new_distance, 0.0)
+
+        # Facing the nearest pellet
+        sign = np.sign(pellet_offset)
+        desired_dir = np.full(n, -1)
+        for direction, vec in enumerate(DIR_TO_VEC):
+            desired_dir = np.where((sign == vec).all(axis=1), direction, desired_dir)
+        desired_dir = np.where(desired_dir < 0, self.agent_dir, desired_dir)
+        rewards -= np.where(~distance_penalized & (new_distance <= 3) & (new_dir != desired_dir), 0.3, 0.0)
+        rewards += np.where((new_dir == desired_dir) & closer, 0.3, 0.0)
+
+        # Proximity to the nearest ghost
+        ghost_pos, ghost_found = self._nearest(self.agent_pos, self.ghost_pos, self._ghosts_in_grid())
+        ghost_xy = np.where(ghost_found[:, None], self.flat_xy[ghost_pos], agent_xy)
+        ghost_distance = np.sqrt(((ghost_xy - agent_xy) ** 2).sum(axis=1))
+        rewards += np.select([ghost_distance < 1.5, ghost_distance < 2.5, ghost_distance >= 3], [-1.2, -0.5, 0.5], 0.0)
+
+        # Exploration and repetition
+        unvisited = ~self.visited[games, new_pos]
+        rewards += np.where(unvisited, 2.0, 0.0)
+        self.visited[games, new_pos] = True
+
+        self.history[games, self.history_len % 10] = new_pos
+        self.history_len += 1
+        rewards -= np.where((self.history == new_pos[:, None]).sum(axis=1) > 3, 0.3, 0.0)
+
+        # Dead ends and open areas
+        neighbour_cells = self.cells[games[:, None], self.neighbours[new_pos]]
+        exits = ((neighbour_cells == PELLET) | (neighbour_cells == GHOST)).sum(axis=1)
+        rewards += np.select([exits <= 1, exits >= 3], [-2.0, 2.0], 0.0)
+
+        new_ghost_distance = np.sqrt(((new_xy - ghost_xy) ** 2).sum(axis=1))
+        rewards += np.where(new_ghost_distance > ghost_distance, 0.5, 0.0)
+
+        # All pellets collected
+        cleared = self.remaining_pellets == 0
+        rewards += np.where(cleared, 200, 0)
+        terminated |= cleared
+
+        return rewards, terminated
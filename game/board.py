@@ -0,0 +1,96 @@
+import numpy as np
+
+# Cell types of Board.cells. Like the minigrid Grid, the plane does not store the agent.
+EMPTY = 0
+WALL = 1
+PELLET = 2
+GHOST = 3
+
+
+class Board:
+    """
+    Compact array copy of the minigrid Grid used by the game logic.
+
+    - cells: int8 plane of shape (width, height) with the cell type of every position
+    - ghost_index: int8 plane with the index of the ghost shown at each GHOST cell (-1 elsewhere)
+    - ghost_positions: (n_ghosts, 2) array with the position of every ghost, including ghosts that are not shown
+      in the grid at the moment (see PacmanEnv._update_ghost_field)
+
+    Every change goes through set_cell, which records the position so the minigrid Grid can be brought up to date
+    with sync() only when something actually needs it (rendering or minigrid observations).
+    """
+
+    def __init__(self, width, height, n_ghosts=0):
+        self.width = width
+        self.height = height
+        self.cells = np.zeros((width, height), dtype=np.int8)
+        self.ghost_index = np.full((width, height), -1, dtype=np.int8)
+        self.ghost_positions = np.zeros((n_ghosts, 2), dtype=np.int32)
+        self.template = None  # Walls-only plane restored by clear()
+        self.dirty = set()
+
+    @classmethod
+    def from_walls(cls, walls, n_ghosts=0):
+        """
+        Build an empty board (walls only) from a boolean wall mask of shape (width, height).
+        """
+        board = cls(*walls.shape, n_ghosts)
+        board.template = np.where(walls, WALL, EMPTY).astype(np.int8)
+        board.cells[:] = board.template
+        return board
+
+    def clear(self):
+        """
+        Put the board back to its walls-only template, recording the cells that change for the next sync.
+        """
+        self.dirty.update(map(tuple, np.argwhere(self.cells != self.template).tolist()))
+        self.cells[:] = self.template
+        self.ghost_index.fill(-1)
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def set_cell(self, x, y, cell_type, ghost=-1):
+        """
+        Change the content of a cell.
+        :param cell_type: One of EMPTY, PELLET or GHOST.
+        :param ghost: Index of the ghost, for GHOST cells.
+        """
+        self.cells[x, y] = cell_type
+        self.ghost_index[x, y] = ghost
+        self.dirty.add((x, y))
+
+    def move_ghost(self, ghost, x, y):
+        """
+        Move a ghost to an empty cell, clearing the cell it leaves.
+        """
+        old_x, old_y = self.ghost_positions[ghost].tolist()
+        self.set_cell(x, y, GHOST, ghost)
+        self.set_cell(old_x, old_y, EMPTY)
+        self.ghost_positions[ghost] = x, y
+
+    def ghosts_in_grid(self):
+        """
+        Mask of the ghosts that are currently shown in the grid.
+        """
+        xs, ys = self.ghost_positions[:, 0], self.ghost_positions[:, 1]
+        return self.ghost_index[xs, ys] == np.arange(len(self.ghost_positions))
+
+    def sync(self, grid, ghosts, pellet):
+        """
+        Apply the cells changed since the last sync to a minigrid Grid.
+        :param ghosts: Ghost objects, in ghost index order.
+        :param pellet: Object to use for PELLET cells.
+        """
+        for x, y in self.dirty:
+            cell_type = self.cells[x, y]
+            if cell_type == GHOST:
+                obj = ghosts[self.ghost_index[x, y]]
+            elif cell_type == PELLET:
+                obj = pellet
+            else:
+                obj = None
+            grid.set(x, y, obj)
+        self.dirty.clear()
+        for ghost, (x, y) in zip(ghosts, self.ghost_positions.tolist()):
+            ghost.cur_pos = (x, y)
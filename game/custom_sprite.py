@@ -1,41 +1,62 @@
+from weakref import WeakKeyDictionary
+
+import numpy as np
 import pygame
 from minigrid.core.world_object import WorldObj
 
+# Sprites scaled to a tile, as arrays: image -> {tile_size: (rgb, mask)}. Entries go away with their image.
+_sprite_arrays = WeakKeyDictionary()
+
+
+def sprite_arrays(image, tile_size):
+    """
+    Return the image scaled to a tile as a (tile_size, tile_size, 3) RGB array and the mask of its non-transparent
+    pixels (repeated over the 3 channels), both in pygame.surfarray (x, y) order. They are computed once per image
+    and tile size.
+    """
+    sizes = _sprite_arrays.setdefault(image, {})
+    if tile_size not in sizes:
+        # Scale the image to fit the tile size and blit it onto a transparent background
+        scaled_image = pygame.transform.scale(image, (tile_size, tile_size))
+        transparent_bg = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+        transparent_bg.blit(scaled_image, (0, 0))
+        mask = pygame.surfarray.array_alpha(transparent_bg) > 0
+        sizes[tile_size] = (pygame.surfarray.array3d(transparent_bg), np.repeat(mask[:, :, None], 3, axis=2))
+    return sizes[tile_size]
+
 
 class CustomSprite(WorldObj):
     def __init__(self, obj, image, color='grey'):
         """
         Initialize a CustomSprite with a given object type and custom image.
+        The image may also be a callable returning the image, in which case it is only loaded on the first render.
         """
         super().__init__(obj.type, color)
         self.obj = obj
-        self.image = image
-
-    def can_overlap(self):
-        return self.obj.can_overlap()
-
-    def render(self, img):
-        tile_size = img.shape[0]
+        self._load_image = image if callable(image) else None
+        self._image = None if callable(image) else image
 
-        # Scale the image to fit the tile size
-        scaled_image = pygame.transform.scale(self.image, (tile_size, tile_size))
+    @property
+    def image(self):
+        if self._image is None:
+            self._image = self._load_image()
+        return self._image
 
-        # Create a Surface to handle transparency
-        transparent_bg = pygame.Surface((tile_size, tile_size), pygame.SRCALPHA)
+    def __getstate__(self):
+        # A loaded Surface can't be pickled: the copy keeps the loader and loads the image again when it renders
+        state = self.__dict__.copy()
+        if self._load_image is not None:
+            state['_image'] = None
+        return state
 
-        # Blit the scaled image onto the transparent background surface
-        transparent_bg.blit(scaled_image, (0, 0))
+    def __setstate__(self, state):
+        self.__dict__.update(state)
 
-        # Convert the transparent surface to a numpy array
-        final_image_array = pygame.surfarray.pixels3d(transparent_bg)
-        alpha_array = pygame.surfarray.pixels_alpha(transparent_bg)
+    def can_overlap(self):
+        return self.obj.can_overlap()
 
-        # Apply the transparent image to the grid cell (RGB only)
-        for x in range(tile_size):
-            for y in range(tile_size):
-                if alpha_array[x, y] > 0:  # Only apply non-transparent pixels
-                    img[x, y, :3] = final_image_array[x, y, :3]  # Apply RGB values only
+    def render(self, img):
+        rgb, mask = sprite_arrays(self.image, img.shape[0])
 
-        # Clean up the pixel arrays
-        del final_image_array
-        del alpha_array
+        # Apply the non-transparent pixels to the grid cell (RGB only)
+        np.copyto(img, rgb, where=mask)
@@ -1,10 +1,12 @@
+import copy
 import sys
 from collections import deque
-from operator import add
+from functools import partial
 from operator import itemgetter
 
 import numpy as np
-from gymnasium.spaces import Discrete
+from gymnasium.envs.registration import register, registry
+from gymnasium.spaces import Dict, Discrete, Text, Tuple
 from minigrid.core.constants import DIR_TO_VEC
 from minigrid.core.grid import Grid
 from minigrid.core.mission import MissionSpace
@@ -12,21 +14,18 @@ from minigrid.core.world_object import Goal, Wall, Lava
 from minigrid.minigrid_env import MiniGridEnv
 
 import pygame
-from pygame import freetype
 
+from . import ENV_ID
+from .assets import sprite, GHOST_IMAGE_PATHS, PACMAN_IMAGE_PATH, PELLET_IMAGE_PATH
+from .board import Board, EMPTY, WALL, PELLET, GHOST
 from .custom_sprite import CustomSprite
 from .maze import maze_walls
+from .maze_graph import compile_maze, PelletField, GhostField
+from .renderer import PacmanRenderer, RenderPolicy
 import random
 
-# Asset paths
-PACMAN_IMAGE_PATH = 'assets/images/pacman.png'
-GHOST_IMAGE_PATHS = {
-    'red': 'assets/images/ghosts/red.png',
-    'blue': 'assets/images/ghosts/blue.png',
-    'purple': 'assets/images/ghosts/purple.png',
-    'yellow': 'assets/images/ghosts/yellow.png'
-}
-PELLET_IMAGE_PATH = 'assets/images/orb.png'
+# Observation modes, see PacmanEnv.gen_obs
+OBS_MODES = ('image', 'state', 'id')
 
 
 class PacmanEnv(MiniGridEnv):
@@ -37,13 +36,30 @@ class PacmanEnv(MiniGridEnv):
     """
 
     def __init__(self, grid_size=24, agent_start_pos=(1, 1), agent_start_dir=0, n_pellets=30, n_ghosts=4,
-                 max_steps=2000, mode='Manual', algorithm=None, frames_per_second=10, seed=None, **kwargs):
+                 max_steps=2000, mode='Manual', algorithm=None, frames_per_second=10, seed=None,
+                 render_mode='human', obs_mode='image', render_policy=None, recorder=None, **kwargs):
+        """
+        :param render_mode: 'human' opens a pygame window and draws every step, 'rgb_array' returns frames from
+            render() and None runs headless: the display is never touched and sprites are only loaded if render()
+            is eventually called.
+        :param obs_mode: 'image' returns the minigrid observation dict, 'state' the get_state() tuple and 'id' a
+            single integer from state_id(). The compact modes never build the minigrid image, and observation_space
+            describes what they return.
+        :param render_policy: RenderPolicy deciding which steps are drawn in human mode (all of them by default).
+        :param recorder: FrameRecorder receiving the frames of the episodes it records, one per step. In human mode
+            they are the window's frames, also drawn off-screen for the steps render_policy does not show; in the
+            other modes the minigrid frame is rendered for every recorded step.
+        """
+        if obs_mode not in OBS_MODES:
+            raise ValueError(f"Unknown obs_mode '{obs_mode}', expected one of {OBS_MODES}")
         self.agent_start_pos = agent_start_pos
         self.agent_start_dir = agent_start_dir
         self.cumulative_reward = 0
         self.mode = mode
         self.algorithm = algorithm
-        self.seed = seed
+        self.seed = seed  # Layout seed used by reset() when it is not given one
+        self.rng = random.Random(seed)  # Ghost moves, agent placement and respawn, reseeded by reset(seed=...)
+        self.obs_mode = obs_mode
         self.frames_per_second = frames_per_second
         self.visited_positions = set()
         self.position_history = deque(maxlen=10)
@@ -55,10 +71,13 @@ class PacmanEnv(MiniGridEnv):
         self.ghost_collision_cooldown = 0
         self.ghost_collision_cooldown_duration = 10 
         self.ghost_hits = 0
-        self.episode_count = 0
-
-
-
+        self.episode_count = 0  # Episodes started by reset(), used by the render policy
+        self.render_policy = render_policy if render_policy is not None else RenderPolicy()
+        self.recorder = recorder
+        self.renderer = None  # Human-mode renderer, created on the first frame
+        self.pellet_field = None  # Nearest pellet of every cell, rebuilt in _gen_grid
+        self.board = None  # Array copy of the grid used by the game logic, built by the first _gen_grid
+        self._pellet_sprite = CustomSprite(Goal(), partial(sprite, PELLET_IMAGE_PATH))  # Drawn for PELLET cells
         # Environment-specific properties
         self.n_ghosts = n_ghosts
         self.n_pellets = n_pellets
@@ -70,7 +89,7 @@ class PacmanEnv(MiniGridEnv):
             f"Algorithm: {self.algorithm}       Reward: {self.cumulative_reward}        Pellets: {self.remaining_pellets}"
 
         # Define the mission
-        mission_space = MissionSpace(mission_func=lambda: self.mission_string)
+        mission_space = self._make_mission_space()
 
         if max_steps is None:
             max_steps = 4 * grid_size ** 2
@@ -80,62 +99,139 @@ class PacmanEnv(MiniGridEnv):
             grid_size=grid_size,
             max_steps=max_steps,
             see_through_walls=True,
-            render_mode='human',
+            render_mode=render_mode,
             highlight=False,
             **kwargs
         )
         self.action_space = Discrete(3)  # Actions: turn left, turn right, move forward
 
-        # Load custom images
-        self.pacman_image = pygame.image.load(PACMAN_IMAGE_PATH).convert_alpha()
-        self.pellet_image = pygame.image.load(PELLET_IMAGE_PATH).convert_alpha()
-        self.ghost_images = {color: pygame.image.load(path).convert_alpha() for color, path in GHOST_IMAGE_PATHS.items()}
-        self.agent_image = pygame.transform.rotate(self.pacman_image, -90 * self.agent_start_dir)
+        # Every (cell, direction) pair gets its own id, so tables indexed by state_id() have a fixed size
+        self.n_states = self.width * self.height * 4
+        if self.obs_mode == 'id':
+            self.observation_space = Discrete(self.n_states)
+        elif self.obs_mode == 'state':
+            self.observation_space = self._state_space()
+
+        # The walls never change, so shortest paths between free cells are precomputed once per maze
+        self.maze = compile_maze(self.width, self.height)
+        if self.n_pellets + self.n_ghosts + 1 > self.maze.n_cells:
+            raise ValueError(f"The maze only has {self.maze.n_cells} free cells for {self.n_pellets} pellets, "
+                             f"{self.n_ghosts} ghosts and the agent")
+        self.ghost_field = GhostField(self.maze)  # Refreshed whenever the ghosts move, see _update_ghost_field
+
+    def _make_mission_space(self):
+        return MissionSpace(mission_func=lambda: self.mission_string)
+
+    def __getstate__(self):
+        # pygame objects can't be pickled; the copy opens its own window when it renders.
+        # The recorder's writer thread stays with the original.
+        # The mission space holds a lambda, so it is rebuilt by __setstate__.
+        state = self.__dict__.copy()
+        state.update(window=None, clock=None, renderer=None, mission_space=None, recorder=None)
+        if isinstance(self.observation_space, Dict):
+            state['observation_space'] = Dict({key: space for key, space in self.observation_space.items()
+                                               if key != 'mission'})
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.mission_space = self._make_mission_space()
+        if isinstance(self.observation_space, Dict):
+            self.observation_space = Dict({**self.observation_space.spaces, 'mission': self.mission_space})
+
+    # Sprites come from the process-wide cache in assets.py, loaded the first time anything renders, so headless
+    # environments never read the images
+    @property
+    def pacman_image(self):
+        return sprite(PACMAN_IMAGE_PATH)
+
+    @property
+    def pellet_image(self):
+        return sprite(PELLET_IMAGE_PATH)
+
+    @property
+    def ghost_images(self):
+        return {color: sprite(path) for color, path in GHOST_IMAGE_PATHS.items()}
+
+    @property
+    def agent_image(self):
+        return sprite(PACMAN_IMAGE_PATH, self.agent_start_dir)
+
+    @property
+    def grid(self):
+        """
+        The minigrid Grid, brought up to date with the board. The game logic only reads and writes the board, so
+        the Grid is synced here, when rendering or minigrid observations actually need it.
+        """
+        board = self.__dict__.get('board')
+        if board is not None and board.dirty:
+            board.sync(self._grid, self.obstacles, self._pellet_sprite)
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid):
+        # A new grid replaces the board as well; _gen_grid builds a new one on the next reset
+        self._grid = grid
+        self.board = None
 
     def _gen_grid(self, width, height):
         """
-        Generate the grid for the environment.
+        Generate the grid for the environment. The walls never change, so the Grid, the board and the ghost sprites
+        are only built for the first episode. Later episodes put the board back to its walls-only template with an
+        array copy and draw new pellet and ghost cells from the maze's free-cell index in one go; the Grid catches
+        up lazily (see the grid property).
         :param width: The width of the grid
         :param height: The height of the grid
         """
-        self.grid = Grid(width, height)
+        if self.board is None:
+            self.grid = Grid(width, height)
 
-        # Generate the surrounding walls
-        self.grid.wall_rect(0, 0, width, height)
+            # Generate the surrounding walls
+            self.grid.wall_rect(0, 0, width, height)
 
-        # Create a Pacman-like maze structure
-        self.__create_maze()
+            # Create a Pacman-like maze structure
+            self.__create_maze()
+
+            # Ghosts with different colors, using Lava for ghosts
+            ghost_colors = ['red', 'blue', 'purple', 'yellow']
+            self.obstacles = []
+            for i in range(self.n_ghosts):
+                color = ghost_colors[i % len(ghost_colors)]
+                # Ghost images are shown turned a quarter counter-clockwise
+                self.obstacles.append(CustomSprite(Lava(), partial(sprite, GHOST_IMAGE_PATHS[color], 3), color))
+
+            self.board = Board.from_walls(self.maze.walls, self.n_ghosts)
+        else:
+            self.board.clear()
+
+        # One draw of distinct free cells: the pellets, then the ghosts (one spare in case the agent start is hit)
+        picks = self.maze.cells[self.np_random.choice(self.maze.n_cells, size=self.n_pellets + self.n_ghosts + 1,
+                                                      replace=False)].tolist()
 
         # Place goals (pellets) throughout the maze
-        self.__place_pellets(n_pellets=self.n_pellets)
+        self.__place_pellets(picks[:self.n_pellets])
 
         # Place the agent (Pacman)
         self.agent_pos = self.agent_start_pos
         self.agent_dir = self.agent_start_dir
 
-        # Place dynamic obstacles (ghosts) with different colors
-        self.obstacles = []
-        ghost_colors = ['red', 'blue', 'purple', 'yellow']
+        # Place dynamic obstacles (ghosts), never on the agent
+        ghost_cells = [pos for pos in picks[self.n_pellets:] if tuple(pos) != tuple(self.agent_pos)]
+        for i, (ghost, (x, y)) in enumerate(zip(self.obstacles, ghost_cells)):
+            self.board.set_cell(x, y, GHOST, i)
+            self.board.ghost_positions[i] = x, y
+            ghost.init_pos = (x, y)
 
-        # Creating and placing ghosts with different colors
-        for i in range(self.n_ghosts):
-            color = ghost_colors[i % len(ghost_colors)]
-            ghost_image = pygame.transform.rotate(self.ghost_images[color], 90)  # Rotate image 90 degrees to the right
-            ghost = CustomSprite(Lava(), ghost_image, color)  # Using Lava for ghosts
-            self.obstacles.append(ghost)
-            self.place_obj(ghost)
+        self._update_ghost_field()
 
-            # Ensure that the ghost's current position is set after placing it
-            ghost.obj.cur_pos = ghost.obj.init_pos if ghost.obj.init_pos else self._rand_pos(1, width - 1, 1,
-                                                                                             height - 1)
-
-    def __place_pellets(self, n_pellets):
+    def __place_pellets(self, positions):
         """
-        Randomly place goals (pellets) around the grid in open spaces.
-        :param n_pellets: The number of pellets to place in the grid
+        Place goals (pellets) on the given cells.
+        :param positions: (x, y) cells of the pellets
         """
-        for _ in range(n_pellets):
-            self.place_obj(CustomSprite(Goal(), self.pellet_image), max_tries=100)
+        for x, y in positions:
+            self.board.set_cell(x, y, PELLET)
+        self.pellet_field = PelletField(self.maze, positions)
 
     def __create_maze(self):
         """
@@ -154,7 +250,7 @@ class PacmanEnv(MiniGridEnv):
         Check if the given position is within the grid boundaries.
         """
         x, y = pos
-        return 0 <= x < self.grid.width and 0 <= y < self.grid.height
+        return 0 <= x < self.width and 0 <= y < self.height
 
     def get_state(self):
         """
@@ -200,6 +296,68 @@ class PacmanEnv(MiniGridEnv):
         # Convert dictionary to a sorted tuple of items to make it hashable
         #return tuple(sorted(state.items()))
 
+    def _state_space(self):
+        """
+        Observation space of the get_state() tuple, (('agent_dir', dir), ('agent_pos', (x, y))).
+        """
+        def name(key):
+            return Text(len(key), min_length=len(key), charset=key)
+
+        return Tuple((Tuple((name('agent_dir'), Discrete(4))),
+                      Tuple((name('agent_pos'), Tuple((Discrete(self.width), Discrete(self.height)))))))
+
+    def state_id(self):
+        """
+        Encode the agent's position and direction as a single integer in [0, n_states).
+        """
+        x, y = self.agent_pos
+        return (int(y) * self.width + int(x)) * 4 + int(self.agent_dir)
+
+    def state_encoding(self):
+        """
+        Description of the ids returned by state_id(), saved with Q-tables so they are only loaded for
+        environments that number their states the same way.
+        """
+        return {'name': 'cell-direction', 'width': self.width, 'height': self.height, 'directions': 4}
+
+    # Attributes that carry over from one episode to the next; reset() rebuilds everything else
+    CARRY_OVER = ('visited_positions', 'position_history', 'pellets_in_a_row', 'pellet_streak', 'survival_steps',
+                  'last_reward_was_pellet', 'ghost_collision_cooldown', 'ghost_collision_cooldown_duration',
+                  'blink_timer', 'episode_count', 'current_episode')
+
+    def checkpoint_state(self):
+        """
+        Everything the next episodes depend on apart from the settings: the random generators (game moves, layout
+        and action sampling) and the attributes in CARRY_OVER. Taken between episodes, see restore_checkpoint_state.
+        """
+        return {
+            'rng': self.rng.getstate(),
+            'np_random': self.np_random.bit_generator.state,
+            'action_space': self.action_space.np_random.bit_generator.state,
+            'attributes': {name: copy.deepcopy(getattr(self, name)) for name in self.CARRY_OVER if hasattr(self, name)},
+        }
+
+    def restore_checkpoint_state(self, state):
+        """
+        Restore a checkpoint_state() taken between episodes, so the following episodes are played exactly as they
+        would have been by the environment it was taken from.
+        """
+        self.rng.setstate(state['rng'])
+        self.np_random.bit_generator.state = state['np_random']
+        self.action_space.np_random.bit_generator.state = state['action_space']
+        for name, value in state['attributes'].items():
+            setattr(self, name, copy.deepcopy(value))
+
+    def gen_obs(self):
+        """
+        Generate the observation for the configured obs_mode. Only 'image' pays for the minigrid view encoding.
+        """
+        if self.obs_mode == 'id':
+            return self.state_id()
+        if self.obs_mode == 'state':
+            return self.get_state()
+        return super().gen_obs()
+
     @staticmethod
     def bfs_nearest_object(agent_pos, grid, target_type):
         """
@@ -239,17 +397,26 @@ class PacmanEnv(MiniGridEnv):
 
         return 0, 0  # Return (0, 0) if no target object is found
 
+    def _update_ghost_field(self):
+        """
+        Recompute the ghost field from the current ghost positions. A ghost is taken off the grid when Pacman
+        respawns from its cell and comes back on its next move, so the grid membership is tracked too.
+        """
+        self.ghost_field.update(self.board.ghost_positions, self.board.ghosts_in_grid())
+
     def _nearest_pellet(self):
         """
-        Calculate the relative position of the nearest pellet.
+        Calculate the relative position of the nearest pellet. Same result as bfs_nearest_object, read from the
+        pellet field in O(1).
         """
-        return self.bfs_nearest_object(self.agent_pos, self.grid, 'goal')
+        return self.pellet_field.nearest_offset(self.agent_pos)
 
     def _nearest_ghost(self):
         """
-        Calculate the relative position of the nearest ghost.
+        Calculate the relative position of the nearest ghost. Same result as bfs_nearest_object, read from the
+        ghost field computed for this tick.
         """
-        return self.bfs_nearest_object(self.agent_pos, self.grid, 'lava')
+        return self.ghost_field.nearest_offset(self.agent_pos)
     
     #NOVOS METODOS
 
@@ -257,10 +424,10 @@ class PacmanEnv(MiniGridEnv):
         # Verifica se a posição está dentro dos limites do mapa e se não é uma parede.
         if not self.__is_in_bounds(pos):
             return False # Fora dos limites do mapa
-        cell = self.grid.get(pos[0], pos[1])
-        if cell is None:
+        cell = self.board.cells[pos[0], pos[1]]
+        if cell == EMPTY:
             return False # Célula vazia (não existente)
-        if cell.type == 'wall': 
+        if cell == WALL:
             return False # Posição é uma parede, não pode passar
         return True # Posição é válida
     
@@ -285,30 +452,21 @@ class PacmanEnv(MiniGridEnv):
     def _find_safe_spawn(self):
         """
         Procura uma posição segura onde o Pacman pode renascer após colidir com um fantasma.
+        Candidates are the pellet cells at least 3 cells (straight line) away from every ghost, picked in the same
+        row-major order as a scan of the grid.
         """
-        possible_positions = []
-
-        for y in range(self.grid.height):
-            for x in range(self.grid.width):
-                pos = (x, y)
-                cell = self.grid.get(x, y)
-                if cell is not None and cell.type not in ['wall', 'lava']:
-                    # Verifica se está longe de fantasmas
-                    if all(np.linalg.norm(np.array(pos) - np.array(ob.cur_pos)) >= 3 for ob in self.obstacles):
-                        possible_positions.append(pos)
+        cells = self.maze.row_major
+        safe = self.pellet_field.alive & self.ghost_field.far_from_ghosts(3)
+        possible_positions = cells[safe[cells]]
 
-        if possible_positions:
-            return random.choice(possible_positions)  # escolhe uma posição segura aleatória
+        if len(possible_positions):
+            return tuple(int(v) for v in self.maze.cells[self.rng.choice(possible_positions)])  # escolhe uma posição segura aleatória
 
         # fallback: escolhe qualquer posição livre
-        fallback_positions = [
-            (x, y)
-            for y in range(self.grid.height)
-            for x in range(self.grid.width)
-            if self.grid.get(x, y) is not None and self.grid.get(x, y).type != 'wall'
-        ]
-        if fallback_positions:
-            return random.choice(fallback_positions)
+        occupied = self.pellet_field.alive | self.ghost_field.alive
+        fallback_positions = cells[occupied[cells]]
+        if len(fallback_positions):
+            return tuple(int(v) for v in self.maze.cells[self.rng.choice(fallback_positions)])
 
         return self.agent_pos  # última opção
 
@@ -338,15 +496,16 @@ class PacmanEnv(MiniGridEnv):
             self.survival_steps = 0
 
         # Helper variables
-        front_cell = self.grid.get(*self.front_pos)
+        front_pos = self.front_pos
+        front_cell = self.board.cells[front_pos[0], front_pos[1]]
 
         # Check if the agent attempts to move into a wall
-        if action == self.actions.forward and front_cell is not None and front_cell.type == 'wall':
+        if action == self.actions.forward and front_cell == WALL:
             reward -= 1
 
         # Recompença por apanhar um pellet
-        current_cell = self.grid.get(*self.agent_pos)
-        if current_cell and current_cell.type == 'goal':
+        current_cell = self.board.cells[self.agent_pos[0], self.agent_pos[1]]
+        if current_cell == PELLET:
             if not hasattr(self, 'pellets_collected'):
                 self.pellets_collected = 0
 
@@ -358,13 +517,14 @@ class PacmanEnv(MiniGridEnv):
 
             self.last_reward_was_pellet = True
             self.pellets_in_a_row = getattr(self, 'pellets_in_a_row', 0) + 0.5 # Se quiseres manter bónus por sequência
-            self.grid.set(self.agent_pos[0], self.agent_pos[1], None)
+            self.board.set_cell(self.agent_pos[0], self.agent_pos[1], EMPTY)
+            self.pellet_field.remove(self.agent_pos)
             self.remaining_pellets -= 1
 
 
         is_ghost_collision = (
-            any(obstacle.cur_pos == self.agent_pos for obstacle in self.obstacles) or
-            (front_cell is not None and front_cell.type == 'lava')
+            self.ghost_field.collides(self.agent_pos) or
+            front_pos in self.ghost_field
         )
 
         if is_ghost_collision:
@@ -391,9 +551,10 @@ class PacmanEnv(MiniGridEnv):
 
                     # Renascer noutro local
                     safe_pos = self._find_safe_spawn()
-                    self.grid.set(self.agent_pos[0], self.agent_pos[1], None)  # limpa posição anterior
+                    self.board.set_cell(self.agent_pos[0], self.agent_pos[1], EMPTY)  # limpa posição anterior
+                    self._update_ghost_field()  # a ghost standing on that cell has just left the grid
                     self.agent_pos = safe_pos
-                    self.agent_dir = random.randint(0, 3)  # direção aleatória (opcional)
+                    self.agent_dir = self.rng.randint(0, 3)  # direção aleatória (opcional)
 
             else:
                 # Está em cooldown — ainda colidiu, mas não conta como nova
@@ -507,6 +668,33 @@ class PacmanEnv(MiniGridEnv):
 
         return reward, terminated
 
+    def __move_agent(self, action):
+        """
+        Turn or move the agent with the same rules as MiniGridEnv.step, reading walls from the board instead of the
+        minigrid Grid.
+        :param action: The action to execute (0: turn left, 1: turn right, 2: move forward)
+        :return: Tuple (obs, truncated)
+        """
+        self.step_count += 1
+
+        if action == self.actions.left:
+            self.agent_dir = (self.agent_dir - 1) % 4
+        elif action == self.actions.right:
+            self.agent_dir = (self.agent_dir + 1) % 4
+        elif action == self.actions.forward:
+            x, y = self.front_pos
+            if self.board.cells[x, y] != WALL:
+                self.agent_pos = (int(x), int(y))
+
+        truncated = self.step_count >= self.max_steps
+
+        if self.render_mode == "human":
+            self._render_step()
+        elif self.recorder is not None and self.recorder.recording:
+            self.recorder.capture(self.get_frame(self.highlight, self.tile_size, self.agent_pov))
+
+        return self.gen_obs(), truncated
+
     def step(self, action):
         """
         Execute the given action in the environment.
@@ -524,26 +712,26 @@ class PacmanEnv(MiniGridEnv):
 
         # Update obstacle (ghost) positions without diagonal movement
         if self.agent_steps >= 50: #Os fantasmas só andam depois do agente fazer 50 ações
-            for obstacle in self.obstacles:
-                old_pos = obstacle.cur_pos
-
+            cells = self.board.cells
+            for ghost, (x, y) in enumerate(self.board.ghost_positions.tolist()):
                 #Determine a random direction for the ghost to move (up, down, left, or right)
                 directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-                valid_move = False
 
-                while not valid_move and directions:
-                    move = random.choice(directions)
+                while directions:
+                    move = self.rng.choice(directions)
                     directions.remove(move)
-                    new_pos = tuple(map(add, old_pos, move))
+                    new_x, new_y = x + move[0], y + move[1]
+
+                    if self.__is_in_bounds((new_x, new_y)) and cells[new_x, new_y] == EMPTY:
+                        self.board.move_ghost(ghost, new_x, new_y)
+                        break
 
-                    if self.__is_in_bounds(new_pos) and self.grid.get(*new_pos) is None:
-                        self.grid.set(new_pos[0], new_pos[1], obstacle)
-                        self.grid.set(old_pos[0], old_pos[1], None)
-                        obstacle.cur_pos = new_pos
-                        valid_move = True
+            # One ghost field per tick, shared by the proximity penalty, collision checks and respawn
+            self._update_ghost_field()
 
         # Update agent's position/direction
-        obs, reward, terminated, truncated, info = super().step(action)
+        obs, truncated = self.__move_agent(action)
+        info = {}
 
         # Call the reward function to calculate reward and termination
         reward, terminated = self.__calculate_rewards(action)
@@ -570,26 +758,33 @@ class PacmanEnv(MiniGridEnv):
         return obs, reward, terminated, truncated, info
 
     def reset(self, seed=None, options=None):
-        # Call the parent reset method which initializes everything
-        obs, info = super().reset(seed=self.seed, options=options)
-
-        # Create a list of available positions
-        available_positions = [
-            (x, y)
-            for x in range(self.grid.width)
-            for y in range(self.grid.height)
-            if self.grid.get(x, y) is None
-        ]
-
-
-        # Filter out positions occupied by ghosts
-        ghost_positions = {obstacle.cur_pos for obstacle in self.obstacles}
-        available_positions = [
-            pos for pos in available_positions if pos not in ghost_positions
-        ]
-
-        # Randomly select a new position for the agent from the available positions
-        self.agent_pos = random.choice(available_positions)
+        """
+        Start a new episode.
+        :param seed: Seeds both the layout (pellets and ghosts) and the game's random moves, as in gymnasium, and
+            clears the state that otherwise carries over between episodes (visited cells, position history and
+            collision cooldown), so the same seed and actions give the same episode. Without it the layout uses the
+            seed given to the constructor, if any (the same layout every episode), and the rest continues.
+        """
+        if seed is not None:
+            self.rng.seed(seed)
+            self.visited_positions = set()
+            self.position_history = deque(maxlen=10)
+            self.ghost_collision_cooldown = 0
+
+        # Same steps as MiniGridEnv.reset, which is skipped (gymnasium.Env.reset only seeds np_random) so the
+        # observation and first frame are produced after the agent is moved to its random start cell
+        super(MiniGridEnv, self).reset(seed=self.seed if seed is None else seed)
+        self.agent_pos = (-1, -1)
+        self.agent_dir = -1
+        self._gen_grid(self.width, self.height)
+        self.carrying = None
+        self.step_count = 0
+        self.episode_count += 1
+
+        # Randomly select a new position for the agent from the empty cells (column by column)
+        cells = self.maze.cells
+        available_positions = cells[self.board.cells[cells[:, 0], cells[:, 1]] == EMPTY]
+        self.agent_pos = tuple(int(v) for v in self.rng.choice(available_positions))
         self.agent_dir = self.agent_start_dir
         self.cumulative_reward = 0
         self.remaining_pellets = self.n_pellets
@@ -597,16 +792,54 @@ class PacmanEnv(MiniGridEnv):
         self.pellets_collected = 0
         self.ghost_hits = 0
 
-        return obs, info
+        if self.recorder is not None:
+            self.recorder.start_episode(self.episode_count)
+        if self.render_mode == "human":
+            self._render_step()
+        elif self.recorder is not None and self.recorder.recording:
+            self.recorder.capture(self.get_frame(self.highlight, self.tile_size, self.agent_pov))
+
+        return self.gen_obs(), {}
+
+    def _render_step(self):
+        """
+        Draw the current step in human mode if the render policy wants it, otherwise keep the window responsive.
+        """
+        policy = self.render_policy
+        if policy.episode_shown(self.episode_count) and policy.frame_due():
+            self.render()
+            return
+        # Recordings keep every step, whether or not it is shown
+        if self.recorder is not None and self.recorder.recording:
+            self._draw_frame()
+        if self.window is not None and policy.events_due():
+            self._handle_window_events()
+
+    def _draw_frame(self):
+        """
+        Bring the human-mode frame up to date, off-screen, and hand it to the recorder if it is recording.
+        :return: The frame as a pygame Surface the size of the window.
+        """
+        if self.renderer is None:
+            self.renderer = PacmanRenderer(self)
+        # Only the tiles that changed since the last frame are redrawn
+        bg = self.renderer.draw()
+        if self.recorder is not None and self.recorder.recording:
+            self.recorder.capture(pygame.surfarray.array3d(bg).swapaxes(0, 1))
+        return bg
+
+    def _handle_window_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                pygame.quit()
+                sys.exit()
 
     # Custom rendering function
     def render(self):
-        img = self.get_frame(self.highlight, self.tile_size, self.agent_pov)
-
         if self.render_mode == "human":
-            img = np.transpose(img, axes=(1, 0, 2))
-            if self.render_size is None:
-                self.render_size = img.shape[:2]
             if self.window is None:
                 pygame.init()
                 pygame.display.init()
@@ -616,56 +849,23 @@ class PacmanEnv(MiniGridEnv):
                 pygame.display.set_caption("PacmanRL: Reinforcement Learning for Pacman")
             if self.clock is None:
                 self.clock = pygame.time.Clock()
-            surf = pygame.surfarray.make_surface(img)
-
-            # Draw the agent with the custom sprite
-            agent_tile_size = self.tile_size
-            agent_x, agent_y = self.agent_pos
-            agent_dir = self.agent_dir
-
-            # Rotate the agent image to align with the current direction
-            rotated_agent_image = pygame.transform.rotate(self.agent_image, -90 * agent_dir)
-            agent_image = pygame.transform.scale(rotated_agent_image, (agent_tile_size, agent_tile_size))
-
-            # Calculate the pixel position of the agent on the surface
-            agent_px_x = agent_x * self.tile_size
-            agent_px_y = agent_y * self.tile_size
-
-            # Blit the agent image onto the surface
-            surf.blit(agent_image, (agent_px_x, agent_px_y))
-
-            # Create background with mission description
-            offset = surf.get_size()[0] * 0.1
-            bg = pygame.Surface(
-                (int(surf.get_size()[0] + offset), int(surf.get_size()[1] + offset))
-            )
-            bg.convert()
-            bg.fill((0, 0, 0))
-            bg.blit(surf, (offset / 2, 0))
-
-            bg = pygame.transform.smoothscale(bg, (self.screen_size, self.screen_size))
-
-            font_size = 22
-            text = self.mission
-            font = freetype.SysFont("Calibri", font_size)
-            text_rect = font.get_rect(text, size=font_size)
-            text_rect.center = bg.get_rect().center
-            text_rect.y = bg.get_height() - font_size * 1.5
-            font.render_to(bg, text_rect, text, fgcolor=(255, 255, 255), size=font_size)
-
-            self.window.blit(bg, (0, 0))
+
+            self.window.blit(self._draw_frame(), (0, 0))
             pygame.event.pump()
             self.metadata["render_fps"] = self.frames_per_second
-            self.clock.tick(self.metadata["render_fps"])
+            if self.render_policy.throttled:
+                self.clock.tick(self.metadata["render_fps"])
             pygame.display.flip()
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+            self._handle_window_events()
 
         elif self.render_mode == "rgb_array":
-            return img
+            return self.get_frame(self.highlight, self.tile_size, self.agent_pov)
+
+
+if ENV_ID not in registry:
+    register(
+        id=ENV_ID,
+        entry_point='game.environment:PacmanEnv',
+        kwargs={'mode': 'Training', 'render_mode': None, 'obs_mode': 'id'},
+    )
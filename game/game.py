@@ -1,9 +1,41 @@
+import importlib
+import os
 import sys
-import pygame
-from agents.q_learning import QLearning
-from agents.sarsa import SARSA
-from .environment import PacmanEnv
-from minigrid.manual_control import ManualControl
+from .settings import CHECKPOINT_FILES, DEFAULT_SETTINGS, LEGACY_MODEL_FILES, MODEL_FILES, TEST_EPISODES
+
+# pygame, the environment (minigrid), the agents and minigrid's ManualControl are imported by the session that needs
+# them, so importing Game (the GUI does it at start-up) stays cheap
+
+# Agent class of every algorithm, as (module, class name)
+AGENTS = {'Q-Learning': ('agents.q_learning', 'QLearning'), 'SARSA': ('agents.sarsa', 'SARSA'),
+          'Q(lambda)': ('agents.q_lambda', 'WatkinsQLambda'), 'SARSA(lambda)': ('agents.sarsa_lambda', 'SARSALambda'),
+          'Dyna-Q': ('agents.dyna_q', 'DynaQ'),
+          'Prioritized Sweeping': ('agents.prioritized_sweeping', 'PrioritizedSweeping')}
+
+# Agent arguments taken from the settings by the algorithms that have them, as {argument: setting}
+TRACE_SETTINGS = {'lam': 'trace_decay', 'trace_cutoff': 'trace_cutoff'}
+AGENT_SETTINGS = {'Q(lambda)': TRACE_SETTINGS, 'SARSA(lambda)': TRACE_SETTINGS,
+                  'Dyna-Q': {'planning_steps': 'planning_steps', 'replay_capacity': 'replay_capacity'},
+                  'Prioritized Sweeping': {'planning_steps': 'planning_steps', 'threshold': 'sweep_threshold',
+                                           'queue_size': 'sweep_queue_size'}}
+
+
+def agent_class(algorithm):
+    module, name = AGENTS[algorithm]
+    return getattr(importlib.import_module(module), name)
+
+
+def saved_model_file(algorithm):
+    """
+    The algorithm's model file, or the pickle an older version saved if only that one exists. Those pickles are
+    keyed by minigrid image observations, so they only load with obs_mode='image' (read_q_table refuses them for
+    state ids rather than playing a table that matches no state).
+    """
+    filename = MODEL_FILES[algorithm]
+    legacy_filename = LEGACY_MODEL_FILES.get(algorithm)
+    if not os.path.exists(filename) and legacy_filename is not None and os.path.exists(legacy_filename):
+        return legacy_filename
+    return filename
 
 
 class Game:
@@ -13,25 +45,11 @@ class Game:
         self.env = None
 
         # Default game settings
-        self.default_settings = {
-            'grid_size': 24,
-            'n_ghosts': 4,
-            'n_pellets': 30,
-            'mode': 'Manual',
-            'algorithm': None,  # None means no specific algorithm chosen
-            'speed': 60,  # Frames per second
-            'deterministic': True,
-            'epsilon': 1.0,
-            'epsilon_decay': 0.995,
-            'min_epsilon' : 0.05,
-            'discount_factor': 0.9,
-            'learning_rate': 0.2,
-            'num_episodes': 1000
-        }
-
-        self.clock = pygame.time.Clock()
+        self.default_settings = dict(DEFAULT_SETTINGS)
 
     def start_game(self, **kwargs):
+        import pygame
+
         # Apply settings, using defaults for any missing values
         self.game_settings = {**self.default_settings, **kwargs}
 
@@ -41,80 +59,169 @@ class Game:
               f"-> Mode={self.game_settings['mode']}\n"
               f"-> Algorithm={self.game_settings['algorithm']}\n"
               f"-> Speed={self.game_settings['speed']}\n"
-              f"-> Deterministic={self.game_settings['deterministic']}")
+              f"-> Deterministic={self.game_settings['deterministic']}\n"
+              f"-> Headless={self.game_settings['headless']}\n"
+              f"-> Observation={self.game_settings['obs_mode']}\n"
+              f"-> Render Every={self.game_settings['render_every']}\n"
+              f"-> Render Last={self.game_settings['render_last']}\n"
+              f"-> Render Max FPS={self.game_settings['render_max_fps']}\n"
+              f"-> Record Dir={self.game_settings['record_dir']}")
 
         print(f"[GAME] RL Settings:\n"
               f"-> Num Episodes={self.game_settings['num_episodes']}\n"
               f"-> Epsilon={self.game_settings['epsilon']}\n"
               f"-> Epsilon Decay={self.game_settings['epsilon_decay']}\n"
               f"-> Discount Factor={self.game_settings['discount_factor']}\n"
-              f"-> Learning Rate={self.game_settings['learning_rate']}\n")
+              f"-> Learning Rate={self.game_settings['learning_rate']}\n"
+              f"-> Checkpoint Every={self.game_settings['checkpoint_every']} episodes / "
+              f"{self.game_settings['checkpoint_seconds']} s\n"
+              f"-> Resume={self.game_settings['resume']}\n")
 
         # Close the current Pygame window if open
         pygame.quit()
 
+        # Manual mode always needs a window; the RL modes can run without touching the display at all
+        headless = self.game_settings['headless'] and self.game_settings['mode'] != "Manual"
+
         # Initialize a new Pygame window
-        pygame.init()
-        pygame.display.set_mode((900, 900))
+        if not headless:
+            pygame.init()
+            pygame.display.set_mode((900, 900))
 
-        # Initialize the Pacman Minigrid environment
-        self.env = PacmanEnv(
-            grid_size=self.game_settings['grid_size'],
-            n_ghosts=self.game_settings['n_ghosts'],
-            n_pellets=self.game_settings['n_pellets'],
-            mode=self.game_settings['mode'],
-            algorithm=self.game_settings['algorithm'],
-            frames_per_second=self.game_settings['speed'],
-            seed=1 if self.game_settings['deterministic'] else None
-        )
+        self.create_env(headless)
         print("Action Space:", self.env.action_space)
 
         # Start the game in Manual mode
         if self.game_settings['mode'] == "Manual":
+            from minigrid.manual_control import ManualControl
+
             manual_control = ManualControl(self.env)
             manual_control.start()
 
         # Start the game in Training mode
         if self.game_settings['mode'] == "Training":
-            if self.game_settings['algorithm'] == 'Q-Learning':
-                print("[GAME] Training Q-Learning agent...")
-                q_learning_agent = QLearning(
-                    self.env,
-                    epsilon=self.game_settings['epsilon'],
-                    epsilon_decay=self.game_settings['epsilon_decay'],
-                    gamma=self.game_settings['discount_factor'],
-                    alpha=self.game_settings['learning_rate']
-                )
-                q_learning_agent.train(num_episodes=self.game_settings['num_episodes'])
-                q_learning_agent.save_q_table(filename='models/q_learning_solution.pkl')
-                self.game_started = False
-            elif self.game_settings['algorithm'] == 'SARSA':
-                print("[GAME] Training SARSA agent...")
-                sarsa_agent = SARSA(
-                    self.env,
-                    epsilon=self.game_settings['epsilon'],
-                    epsilon_decay=self.game_settings['epsilon_decay'],
-                    gamma=self.game_settings['discount_factor'],
-                    alpha=self.game_settings['learning_rate']
-                )
-                sarsa_agent.train(num_episodes=self.game_settings['num_episodes'])
-                sarsa_agent.save_q_table(filename='models/sarsa_solution.pkl')
-                self.game_started = False
+            self.train()
 
         # Start the game in Testing mode
         elif self.game_settings['mode'] == "Testing":
-            if self.game_settings['algorithm'] == 'Q-Learning':
-                print("[GAME] Testing Q-Learning agent...")
-                q_learning_agent = QLearning(self.env)
-                q_learning_agent.load_q_table(filename='models/q_learning_solution.pkl')
-                q_learning_agent.test(num_episodes=100)
-            elif self.game_settings['algorithm'] == 'SARSA':
-                print("[GAME] Testing SARSA agent...")
-                sarsa_agent = SARSA(self.env)
-                sarsa_agent.load_q_table(filename='models/sarsa_solution.pkl')
-                sarsa_agent.test(num_episodes=100)
+            self.test()
+
+        recorder = self.env.recorder
+        if recorder is not None:
+            recorder.close()
+            print(f"[GAME] Recorded {recorder.written_frames} frames to {recorder.directory} "
+                  f"({recorder.dropped_frames} dropped)")
+
+    def create_env(self, headless):
+        """
+        Create the Pacman Minigrid environment described by the game settings, as self.env.
+        :param headless: Run without a window (render_mode None).
+        """
+        from .environment import PacmanEnv
+        from .recorder import FrameRecorder
+        from .renderer import RenderPolicy
+
+        # Which episodes and frames get drawn while an agent trains or tests
+        render_policy = None
+        if self.game_settings['mode'] != "Manual":
+            total_episodes = (self.game_settings['num_episodes'] if self.game_settings['mode'] == "Training"
+                              else TEST_EPISODES)
+            render_policy = RenderPolicy(every=self.game_settings['render_every'],
+                                         last=self.game_settings['render_last'],
+                                         total_episodes=total_episodes,
+                                         max_fps=self.game_settings['render_max_fps'])
+
+        # Frames of the selected episodes are written by a background thread while the agent plays
+        recorder = None
+        if self.game_settings['record_dir'] is not None and self.game_settings['mode'] != "Manual":
+            recorder = FrameRecorder(self.game_settings['record_dir'], fmt=self.game_settings['record_format'],
+                                     episodes=self.game_settings['record_episodes'])
+
+        self.env = PacmanEnv(
+            grid_size=self.game_settings['grid_size'],
+            n_ghosts=self.game_settings['n_ghosts'],
+            n_pellets=self.game_settings['n_pellets'],
+            mode=self.game_settings['mode'],
+            algorithm=self.game_settings['algorithm'],
+            frames_per_second=self.game_settings['speed'],
+            seed=self.game_settings['seed'] if self.game_settings['deterministic'] else None,
+            render_mode=None if headless else 'human',
+            obs_mode=self.game_settings['obs_mode'],
+            render_policy=render_policy,
+            recorder=recorder
+        )
+        return self.env
+
+    def train(self, progress=None, cancel=None, filename=None, checkpoint_file=None):
+        """
+        Train the agent chosen in the settings on self.env and save its Q-table, also when training is cancelled.
+        Checkpoints are written in the background as the settings ask (checkpoint_every, checkpoint_seconds), and
+        with the resume setting training continues from the checkpoint file if it exists.
+        :param progress: Passed to the agent's train(), see QLearning.train.
+        :param cancel: Passed to the agent's train(), see QLearning.train.
+        :param filename: Where to save the Q-table, the algorithm's file in MODEL_FILES by default.
+        :param checkpoint_file: Checkpoint to write and resume from, the algorithm's file in CHECKPOINT_FILES by
+            default.
+        :return: File the Q-table was saved to, or None if the algorithm is unknown.
+        """
+        from agents.checkpoint import Checkpointer
+
+        algorithm = self.game_settings['algorithm']
+        if algorithm not in AGENTS:
+            return None
+        filename = filename or MODEL_FILES[algorithm]
+        checkpoint_file = checkpoint_file or CHECKPOINT_FILES[algorithm]
+
+        resume = None
+        if self.game_settings['resume']:
+            if os.path.exists(checkpoint_file):
+                resume = checkpoint_file
+                print(f"[GAME] Resuming training from {checkpoint_file}")
+            else:
+                print(f"[GAME] No checkpoint at {checkpoint_file}, training from the start")
+
+        print(f"[GAME] Training {algorithm} agent...")
+        agent = agent_class(algorithm)(
+            self.env,
+            epsilon=self.game_settings['epsilon'],
+            epsilon_decay=self.game_settings['epsilon_decay'],
+            gamma=self.game_settings['discount_factor'],
+            alpha=self.game_settings['learning_rate'],
+            min_epsilon=self.game_settings['min_epsilon'],
+            **{argument: self.game_settings[setting] for argument, setting in AGENT_SETTINGS.get(algorithm, {}).items()}
+        )
+        checkpoint = None
+        if self.game_settings['checkpoint_every'] or self.game_settings['checkpoint_seconds']:
+            checkpoint = Checkpointer(checkpoint_file, every_episodes=self.game_settings['checkpoint_every'],
+                                      every_seconds=self.game_settings['checkpoint_seconds'])
+        try:
+            agent.train(num_episodes=self.game_settings['num_episodes'], progress=progress, cancel=cancel,
+                        checkpoint=checkpoint, resume=resume)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        agent.save_q_table(filename=filename)
+        self.game_started = False
+        return filename
+
+    def test(self, num_episodes=TEST_EPISODES, filename=None):
+        """
+        Test the agent chosen in the settings on self.env with a saved Q-table.
+        :param filename: Q-table to load, saved_model_file(algorithm) by default.
+        :return: Tuple (episode rewards, collected pellets per episode), or None if the algorithm is unknown.
+        """
+        algorithm = self.game_settings['algorithm']
+        if algorithm not in AGENTS:
+            return None
+
+        print(f"[GAME] Testing {algorithm} agent...")
+        agent = agent_class(algorithm)(self.env)
+        agent.load_q_table(filename=filename or saved_model_file(algorithm))
+        return agent.test(num_episodes=num_episodes, load_model=False)
 
     def handle_events(self, event):
+        import pygame
+
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 self.game_started = False
@@ -0,0 +1,294 @@
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+
+from .maze import maze_walls
+
+# Neighbour order used by PacmanEnv.bfs_nearest_object (down, right, up, left). It decides which of several equally
+# distant objects a BFS finds first, so the tables below must be built with the same order.
+BFS_DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+
+class MazeGraph:
+    """
+    All-pairs shortest paths over the free (non-wall) cells of a static maze.
+
+    Cells are numbered 0..n_cells-1 and every table is an (n_cells, n_cells) array indexed by [source, target]:
+    - dist: number of moves from source to target (-1 if unreachable)
+    - next_hop: first cell to step into on a shortest path from source to target (-1 if none)
+    - order: position of target in the BFS discovery order from source (n_cells if unreachable or target is the
+      source). The nearest object of a set is the one with the lowest order, which reproduces the tie-breaking of
+      a BFS that stops at the first object found.
+    """
+
+    def __init__(self, walls):
+        """
+        :param walls: Boolean array of shape (width, height), True where there is a wall.
+        """
+        self.width, self.height = walls.shape
+        self.walls = walls
+        self.cells = np.argwhere(~walls)  # (n_cells, 2) array of (x, y)
+        self.n_cells = len(self.cells)
+        self.index = np.full(walls.shape, -1, dtype=np.int32)
+        self.index[self.cells[:, 0], self.cells[:, 1]] = np.arange(self.n_cells)
+        # Cell indices in row-major (y, then x) order, the order of a `for y: for x:` scan over the grid
+        self.row_major = np.lexsort((self.cells[:, 0], self.cells[:, 1]))
+        self.dist, self.next_hop, self.order = self.__all_pairs_bfs()
+
+    def __neighbours(self):
+        neighbours = []
+        for x, y in self.cells:
+            cell_neighbours = []
+            for dx, dy in BFS_DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self.width and 0 <= ny < self.height and not self.walls[nx, ny]:
+                    cell_neighbours.append(int(self.index[nx, ny]))
+            neighbours.append(cell_neighbours)
+        return neighbours
+
+    def __all_pairs_bfs(self):
+        n = self.n_cells
+        neighbours = self.__neighbours()
+        dist = np.full((n, n), -1, dtype=np.int16)
+        next_hop = np.full((n, n), -1, dtype=np.int32)
+        order = np.full((n, n), n, dtype=np.int32)
+
+        for source in range(n):
+            source_dist = [-1] * n
+            source_hop = [-1] * n
+            source_order = [n] * n
+            source_dist[source] = 0
+            discovered = 0
+            queue = deque([source])
+            while queue:
+                cell = queue.popleft()
+                for neighbour in neighbours[cell]:
+                    if source_dist[neighbour] != -1:
+                        continue
+                    discovered += 1
+                    source_dist[neighbour] = source_dist[cell] + 1
+                    source_hop[neighbour] = neighbour if cell == source else source_hop[cell]
+                    source_order[neighbour] = discovered
+                    queue.append(neighbour)
+            dist[source] = source_dist
+            next_hop[source] = source_hop
+            order[source] = source_order
+
+        return dist, next_hop, order
+
+    def cell_index(self, pos):
+        """
+        Index of the cell at pos, or -1 for walls.
+        """
+        return int(self.index[pos[0], pos[1]])
+
+    def cell_indices(self, positions):
+        """
+        Indices of a collection of (x, y) positions, as an int array.
+        """
+        positions = np.asarray(list(positions), dtype=np.int32).reshape(-1, 2)
+        return self.index[positions[:, 0], positions[:, 1]]
+
+    def nearest(self, source, targets):
+        """
+        Pick the target a BFS from source would reach first.
+        :param source: Cell index to search from.
+        :param targets: Array of target cell indices.
+        :return: The chosen target cell index, or -1 if none is reachable.
+        """
+        if len(targets) == 0:
+            return -1
+        ranks = self.order[source, targets]
+        best = int(ranks.argmin())
+        if ranks[best] >= self.n_cells:
+            return -1
+        return int(targets[best])
+
+    def nearest_offset(self, pos, positions):
+        """
+        Table lookup equivalent of PacmanEnv.bfs_nearest_object.
+        :param pos: Position to search from.
+        :param positions: Positions of the objects being searched for.
+        :return: The position of the nearest object relative to pos, or (0, 0) if none is reachable.
+        """
+        target = self.nearest(self.cell_index(pos), self.cell_indices(positions))
+        if target < 0:
+            return 0, 0
+        x, y = self.cells[target]
+        return int(x - pos[0]), int(y - pos[1])
+
+
+class NearestObjectField:
+    """
+    Nearest object of every free cell, for a set of objects sitting on maze cells. The nearest object is ranked by
+    the maze's BFS order table, so it is the same object a BFS from the cell would find first.
+    """
+
+    def __init__(self, maze):
+        self.maze = maze
+        self.alive = np.zeros(maze.n_cells, dtype=bool)  # Cells holding an object
+        self.nearest = np.full(maze.n_cells, -1, dtype=np.int32)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def __contains__(self, pos):
+        index = self.maze.cell_index(pos)
+        return index >= 0 and bool(self.alive[index])
+
+    def _refresh(self, cells=None):
+        """
+        Recompute the nearest object of the given cells (all cells if None).
+        """
+        targets = np.flatnonzero(self.alive)
+        if len(targets) == 0:
+            self.nearest[slice(None) if cells is None else cells] = -1
+            return
+        ranks = self.maze.order[:, targets] if cells is None else self.maze.order[np.ix_(cells, targets)]
+        nearest = targets[ranks.argmin(axis=1)]
+        nearest[ranks.min(axis=1) >= self.maze.n_cells] = -1
+        self.nearest[slice(None) if cells is None else cells] = nearest
+
+    def _nearest_of(self, source):
+        return self.nearest[source]
+
+    def positions(self):
+        """
+        (x, y) positions of the objects.
+        """
+        return [tuple(int(v) for v in self.maze.cells[index]) for index in np.flatnonzero(self.alive)]
+
+    def nearest_offset(self, pos):
+        """
+        Position of the nearest object relative to pos, or (0, 0) if there is none.
+        """
+        target = self._nearest_of(self.maze.cell_index(pos))
+        if target < 0:
+            return 0, 0
+        x, y = self.maze.cells[target]
+        return int(x - pos[0]), int(y - pos[1])
+
+    def distance_to_nearest(self, pos):
+        """
+        Path distance from pos to its nearest object, or -1 if there is none.
+        """
+        source = self.maze.cell_index(pos)
+        target = self._nearest_of(source)
+        return int(self.maze.dist[source, target]) if target >= 0 else -1
+
+    def next_step(self, pos):
+        """
+        Next cell on a shortest path from pos to its nearest object, or None if there is none.
+        """
+        source = self.maze.cell_index(pos)
+        target = self._nearest_of(source)
+        if target < 0:
+            return None
+        x, y = self.maze.cells[self.maze.next_hop[source, target]]
+        return int(x), int(y)
+
+
+class PelletField(NearestObjectField):
+    """
+    Nearest remaining pellet of every free cell, kept up to date as pellets are eaten.
+
+    The field is built once per episode from all pellets (a multi-source search, done as a single argmin over the
+    maze's BFS order table), and eating a pellet only recomputes the cells whose nearest pellet it was. Queries
+    are O(1) and return the same pellet as a BFS from the queried cell.
+    """
+
+    def __init__(self, maze, positions=()):
+        super().__init__(maze)
+        self.alive[maze.cell_indices(positions)] = True
+        self._refresh()
+
+    def remove(self, pos):
+        """
+        Remove the pellet at pos and refresh the cells that were pointing at it.
+        """
+        index = self.maze.cell_index(pos)
+        if index < 0 or not self.alive[index]:
+            return
+        self.alive[index] = False
+        affected = np.flatnonzero(self.nearest == index)
+        if len(affected):
+            self._refresh(affected)
+
+
+class GhostField(NearestObjectField):
+    """
+    Ghost positions and the nearest ghost of every free cell, recomputed once per tick after the ghosts move.
+
+    positions_array holds every ghost, while alive (and so the nearest-ghost field) only counts the ghosts that are
+    in the grid, mirroring what a BFS over the grid would see. Most ticks only query the agent's cell, so the full
+    nearest map is filled lazily on first use and single-cell queries read one row of the order table.
+    """
+
+    def __init__(self, maze):
+        super().__init__(maze)
+        self.positions_array = np.zeros((0, 2), dtype=np.int32)
+        self._targets = np.zeros(0, dtype=np.int64)
+        self._stale = False
+
+    def update(self, positions, in_grid):
+        """
+        :param positions: (x, y) position of every ghost.
+        :param in_grid: For every ghost, whether it is currently in the grid.
+        """
+        self.positions_array = np.array(positions, dtype=np.int32).reshape(-1, 2)
+        self.alive[:] = False
+        self.alive[self.maze.index[self.positions_array[in_grid, 0], self.positions_array[in_grid, 1]]] = True
+        self._targets = np.flatnonzero(self.alive)
+        self._stale = True
+
+    def nearest_map(self):
+        """
+        Nearest ghost cell of every free cell (-1 if none), for the current tick.
+        """
+        if self._stale:
+            self._refresh()
+            self._stale = False
+        return self.nearest
+
+    def _nearest_of(self, source):
+        if not self._stale:
+            return self.nearest[source]
+        return self.maze.nearest(source, self._targets)
+
+    def collides(self, pos):
+        """
+        Whether any ghost is at pos.
+        """
+        return bool(((self.positions_array[:, 0] == pos[0]) & (self.positions_array[:, 1] == pos[1])).any())
+
+    def far_from_ghosts(self, min_distance):
+        """
+        Mask of the free cells whose straight-line distance to every ghost is at least min_distance.
+        """
+        offsets = self.maze.cells[:, None, :] - self.positions_array[None, :, :]
+        return ((offsets ** 2).sum(axis=2) >= min_distance ** 2).all(axis=1)
+
+
+def build_walls(width, height):
+    """
+    Wall mask of the maze, laid out exactly as PacmanEnv._gen_grid builds it (outer wall rectangle + maze_walls).
+    """
+    walls = np.zeros((width, height), dtype=bool)
+    walls[0, :] = walls[-1, :] = True
+    walls[:, 0] = walls[:, -1] = True
+    for x, y, length, direction in maze_walls:
+        if direction == 'vertical':
+            walls[x, y:y + length] = True
+        elif direction == 'horizontal':
+            walls[x:x + length, y] = True
+    return walls
+
+
+@lru_cache(maxsize=None)
+def compile_maze(width, height):
+    """
+    Compile the maze for a grid size once per process. The walls never change, so every environment with the same
+    size shares the same tables.
+    """
+    return MazeGraph(build_walls(width, height))
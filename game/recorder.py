@@ -0,0 +1,198 @@
+import os
+import queue
+import struct
+import threading
+import zipfile
+import zlib
+
+import numpy as np
+
+FORMATS = ('png', 'npz')
+
+# Messages from the stepping loop to the writer thread, besides the frames themselves
+_START, _END, _STOP = 'start', 'end', 'stop'
+
+
+def encode_png(frame, level=1):
+    """
+    Encode an RGB frame of shape (height, width, 3) as PNG bytes.
+
+    zlib does the work and releases the GIL while compressing, so encoding on the writer thread runs alongside the
+    stepping loop. A low compression level keeps the writer ahead of the game; the files are only a bit larger.
+    """
+    frame = np.ascontiguousarray(frame, dtype=np.uint8)
+    height, width = frame.shape[:2]
+    # Every row starts with filter type 0 (None)
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = frame.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)  # 8-bit RGB, no interlacing
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(rows.tobytes(), level)) + chunk(b'IEND', b''))
+
+
+class FrameRecorder:
+    """
+    Records episodes of a PacmanEnv without slowing down the stepping loop.
+
+    The environment hands every frame of a recorded episode to capture(), which only puts it in a bounded queue. A
+    background thread takes the frames from the queue and writes them, one episode at a time:
+
+    - 'png': a PNG sequence per episode, directory/episode_00001/frame_00000.png, ...
+    - 'npz': one compressed archive per episode, directory/episode_00001.npz, with one array per frame
+      (np.load(path)['frame_00000']). The archive is written as the frames arrive, not kept in memory.
+
+    At most max_queue frames wait in memory. When the writer falls behind, frames are dropped (and counted in
+    dropped_frames) or, with block=True, capture() waits for room so every frame is kept at the cost of slowing the
+    game down to the writer's pace.
+
+    If writing fails, the next call to capture(), start_episode() or close() raises RuntimeError. Use close() (or a
+    with block) to write the remaining frames and stop the thread.
+    """
+
+    def __init__(self, directory, fmt='png', episodes=None, max_queue=64, block=False, compression=1):
+        """
+        :param directory: Output directory, created if needed.
+        :param fmt: 'png' or 'npz'.
+        :param episodes: Episode numbers to record (counted from 1, as in PacmanEnv.episode_count), or None for all.
+        :param max_queue: Frames that can wait for the writer before capture() drops or blocks.
+        :param block: Wait for the writer when the queue is full instead of dropping the frame.
+        :param compression: zlib level used for both formats.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+        self.directory = directory
+        self.fmt = fmt
+        self.episodes = None if episodes is None else set(episodes)
+        self.block = block
+        self.compression = compression
+        self.recording = False  # Whether the current episode is being recorded
+        self.written_frames = 0
+        self.dropped_frames = 0
+        self.closed = False
+        self._error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._write_loop, name='FrameRecorder', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError(f"FrameRecorder failed writing to {self.directory}") from self._error
+        if self.closed:
+            raise RuntimeError("FrameRecorder is closed")
+
+    def start_episode(self, episode):
+        """
+        Called by the environment when an episode starts; ends the previous recording.
+        """
+        self._check()
+        if self.recording:
+            self._queue.put((_END, None))
+        self.recording = self.episodes is None or episode in self.episodes
+        if self.recording:
+            # Control messages are never dropped; they are tiny, so waiting for room is short
+            self._queue.put((_START, episode))
+
+    def capture(self, frame):
+        """
+        Queue a frame of the current episode. The frame must not be modified afterwards.
+        """
+        self._check()
+        if not self.recording:
+            return
+        try:
+            self._queue.put((None, frame), block=self.block)
+        except queue.Full:
+            self.dropped_frames += 1
+
+    def close(self):
+        """
+        Write the frames still in the queue and stop the writer thread. Safe to call more than once.
+        """
+        if self.closed:
+            return
+        if self.recording:
+            self._queue.put((_END, None))
+            self.recording = False
+        self._queue.put((_STOP, None))
+        self._thread.join()
+        self.closed = True
+        if self._error is not None:
+            raise RuntimeError(f"FrameRecorder failed writing to {self.directory}") from self._error
+
+    def _write_loop(self):
+        writer = None
+        episode = None
+        while True:
+            message, data = self._queue.get()
+            if message == _STOP:
+                break
+            if self._error is not None:
+                continue  # Keep draining so capture() never waits on a dead writer
+            try:
+                if message == _START:
+                    # The episode's file is created with its first frame, so episodes without frames leave none
+                    episode = data
+                elif message == _END:
+                    if writer is not None:
+                        writer.close()
+                    writer = None
+                else:
+                    if writer is None:
+                        writer = self._open_episode(episode)
+                    writer.write(data)
+                    self.written_frames += 1
+            except Exception as error:
+                self._error = error
+        if writer is not None and self._error is None:
+            writer.close()
+
+    def _open_episode(self, episode):
+        name = os.path.join(self.directory, f"episode_{episode:05d}")
+        if self.fmt == 'png':
+            return _PngSequence(name, self.compression)
+        return _FrameArchive(name + '.npz', self.compression)
+
+
+class _PngSequence:
+    def __init__(self, directory, compression):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.compression = compression
+        self.count = 0
+
+    def write(self, frame):
+        with open(os.path.join(self.directory, f"frame_{self.count:05d}.png"), 'wb') as file:
+            file.write(encode_png(frame, self.compression))
+        self.count += 1
+
+    def close(self):
+        pass
+
+
+class _FrameArchive:
+    """
+    An .npz file written one frame at a time: a zip archive with one .npy entry per frame.
+    """
+
+    def __init__(self, path, compression):
+        self.archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=compression)
+        self.count = 0
+
+    def write(self, frame):
+        with self.archive.open(f"frame_{self.count:05d}.npy", 'w') as entry:
+            np.lib.format.write_array(entry, np.asarray(frame, dtype=np.uint8))
+        self.count += 1
+
+    def close(self):
+        self.archive.close()
@@ -0,0 +1,188 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+import pygame
+from minigrid.core.grid import Grid
+from pygame import freetype
+
+from .assets import scaled_sprite, PACMAN_IMAGE_PATH
+
+FONT_NAME = "Calibri"
+FONT_SIZE = 22
+
+
+@lru_cache(maxsize=None)
+def get_font(name=FONT_NAME, size=FONT_SIZE):
+    """
+    System font lookup, done once per (name, size) instead of on every frame.
+    """
+    return freetype.SysFont(name, size)
+
+
+class PacmanRenderer:
+    """
+    Incremental renderer behind PacmanEnv.render in human mode. It produces the same frames as drawing the whole
+    minigrid frame every step.
+
+    The frame is kept on a persistent canvas at tile resolution. The walls are drawn once, and each frame only
+    redraws the tiles that changed since the previous one: the agent's old and new tiles, cells whose pellet or ghost
+    changed, and everything after a reset. It finds them by comparing the board with a snapshot of what was
+    drawn. Tile surfaces and the font are cached, and the agent sprite comes pre-rotated from assets.py. What is still done once
+    per frame is the smoothscale of the canvas to the window size and the mission text.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.canvas = None  # Frame plus the black margin, at tile resolution
+        self.frame = None  # Subsurface of the canvas holding the grid, redrawn tile by tile
+        self._drawn_cells = None  # Board cells and ghosts as last drawn
+        self._drawn_ghosts = None
+        self._drawn_agent = None  # (x, y, direction) as last drawn
+        self._tiles = {}  # Tile surfaces by (object encoding, agent direction)
+
+    def _tile(self, obj, agent_dir):
+        key = (obj.encode() if obj is not None else None, agent_dir)
+        tile = self._tiles.get(key)
+        if tile is None:
+            # Same tile image Grid.render uses: render_tile returns floats, which Grid.render truncates to uint8
+            tile_img = Grid.render_tile(obj, agent_dir=agent_dir, highlight=False, tile_size=self.env.tile_size)
+            tile_img = np.transpose(tile_img, axes=(1, 0, 2)).astype(np.uint8)  # (x, y) order for pygame
+            tile = self._tiles[key] = pygame.surfarray.make_surface(tile_img)
+        return tile
+
+    def _agent_sprite(self, agent_dir):
+        # The agent image (already turned to agent_start_dir) turned again to align with the direction
+        return scaled_sprite(PACMAN_IMAGE_PATH, self.env.agent_start_dir + agent_dir, self.env.tile_size)
+
+    def _create_canvas(self):
+        env = self.env
+        width_px, height_px = env.width * env.tile_size, env.height * env.tile_size
+
+        # Background with room for the mission description
+        offset = width_px * 0.1
+        self.canvas = pygame.Surface((int(width_px + offset), int(height_px + offset)))
+        self.canvas.fill((0, 0, 0))
+        self.frame = self.canvas.subsurface(pygame.Rect(int(offset / 2), 0, width_px, height_px))
+        self._drawn_cells = None
+
+    def _draw_full(self):
+        """
+        Draw the whole frame through minigrid, for the first frame or when highlighting is on.
+        """
+        env = self.env
+        img = env.get_frame(env.highlight, env.tile_size, env.agent_pov)
+        pygame.surfarray.blit_array(self.frame, np.transpose(img, axes=(1, 0, 2)))
+        self._snapshot()
+
+    def _snapshot(self):
+        board = self.env.board
+        self._drawn_cells = board.cells.copy()
+        self._drawn_ghosts = board.ghost_index.copy()
+
+    def _changed_tiles(self):
+        board = self.env.board
+        changed = (board.cells != self._drawn_cells) | (board.ghost_index != self._drawn_ghosts)
+        return set(map(tuple, np.argwhere(changed).tolist()))
+
+    def _draw_tiles(self, tiles):
+        env = self.env
+        grid = env.grid  # Syncs the minigrid Grid with the board
+        agent_x, agent_y = env.agent_pos
+        for x, y in tiles:
+            agent_dir = env.agent_dir if (x, y) == (agent_x, agent_y) else None
+            self.frame.blit(self._tile(grid.get(x, y), agent_dir), (x * env.tile_size, y * env.tile_size))
+        self._snapshot()
+
+    def draw(self):
+        """
+        Bring the frame up to date and return it scaled to the window, with the mission text.
+        """
+        env = self.env
+        if self.canvas is None:
+            self._create_canvas()
+
+        agent = (*env.agent_pos, env.agent_dir)
+        if self._drawn_cells is None or env.highlight or env.agent_pov:
+            self._draw_full()
+        else:
+            # The agent's tile is always redrawn, so the sprite is never blended over itself
+            tiles = self._changed_tiles()
+            tiles.add(tuple(agent[:2]))
+            tiles.add(tuple(self._drawn_agent[:2]))
+            self._draw_tiles(tiles)
+
+        # Draw the agent with the custom sprite
+        self.frame.blit(self._agent_sprite(env.agent_dir), (agent[0] * env.tile_size, agent[1] * env.tile_size))
+        self._drawn_agent = agent
+
+        bg = pygame.transform.smoothscale(self.canvas, (env.screen_size, env.screen_size))
+
+        font = get_font()
+        text = env.mission
+        text_rect = font.get_rect(text, size=FONT_SIZE)
+        text_rect.center = bg.get_rect().center
+        text_rect.y = bg.get_height() - FONT_SIZE * 1.5
+        font.render_to(bg, text_rect, text, fgcolor=(255, 255, 255), size=FONT_SIZE)
+        return bg
+
+
+class RenderPolicy:
+    """
+    Which steps PacmanEnv draws in human mode, so long runs stay watchable without paying for a frame every step.
+
+    - every: draw every Nth episode (episodes 1, N+1, 2N+1, ...). 1 draws all of them, 0 none apart from `last`.
+    - last: also draw the final K episodes out of total_episodes.
+    - max_fps: draw at most this many frames per second of wall-clock time and never wait for the clock, so the
+      simulation runs at full speed. None keeps the default behaviour: every step of a drawn episode is shown and
+      clock.tick holds the game at frames_per_second.
+
+    While nothing is drawn the window's events are still handled a few times per second, so it stays responsive.
+    """
+
+    EVENT_INTERVAL = 0.1  # Seconds between event checks when a step is not drawn
+
+    def __init__(self, every=1, last=0, total_episodes=None, max_fps=None):
+        self.every = every
+        self.last = last
+        self.total_episodes = total_episodes
+        self.max_fps = max_fps
+        self._last_frame = float('-inf')
+        self._last_events = float('-inf')
+
+    @property
+    def throttled(self):
+        """
+        Whether rendering should wait for the clock to keep the frame rate.
+        """
+        return self.max_fps is None
+
+    def episode_shown(self, episode):
+        """
+        Whether any step of the episode (counted from 1) is drawn.
+        """
+        if self.last and self.total_episodes is not None and episode > self.total_episodes - self.last:
+            return True
+        return self.every > 0 and (episode - 1) % self.every == 0
+
+    def frame_due(self):
+        """
+        Whether a frame may be drawn now, given max_fps.
+        """
+        if self.max_fps is None:
+            return True
+        now = time.perf_counter()
+        if now - self._last_frame < 1 / self.max_fps:
+            return False
+        self._last_frame = now
+        return True
+
+    def events_due(self):
+        """
+        Whether the window's events should be handled now, on steps that are not drawn.
+        """
+        now = time.perf_counter()
+        if now - self._last_events < self.EVENT_INTERVAL:
+            return False
+        self._last_events = now
+        return True
@@ -0,0 +1,50 @@
+# Game settings shared by the GUI, the background training worker and the command line. This module has no imports
+# so the command line can read the defaults before loading pygame or minigrid.
+DEFAULT_SETTINGS = {
+    'grid_size': 24,
+    'n_ghosts': 4,
+    'n_pellets': 30,
+    'mode': 'Manual',
+    'algorithm': None,  # None means no specific algorithm chosen
+    'speed': 60,  # Frames per second
+    'deterministic': True,
+    'seed': 1,  # Layout seed used when deterministic
+    'headless': False,  # Train/test without a window (ignored in Manual mode)
+    'obs_mode': 'id',  # Observation given to the agents: 'id', 'state' or the minigrid 'image'
+    'render_every': 1,  # Draw every Nth episode (0 draws none apart from render_last)
+    'render_last': 0,  # Also draw the final K episodes
+    'render_max_fps': None,  # Cap on frames drawn per second without slowing the game; None draws every step
+    'record_dir': None,  # Directory to record episodes to (None records nothing)
+    'record_format': 'png',  # 'png' sequences or 'npz' frame archives
+    'record_episodes': None,  # Episode numbers to record, None for all
+    'epsilon': 1.0,
+    'epsilon_decay': 0.995,
+    'min_epsilon' : 0.05,
+    'discount_factor': 0.9,
+    'learning_rate': 0.2,
+    'trace_decay': 0.9,  # Lambda of the eligibility-trace agents, Q(lambda) and SARSA(lambda)
+    'trace_cutoff': 0.01,  # Their traces below this are dropped
+    'planning_steps': 10,  # Dyna-Q and prioritized sweeping planning updates after every real step
+    'replay_capacity': 100000,  # Transitions Dyna-Q keeps as its model
+    'sweep_threshold': 0.001,  # Smallest TD error prioritized sweeping queues
+    'sweep_queue_size': 10000,  # State-action pairs its queue keeps
+    'num_episodes': 1000,
+    'checkpoint_every': 100,  # Save a training checkpoint every N episodes (0: never)
+    'checkpoint_seconds': 60,  # ... and at the end of the first episode T seconds after the last one (0: never)
+    'resume': False  # Continue training from the algorithm's checkpoint file, if there is one
+}
+
+TEST_EPISODES = 100
+
+# Model file of every algorithm, and the pickles older versions saved (still loaded if there is no model file)
+MODEL_FILES = {'Q-Learning': 'models/q_learning_solution.qtable', 'SARSA': 'models/sarsa_solution.qtable',
+               'Q(lambda)': 'models/q_lambda_solution.qtable', 'SARSA(lambda)': 'models/sarsa_lambda_solution.qtable',
+               'Dyna-Q': 'models/dyna_q_solution.qtable',
+               'Prioritized Sweeping': 'models/prioritized_sweeping_solution.qtable'}
+LEGACY_MODEL_FILES = {'Q-Learning': 'models/q_learning_solution.pkl', 'SARSA': 'models/sarsa_solution.pkl'}
+
+# Training checkpoint of every algorithm (see agents/checkpoint.py)
+CHECKPOINT_FILES = {'Q-Learning': 'models/q_learning_checkpoint.pkl', 'SARSA': 'models/sarsa_checkpoint.pkl',
+                    'Q(lambda)': 'models/q_lambda_checkpoint.pkl',
+                    'SARSA(lambda)': 'models/sarsa_lambda_checkpoint.pkl', 'Dyna-Q': 'models/dyna_q_checkpoint.pkl',
+                    'Prioritized Sweeping': 'models/prioritized_sweeping_checkpoint.pkl'}
@@ -0,0 +1,191 @@
+import multiprocessing as mp
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Commands sent to the workers, one byte each. The data itself travels through the shared buffers.
+STEP, RESET, CLOSE = b's', b'r', b'c'
+OK, ERROR = b'k', b'e'
+
+# Layout of the shared block: one slot per worker in each field
+FIELDS = (
+    ('actions', np.int64),
+    ('obs', np.int64),
+    ('rewards', np.float64),
+    ('terminated', np.bool_),
+    ('truncated', np.bool_),
+    ('episode_reward', np.float64),
+)
+
+
+def _views(buffer, n_workers):
+    """
+    Numpy views of every field of the shared block.
+    """
+    views, offset = {}, 0
+    for name, dtype in FIELDS:
+        views[name] = np.ndarray(n_workers, dtype=dtype, buffer=buffer, offset=offset)
+        offset += n_workers * np.dtype(dtype).itemsize
+    return views
+
+
+def _block_size(n_workers):
+    return sum(n_workers * np.dtype(dtype).itemsize for _, dtype in FIELDS)
+
+
+def _worker(index, conn, shm_name, n_workers, env_kwargs, seed):
+    """
+    Worker loop: run one headless PacmanEnv and answer the parent's commands through the shared block.
+    """
+    from .environment import PacmanEnv
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffers = _views(shm.buf, n_workers)
+    try:
+        env = PacmanEnv(**{'mode': 'Training', **env_kwargs, 'render_mode': None, 'obs_mode': 'id'})
+        env.reset(seed=None if seed is None else seed + index)
+        while True:
+            command = conn.recv_bytes()
+            if command == STEP:
+                obs, reward, terminated, truncated, _ = env.step(int(buffers['actions'][index]))
+                buffers['rewards'][index] = reward
+                buffers['terminated'][index] = terminated
+                buffers['truncated'][index] = truncated
+                buffers['episode_reward'][index] = env.cumulative_reward
+                if terminated or truncated:
+                    obs, _ = env.reset()
+                buffers['obs'][index] = obs
+            elif command == RESET:
+                obs, _ = env.reset()
+                buffers['obs'][index] = obs
+            elif command == CLOSE:
+                env.close()
+                conn.send_bytes(OK)
+                break
+            conn.send_bytes(OK)
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        conn.send_bytes(ERROR + traceback.format_exc().encode())
+    finally:
+        del buffers
+        shm.close()
+        conn.close()
+
+
+class SubprocPacmanEnv:
+    """
+    K headless PacmanEnv instances, each running in its own process.
+
+    Actions, observations (state ids, see PacmanEnv.state_id), rewards and done flags live in a single
+    multiprocessing.shared_memory block, one slot per worker. The parent writes the actions, sends each worker a
+    one-byte command and waits for a one-byte reply, so nothing is pickled per step. Finished episodes are reset by
+    the worker itself; the reward of the finished episode is reported in info['episode_reward'].
+
+    If a worker raises or dies, every worker is shut down and the call raises RuntimeError with the worker's
+    traceback. Use close() (or a with block) to stop the workers and release the shared memory.
+    """
+
+    def __init__(self, n_workers, env_kwargs=None, seed=None, start_method=None):
+        """
+        :param n_workers: Number of worker processes (one environment each).
+        :param env_kwargs: Extra PacmanEnv arguments (render_mode and obs_mode are fixed to None and 'id').
+        :param seed: Base seed; worker i seeds its environment with reset(seed=seed + i).
+        :param start_method: multiprocessing start method, the platform default if None.
+        """
+        self.n_workers = n_workers
+        self.closed = False
+        self._shm = shared_memory.SharedMemory(create=True, size=_block_size(n_workers))
+        self._buffers = _views(self._shm.buf, n_workers)
+        self._conns = []
+        self._processes = []
+
+        context = mp.get_context(start_method)
+        for index in range(n_workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(index, child_conn, self._shm.name, n_workers, env_kwargs or {}, seed))
+            process.start()
+            child_conn.close()  # So recv() fails with EOFError instead of hanging if the worker dies
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _command(self, command):
+        """
+        Send a command to every worker and wait until all of them are done.
+        """
+        if self.closed:
+            raise RuntimeError("SubprocPacmanEnv is closed")
+        for index, conn in enumerate(self._conns):
+            try:
+                conn.send_bytes(command)
+            except (BrokenPipeError, ConnectionResetError):
+                self._worker_died(index)
+        for index, conn in enumerate(self._conns):
+            try:
+                reply = conn.recv_bytes()
+            except (EOFError, ConnectionResetError):
+                self._worker_died(index)
+            if reply.startswith(ERROR):
+                self.close()
+                raise RuntimeError(f"Worker {index} failed:\n{reply[len(ERROR):].decode()}")
+
+    def _worker_died(self, index):
+        self.close()
+        raise RuntimeError(f"Worker {index} died (exit code {self._processes[index].exitcode})") from None
+
+    def reset(self):
+        """
+        Reset every environment.
+        :return: Tuple (state ids, info)
+        """
+        self._command(RESET)
+        return self._buffers['obs'].copy(), {}
+
+    def step(self, actions):
+        """
+        Step every environment with one action each.
+        :return: Tuple (state ids, rewards, terminated, truncated, info)
+        """
+        self._buffers['actions'][:] = actions
+        self._command(STEP)
+        buffers = self._buffers
+        info = {'episode_reward': buffers['episode_reward'].copy()}
+        return (buffers['obs'].copy(), buffers['rewards'].copy(), buffers['terminated'].copy(),
+                buffers['truncated'].copy(), info)
+
+    def close(self):
+        """
+        Stop the workers and release the shared memory. Safe to call more than once.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        for conn, process in zip(self._conns, self._processes):
+            if process.is_alive():
+                try:
+                    conn.send_bytes(CLOSE)
+                    if conn.poll(5):
+                        conn.recv_bytes()
+                except (BrokenPipeError, EOFError, ConnectionResetError):
+                    pass
+        for conn, process in zip(self._conns, self._processes):
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+            conn.close()
+        self._buffers = None
+        self._shm.close()
+        self._shm.unlink()
+
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
@@ -0,0 +1,111 @@
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from collections import deque
+
+MEAN_REWARD_EPISODES = 100  # Episodes averaged in the reported mean reward
+
+
+def _train(settings, progress_queue, cancel):
+    """
+    Worker process: train headless with the given game settings, posting progress after every episode.
+    """
+    from .game import Game
+
+    try:
+        game = Game()
+        game.game_settings = {**game.default_settings, **settings, 'mode': 'Training', 'headless': True}
+        game.create_env(headless=True)
+        rewards = deque(maxlen=MEAN_REWARD_EPISODES)
+
+        def progress(episode, epsilon, episode_reward, steps_per_sec):
+            rewards.append(episode_reward)
+            progress_queue.put({'episode': episode, 'num_episodes': game.game_settings['num_episodes'],
+                                'epsilon': epsilon, 'mean_reward': sum(rewards) / len(rewards),
+                                'steps_per_sec': steps_per_sec})
+
+        filename = game.train(progress=progress, cancel=cancel)
+        progress_queue.put({'done': True, 'cancelled': cancel.is_set(), 'filename': filename})
+    except KeyboardInterrupt:
+        progress_queue.put({'done': True, 'cancelled': True, 'filename': None})
+    except Exception:
+        progress_queue.put({'done': True, 'cancelled': False, 'filename': None, 'error': traceback.format_exc()})
+
+
+class TrainingWorker:
+    """
+    Trains an agent in a background process, so a GUI stays responsive during the whole run.
+
+    The worker runs Game.train headless with the given settings and posts a message after every episode:
+    {'episode', 'num_episodes', 'epsilon', 'mean_reward', 'steps_per_sec'}, where mean_reward is the average of the
+    last MEAN_REWARD_EPISODES episodes. When it finishes it posts {'done': True, 'cancelled', 'filename'}, plus
+    'error' with the traceback if training failed. poll() reads the messages without blocking and is meant to be
+    called every frame.
+
+    cancel() asks the worker to stop after the current episode; the Q-table trained so far is still saved.
+
+    A process is used rather than a thread so training does not compete with the GUI for the GIL, and it is
+    spawned rather than forked so it does not inherit the GUI's display connection.
+    """
+
+    def __init__(self, settings, start_method='spawn'):
+        """
+        :param settings: Game settings, see Game.default_settings. Mode and headless are forced to Training/True.
+        :param start_method: multiprocessing start method.
+        """
+        context = mp.get_context(start_method)
+        self.settings = settings
+        self.progress = None  # Last progress message
+        self.result = None  # Final message, once the worker is done
+        self.started_at = time.perf_counter()
+        self._queue = context.Queue()
+        self._cancel = context.Event()
+        self._process = context.Process(target=_train, args=(settings, self._queue, self._cancel), daemon=True)
+        self._process.start()
+
+    @property
+    def running(self):
+        return self.result is None
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def poll(self):
+        """
+        Read the messages posted since the last call, without blocking.
+        :return: The latest progress message, or None if there is none yet.
+        """
+        while self.result is None:
+            try:
+                message = self._queue.get_nowait()
+            except queue.Empty:
+                if not self._process.is_alive():
+                    # Exited without a final message, e.g. killed
+                    self.result = {'done': True, 'cancelled': self.cancelled, 'filename': None,
+                                   'error': f"Training process exited with code {self._process.exitcode}"}
+                break
+            if message.get('done'):
+                self.result = message
+                self._process.join()
+            else:
+                self.progress = message
+        return self.progress
+
+    def cancel(self):
+        """
+        Ask the worker to stop after the current episode and save what it has learned.
+        """
+        self._cancel.set()
+
+    def join(self, timeout=None):
+        """
+        Wait for the worker to finish, reading its messages.
+        :return: The final message, or None on timeout.
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while self.running and (deadline is None or time.perf_counter() < deadline):
+            self.poll()
+            time.sleep(0.05)
+        return self.result
@@ -2,8 +2,8 @@ import pygame
 import pygame_gui
 from pygame_gui.core import ObjectID
 
-OPTION_WINDOW_SIZE = (640, 640)
-OPTION_WINDOW_POS = (320, 100)
+OPTION_WINDOW_SIZE = (640, 800)
+OPTION_WINDOW_POS = (320, 80)
 
 DEFAULT_SPACING = 40  # Default vertical spacing between elements
 
@@ -28,6 +28,11 @@ class OptionsWindow:
         self.learning_rate_input = None
         self.discount_factor_input = None
 
+        # Watching training in the game window, and what is drawn then (see RenderPolicy)
+        self.watch_training_dropdown = None
+        self.render_every_input = None
+        self.render_max_fps_input = None
+
         # Apply button
         self.apply_button = None
 
@@ -42,6 +47,9 @@ class OptionsWindow:
         self.epsilon_decay = 0.995
         self.learning_rate = 0.2
         self.discount_factor = 0.99  # Default discount factor
+        self.watch_training = False  # Train in the background by default
+        self.render_every = 1
+        self.render_max_fps = None  # None draws every step at the game speed
 
     def show(self):
         self.window = pygame_gui.elements.UIWindow(
@@ -96,7 +104,7 @@ class OptionsWindow:
 
         current_y += DEFAULT_SPACING
 
-        # Algorithm (Q-Learning or SARSA)
+        # Algorithm (Q-Learning, SARSA, their eligibility-trace variants or the planning agents)
         pygame_gui.elements.UILabel(
             relative_rect=pygame.Rect((20, current_y), (200, 30)),
             text='Algorithm:',
@@ -104,7 +112,7 @@ class OptionsWindow:
             container=self.window
         )
         self.mode_dropdown = pygame_gui.elements.UIDropDownMenu(
-            options_list=['Q-Learning', 'SARSA'],
+            options_list=['Q-Learning', 'SARSA', 'Q(lambda)', 'SARSA(lambda)', 'Dyna-Q', 'Prioritized Sweeping'],
             starting_option=self.algorithm,
             relative_rect=pygame.Rect((220, current_y), (200, 30)),
             manager=self.manager,
@@ -234,6 +242,56 @@ class OptionsWindow:
         )
         self.discount_factor_input.set_text(str(self.discount_factor))
 
+        current_y += DEFAULT_SPACING
+
+        # Watch Training (Yes: train in the game window, No: in the background)
+        pygame_gui.elements.UILabel(
+            relative_rect=pygame.Rect((20, current_y), (200, 30)),
+            text='Watch Training:',
+            manager=self.manager,
+            container=self.window
+        )
+        self.watch_training_dropdown = pygame_gui.elements.UIDropDownMenu(
+            options_list=['Yes', 'No'],
+            starting_option='Yes' if self.watch_training else 'No',
+            relative_rect=pygame.Rect((220, current_y), (100, 30)),
+            manager=self.manager,
+            container=self.window
+        )
+
+        current_y += DEFAULT_SPACING
+
+        # Render Every Nth Episode
+        pygame_gui.elements.UILabel(
+            relative_rect=pygame.Rect((20, current_y), (200, 30)),
+            text='Render Every:',
+            manager=self.manager,
+            container=self.window
+        )
+        self.render_every_input = pygame_gui.elements.UITextEntryLine(
+            relative_rect=pygame.Rect((220, current_y), (100, 30)),
+            manager=self.manager,
+            container=self.window
+        )
+        self.render_every_input.set_text(str(self.render_every))
+
+        current_y += DEFAULT_SPACING
+
+        # Render Max FPS (empty: every step)
+        pygame_gui.elements.UILabel(
+            relative_rect=pygame.Rect((20, current_y), (200, 30)),
+            text='Render Max FPS:',
+            manager=self.manager,
+            container=self.window
+        )
+        self.render_max_fps_input = pygame_gui.elements.UITextEntryLine(
+            relative_rect=pygame.Rect((220, current_y), (100, 30)),
+            manager=self.manager,
+            container=self.window
+        )
+        self.render_max_fps_input.set_text('' if self.render_max_fps is None else str(self.render_max_fps))
+        self.update_render_controls()
+
         current_y += DEFAULT_SPACING * 1.5
 
         # Apply Button
@@ -245,16 +303,38 @@ class OptionsWindow:
             object_id=ObjectID(class_id=None, object_id='#button_label'),
         )
 
+    def update_render_controls(self):
+        """
+        The render settings only apply when training is watched; background training never draws.
+        """
+        for element in (self.render_every_input, self.render_max_fps_input):
+            if self.watch_training:
+                element.enable()
+            else:
+                element.disable()
+
+    def show_progress(self, text):
+        """
+        Show the progress of a background training run in the window's title bar.
+        """
+        if self.window is not None:
+            self.window.set_display_title(f'Options - {text}')
+
     def handle_events(self, event):
         if event.type == pygame.USEREVENT:
             if (event.user_type == pygame_gui.UI_DROP_DOWN_MENU_CHANGED
-                    and event.ui_element in [self.mode_dropdown, self.deterministic_dropdown]):
+                    and event.ui_element in [self.mode_dropdown, self.deterministic_dropdown,
+                                             self.watch_training_dropdown]):
                 if event.ui_element == self.mode_dropdown:
                     self.algorithm = self.mode_dropdown.selected_option[0]
                     print(f"[OPTIONS] Algorithm changed to: {self.algorithm}")
                 elif event.ui_element == self.deterministic_dropdown:
                     self.deterministic = self.deterministic_dropdown.selected_option[0] == 'Yes'
                     print(f"[OPTIONS] Deterministic set to: {self.deterministic}")
+                elif event.ui_element == self.watch_training_dropdown:
+                    self.watch_training = self.watch_training_dropdown.selected_option[0] == 'Yes'
+                    self.update_render_controls()
+                    print(f"[OPTIONS] Watch training set to: {self.watch_training}")
 
             if (event.type == pygame.QUIT
                     or (event.type == pygame_gui.UI_WINDOW_CLOSE and event.ui_element == self.window)):
@@ -274,6 +354,10 @@ class OptionsWindow:
         self.epsilon_decay = float(self.epsilon_decay_input.get_text())
         self.learning_rate = float(self.learning_rate_input.get_text())
         self.discount_factor = float(self.discount_factor_input.get_text())
+        self.watch_training = self.watch_training_dropdown.selected_option[0] == 'Yes'
+        self.render_every = int(self.render_every_input.get_text())
+        render_max_fps = self.render_max_fps_input.get_text().strip()
+        self.render_max_fps = float(render_max_fps) if render_max_fps else None
 
         return {
             'n_ghosts': self.n_ghosts,
@@ -285,5 +369,8 @@ class OptionsWindow:
             'epsilon': self.epsilon,
             'epsilon_decay': self.epsilon_decay,
             'learning_rate': self.learning_rate,
-            'discount_factor': self.discount_factor
+            'discount_factor': self.discount_factor,
+            'watch_training': self.watch_training,
+            'render_every': self.render_every,
+            'render_max_fps': self.render_max_fps
         }
@@ -4,7 +4,6 @@ import pygame
 import pygame_gui
 from pygame_gui.core import ObjectID
 
-from game.game import Game
 from gui.options_window import OptionsWindow
 
 LOGO_MARGIN_TOP = 240
@@ -13,6 +12,7 @@ BUTTON_HEIGHT = 50
 BUTTON_SPACING = 60
 BUTTON_POS_X = 540
 BUTTON_POS_Y = 420
+STATUS_WIDTH = 760
 
 
 class SplashScreen:
@@ -29,6 +29,8 @@ class SplashScreen:
         self.btn_test_rl = None
         self.btn_manual = None
         self.btn_exit = None
+        self.btn_cancel_training = None
+        self.lbl_training = None
 
         # Window state
         self.options_window = None
@@ -39,6 +41,7 @@ class SplashScreen:
         # Game settings
         self.game_is_running = False
         self.game_settings = None
+        self.training_worker = None  # Background training run, see start_training
 
     def create_ui_elements(self):
         self.logotype = pygame.image.load('assets/images/pacman-rl.png').convert_alpha()
@@ -81,8 +84,22 @@ class SplashScreen:
             manager=self.manager,
             object_id=ObjectID(class_id=None, object_id='#button-label'),
         )
+        self.btn_cancel_training = pygame_gui.elements.UIButton(
+            relative_rect=pygame.Rect((BUTTON_POS_X, BUTTON_POS_Y + BUTTON_SPACING * 6), (BUTTON_WIDTH, BUTTON_HEIGHT)),
+            text='Cancel Training',
+            manager=self.manager,
+            object_id=ObjectID(class_id=None, object_id='#button-label'),
+        )
+        self.btn_cancel_training.hide()
+        self.lbl_training = pygame_gui.elements.UILabel(
+            relative_rect=pygame.Rect(((self.screen.get_width() - STATUS_WIDTH) // 2, BUTTON_POS_Y + BUTTON_SPACING * 7),
+                                      (STATUS_WIDTH, 30)),
+            text='',
+            manager=self.manager,
+        )
 
     def draw(self):
+        self.update_training()
         self.screen.blit(self.background_image, (0, 0))
         self.screen.blit(self.logotype, self.logotype_pos)
         self.manager.draw_ui(self.screen)
@@ -126,6 +143,9 @@ class SplashScreen:
                 elif event.ui_element == self.btn_exit:
                     print("[SPLASH SCREEN] Exit button pressed.")
                     pygame.event.post(pygame.event.Event(pygame.QUIT))
+                elif event.ui_element == self.btn_cancel_training and self.training_worker is not None:
+                    print("[SPLASH SCREEN] Cancelling training.")
+                    self.training_worker.cancel()
 
         # Verify if the options window was closed
         if event.type == pygame_gui.UI_WINDOW_CLOSE and self.options_window and event.ui_element == self.options_window.window:
@@ -135,12 +155,20 @@ class SplashScreen:
 
     def start_game(self, mode):
         """
-        Start the game with the specified mode.
+        Start the game with the specified mode. Training runs in the background (see start_training) unless it is
+        to be watched, in which case it runs in the game window as testing does, drawn as the render settings say.
         """
-        self.game_is_running = True
-        settings = self.game_settings if self.game_settings else {}
+        settings = dict(self.game_settings) if self.game_settings else {}
+        watch_training = settings.pop('watch_training', False)
         settings['mode'] = mode
         settings['algorithm'] = 'Q-Learning' if settings.get('algorithm') is None else settings['algorithm']
+        if mode == 'Training' and not watch_training:
+            self.start_training(settings)
+            return
+
+        self.game_is_running = True
+        # Imported here rather than at start-up: it pulls in gymnasium, minigrid and the agents
+        from game.game import Game
 
         print(f"[SPLASH SCREEN] Starting {mode} session.")
 
@@ -153,6 +181,71 @@ class SplashScreen:
         print(f"[SPLASH SCREEN] {mode} session finished.")
         self.exit_game()
 
+    def start_training(self, settings):
+        """
+        Train headless in a background process while the splash screen keeps running and shows its progress.
+        """
+        from game.training_worker import TrainingWorker
+
+        print("[SPLASH SCREEN] Starting Training session in the background.")
+        self.training_worker = TrainingWorker(settings)
+        self.set_training_controls(True)
+        self.update_training()
+
+    def set_training_controls(self, training):
+        for button in (self.btn_train_rl, self.btn_test_rl, self.btn_manual):
+            if training:
+                button.disable()
+            else:
+                button.enable()
+        if training:
+            self.btn_cancel_training.show()
+        else:
+            self.btn_cancel_training.hide()
+
+    def update_training(self):
+        """
+        Poll the background training run, called every frame, and show its progress.
+        """
+        worker = self.training_worker
+        if worker is None:
+            return
+
+        progress = worker.poll()
+        if worker.running:
+            if worker.cancelled:
+                text = "Cancelling training, the Q-table will be saved..."
+            elif progress is None:
+                text = "Starting training..."
+            else:
+                text = (f"Episode {progress['episode']}/{progress['num_episodes']} | "
+                        f"Epsilon {progress['epsilon']:.3f} | Mean reward {progress['mean_reward']:.1f} | "
+                        f"{progress['steps_per_sec']:.0f} steps/s")
+        else:
+            result = worker.result
+            if 'error' in result:
+                print(f"[SPLASH SCREEN] Training failed:\n{result['error']}")
+                text = "Training failed, see the console for details."
+            else:
+                status = "cancelled" if result['cancelled'] else "finished"
+                text = f"Training {status}. Q-table saved to {result['filename']}"
+                print(f"[SPLASH SCREEN] {text}")
+            self.training_worker = None
+            self.set_training_controls(False)
+
+        self.lbl_training.set_text(text)
+        if self.options_window and not self.options_window_killed:
+            self.options_window.show_progress(text)
+
+    def close(self):
+        """
+        Stop a background training run, waiting for it to save its Q-table.
+        """
+        if self.training_worker is not None:
+            self.training_worker.cancel()
+            self.training_worker.join()
+            self.training_worker = None
+
     def exit_game(self):
         """
         Exit the game and return to the splash screen.
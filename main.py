@@ -28,6 +28,7 @@ def main():
             manager.update(time_delta)
             pygame.display.flip()
 
+    splash_screen.close()
     pygame.quit()
 
 
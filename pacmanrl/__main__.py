@@ -0,0 +1,271 @@
+"""
+Headless command line for batch jobs: train, test or benchmark without opening a window.
+
+Run from the repository root:
+    python -m pacmanrl train --algorithm sarsa --episodes 5000 --results runs/sarsa.json
+    python -m pacmanrl train --algorithm sarsa --episodes 10000 --resume
+    python -m pacmanrl test --algorithm sarsa --model models/sarsa_solution.qtable
+    python -m pacmanrl bench --steps 20000 --batch 256
+    python -m pacmanrl sweep --algorithm sarsa --episodes 1000 --rung 200 --epsilon-decay 0.99 0.995 0.999 \
+        --alpha 0.1 0.2 0.3 --table results/sweep.csv
+
+The options default to the game settings (game/settings.py). Every command writes a JSON file with its settings and
+results (--results, by default results/<command>-<time>.json). pygame_gui is never imported and the display is never
+opened, and pygame and minigrid are only imported once the arguments are parsed.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Nothing here draws, but make sure SDL could never open a window on a server
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game.settings import DEFAULT_SETTINGS, TEST_EPISODES
+
+ALGORITHMS = {'q-learning': 'Q-Learning', 'sarsa': 'SARSA', 'q-lambda': 'Q(lambda)', 'sarsa-lambda': 'SARSA(lambda)',
+              'dyna-q': 'Dyna-Q', 'prioritized-sweeping': 'Prioritized Sweeping'}
+
+
+def add_env_arguments(parser):
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='q-learning')
+    parser.add_argument('--grid-size', type=int, default=DEFAULT_SETTINGS['grid_size'])
+    parser.add_argument('--ghosts', type=int, default=DEFAULT_SETTINGS['n_ghosts'])
+    parser.add_argument('--pellets', type=int, default=DEFAULT_SETTINGS['n_pellets'])
+    parser.add_argument('--seed', type=int, default=DEFAULT_SETTINGS['seed'],
+                        help="Layout seed, also seeds the agent's exploration")
+    parser.add_argument('--random-layout', action='store_true', help="New random layout every episode")
+    parser.add_argument('--model', help="Q-table file, the algorithm's file in models/ by default")
+    parser.add_argument('--results', help="JSON results file, results/<command>-<time>.json by default")
+
+
+def add_agent_arguments(parser):
+    parser.add_argument('--lam', type=float, default=DEFAULT_SETTINGS['trace_decay'],
+                        help="Trace decay of q-lambda and sarsa-lambda")
+    parser.add_argument('--trace-cutoff', type=float, default=DEFAULT_SETTINGS['trace_cutoff'])
+    parser.add_argument('--planning-steps', type=int, default=DEFAULT_SETTINGS['planning_steps'],
+                        help="Planning updates per real step of dyna-q and prioritized-sweeping")
+    parser.add_argument('--replay-capacity', type=int, default=DEFAULT_SETTINGS['replay_capacity'])
+    parser.add_argument('--sweep-threshold', type=float, default=DEFAULT_SETTINGS['sweep_threshold'])
+    parser.add_argument('--sweep-queue-size', type=int, default=DEFAULT_SETTINGS['sweep_queue_size'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pacmanrl', description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train = commands.add_parser('train', help="Train an agent and save its Q-table")
+    add_env_arguments(train)
+    train.add_argument('--episodes', type=int, default=DEFAULT_SETTINGS['num_episodes'])
+    train.add_argument('--epsilon', type=float, default=DEFAULT_SETTINGS['epsilon'])
+    train.add_argument('--epsilon-decay', type=float, default=DEFAULT_SETTINGS['epsilon_decay'])
+    train.add_argument('--min-epsilon', type=float, default=DEFAULT_SETTINGS['min_epsilon'])
+    train.add_argument('--gamma', type=float, default=DEFAULT_SETTINGS['discount_factor'])
+    train.add_argument('--alpha', type=float, default=DEFAULT_SETTINGS['learning_rate'])
+    add_agent_arguments(train)
+    train.add_argument('--checkpoint', help="Checkpoint file, the algorithm's file in models/ by default")
+    train.add_argument('--checkpoint-every', type=int, default=DEFAULT_SETTINGS['checkpoint_every'],
+                       help="Save a checkpoint every N episodes (0: never)")
+    train.add_argument('--checkpoint-seconds', type=float, default=DEFAULT_SETTINGS['checkpoint_seconds'],
+                       help="Also save one after an episode that ends T seconds after the last (0: never)")
+    train.add_argument('--resume', action='store_true',
+                       help="Continue from the checkpoint, if there is one, up to --episodes in total")
+
+    test = commands.add_parser('test', help="Test a saved Q-table")
+    add_env_arguments(test)
+    test.add_argument('--episodes', type=int, default=TEST_EPISODES)
+
+    sweep = commands.add_parser('sweep', help="Tune hyperparameters with successive halving over a process pool")
+    add_env_arguments(sweep)
+    sweep.add_argument('--episodes', type=int, default=DEFAULT_SETTINGS['num_episodes'],
+                       help="Episodes the best trials train for")
+    sweep.add_argument('--epsilon', type=float, default=DEFAULT_SETTINGS['epsilon'])
+    sweep.add_argument('--epsilon-decay', type=float, nargs='+', default=[DEFAULT_SETTINGS['epsilon_decay']])
+    sweep.add_argument('--min-epsilon', type=float, nargs='+', default=[DEFAULT_SETTINGS['min_epsilon']])
+    sweep.add_argument('--gamma', type=float, nargs='+', default=[DEFAULT_SETTINGS['discount_factor']])
+    sweep.add_argument('--alpha', type=float, nargs='+', default=[DEFAULT_SETTINGS['learning_rate']])
+    add_agent_arguments(sweep)
+    sweep.add_argument('--samples', type=int, default=0, help="Try this many random configurations of the grid")
+    sweep.add_argument('--rung', type=int, default=200, help="Episodes between rankings")
+    sweep.add_argument('--kill', type=float, default=0.5, help="Share of the trials stopped at every rung")
+    sweep.add_argument('--window', type=int, default=100, help="Episodes averaged in a trial's score")
+    sweep.add_argument('--workers', type=int, help="Worker processes, one per core by default")
+    sweep.add_argument('--dir', help="Trial checkpoints and models, sweeps/<time> by default")
+    sweep.add_argument('--table', help="Results table, .csv or .jsonl, results/sweep-<time>.jsonl by default")
+    sweep.add_argument('--resume', action='store_true',
+                       help="Continue the sweep in --dir, run with the same grid, up to --episodes")
+
+    bench = commands.add_parser('bench', help="Measure headless steps/sec with random actions")
+    bench.add_argument('--steps', type=int, default=20000)
+    bench.add_argument('--batch', type=int, default=0, help="Also measure BatchPacmanEnv with this many games")
+    bench.add_argument('--seed', type=int, default=DEFAULT_SETTINGS['seed'])
+    bench.add_argument('--results', help="JSON results file, results/<command>-<time>.json by default")
+
+    return parser.parse_args(argv)
+
+
+def game_settings(args, mode):
+    settings = {
+        **DEFAULT_SETTINGS,
+        'mode': mode,
+        'algorithm': ALGORITHMS[args.algorithm],
+        'headless': True,
+        'grid_size': args.grid_size,
+        'n_ghosts': args.ghosts,
+        'n_pellets': args.pellets,
+        'deterministic': not args.random_layout,
+        'seed': args.seed,
+    }
+    if mode == 'Training':
+        settings.update(num_episodes=args.episodes, epsilon=args.epsilon, trace_decay=args.lam,
+                        trace_cutoff=args.trace_cutoff, planning_steps=args.planning_steps,
+                        replay_capacity=args.replay_capacity, sweep_threshold=args.sweep_threshold,
+                        sweep_queue_size=args.sweep_queue_size)
+    if args.command == 'train':
+        # A sweep takes lists of these, see sweep()
+        settings.update(epsilon_decay=args.epsilon_decay, min_epsilon=args.min_epsilon, discount_factor=args.gamma,
+                        learning_rate=args.alpha, checkpoint_every=args.checkpoint_every,
+                        checkpoint_seconds=args.checkpoint_seconds, resume=args.resume)
+    return settings
+
+
+def create_game(settings):
+    import random
+
+    from game.game import Game
+
+    game = Game()
+    game.game_settings = settings
+    game.create_env(headless=True)
+    # Exploration draws from both random and the action space, so seed them too for repeatable runs
+    random.seed(settings['seed'])
+    game.env.action_space.seed(settings['seed'])
+    return game
+
+
+def train(args):
+    settings = game_settings(args, 'Training')
+    game = create_game(settings)
+    rewards, last = [], {}
+
+    def progress(episode, epsilon, episode_reward, steps_per_sec):
+        rewards.append(episode_reward)
+        last.update(epsilon=epsilon, steps_per_sec=steps_per_sec)
+
+    start = time.perf_counter()
+    model = game.train(progress=progress, filename=args.model, checkpoint_file=args.checkpoint)
+    recent = rewards[-100:]
+    return {
+        'settings': settings,
+        'model': model,
+        'episodes': len(rewards),
+        'elapsed_sec': time.perf_counter() - start,
+        'steps_per_sec': last.get('steps_per_sec'),
+        'final_epsilon': last.get('epsilon'),
+        'mean_reward_last_100': sum(recent) / len(recent) if recent else None,
+        'episode_rewards': rewards,
+    }
+
+
+def test(args):
+    from game.game import saved_model_file
+
+    settings = game_settings(args, 'Testing')
+    game = create_game(settings)
+    model = args.model or saved_model_file(settings['algorithm'])
+    start = time.perf_counter()
+    rewards, pellets = game.test(num_episodes=args.episodes, filename=model)
+    return {
+        'settings': settings,
+        'model': model,
+        'episodes': len(rewards),
+        'elapsed_sec': time.perf_counter() - start,
+        'mean_reward': sum(rewards) / len(rewards),
+        'mean_pellets': sum(pellets) / len(pellets),
+        'episode_rewards': rewards,
+        'episode_pellets': pellets,
+    }
+
+
+def sweep(args):
+    from .sweep import configurations, successive_halving, ResultsTable
+
+    settings = game_settings(args, 'Training')
+    grid = {'epsilon_decay': args.epsilon_decay, 'learning_rate': args.alpha, 'discount_factor': args.gamma,
+            'min_epsilon': args.min_epsilon}
+    configs = configurations(grid, samples=args.samples, seed=args.seed)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    directory = args.dir or os.path.join('sweeps', stamp)
+    table_path = args.table or os.path.join('results', f"sweep-{stamp}.jsonl")
+
+    print(f"[PACMANRL] Sweeping {len(configs)} configurations of {settings['algorithm']}", file=sys.stderr)
+    start = time.perf_counter()
+    with ResultsTable(table_path) as table:
+        trials = successive_halving(settings, configs, directory, table, rung_episodes=args.rung,
+                                    max_episodes=args.episodes, kill_fraction=args.kill, workers=args.workers,
+                                    window=args.window, resume=args.resume,
+                                    log=lambda line: print(line, file=sys.stderr))
+    return {
+        'settings': settings,
+        'grid': grid,
+        'table': table_path,
+        'elapsed_sec': time.perf_counter() - start,
+        'best': trials[0] if trials else None,
+        'trials': trials,
+    }
+
+
+def bench(args):
+    import numpy as np
+
+    from game.environment import PacmanEnv
+
+    rng = np.random.default_rng(args.seed)
+    env = PacmanEnv(mode='Training', algorithm='Q-Learning', seed=args.seed, render_mode=None, obs_mode='id')
+    env.reset()
+    actions = rng.integers(3, size=args.steps).tolist()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    results = {'steps': args.steps, 'env_steps_per_sec': args.steps / (time.perf_counter() - start)}
+
+    if args.batch:
+        from game.batch_env import BatchPacmanEnv
+
+        batch_env = BatchPacmanEnv(args.batch, seed=args.seed)
+        batch_env.reset()
+        batch_steps = max(1, args.steps // args.batch)
+        start = time.perf_counter()
+        for _ in range(batch_steps):
+            batch_env.step(rng.integers(3, size=args.batch))
+        results.update(batch=args.batch,
+                       batch_steps_per_sec=batch_steps * args.batch / (time.perf_counter() - start))
+    return results
+
+
+def write_results(results, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Written next to the final file and renamed, so a sweep never reads a half-written result
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as file:
+        json.dump(results, file, indent=2)
+    os.replace(temp_path, path)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    commands = {'train': train, 'test': test, 'sweep': sweep, 'bench': bench}
+    results = {'command': args.command, **commands[args.command](args)}
+    path = args.results or os.path.join('results', f"{args.command}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    write_results(results, path)
+    print(f"[PACMANRL] Results written to {path}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Hyperparameter sweeps with successive halving over a process pool, behind python -m pacmanrl sweep.
+
+Every configuration of the grid is a trial that trains headless in rungs of rung_episodes episodes. After each rung
+the trials are ranked by their mean reward over the last episodes and the bottom kill_fraction is stopped; the rest
+are promoted to the next rung, until max_episodes. The pool's workers only ever train the trials still in the
+running: with the default kill fraction of 0.5, n trials cost about 2 * n * rung_episodes episodes, not
+n * max_episodes.
+
+A trial is trained one rung per pool task: the task resumes the trial from its checkpoint file (see
+agents/checkpoint.py), trains to the end of the rung and leaves a checkpoint and a model file behind, so workers
+keep no state between rungs and a promoted trial continues exactly where it stopped. The checkpoints also record the
+hyperparameters they were trained with, so a sweep only continues trials left in its directory when asked to and
+when they come from the same grid. Only the parent process writes the results table, one row per trial and rung, as
+CSV or JSON lines depending on its extension.
+"""
+import contextlib
+import csv
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Settings a sweep can vary, and the agent hyperparameters they set (recorded in training checkpoints)
+SWEEP_SETTINGS = ('epsilon_decay', 'learning_rate', 'discount_factor', 'min_epsilon')
+HYPERPARAMETERS = {'epsilon_decay': 'epsilon_decay', 'learning_rate': 'alpha', 'discount_factor': 'gamma',
+                   'min_epsilon': 'min_epsilon'}
+TABLE_COLUMNS = ('trial', 'rung', 'episodes', 'status', 'score', 'mean_pellets', 'elapsed_sec') + SWEEP_SETTINGS
+
+
+def configurations(grid, samples=0, seed=0):
+    """
+    The configurations of a grid.
+    :param grid: {setting: list of values}.
+    :param samples: If positive, this many configurations drawn at random from the grid instead of all of them.
+    :param seed: Seed of the draw.
+    :return: List of {setting: value}.
+    """
+    names = list(grid)
+    configs = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    if 0 < samples < len(configs):
+        configs = random.Random(seed).sample(configs, samples)
+    return configs
+
+
+def train_trial(settings, checkpoint_file, model_file, num_episodes, window):
+    """
+    Pool task: train a trial up to num_episodes episodes in total, resuming from its checkpoint if it has one.
+    :param window: Episodes averaged in the score.
+    :return: Dict with the score (mean reward of the last window episodes), the mean pellets over the same
+        episodes, the episodes trained so far and the seconds this task took.
+    """
+    from agents.checkpoint import load_checkpoint
+    from game.game import Game
+
+    start = time.perf_counter()
+    resume = os.path.exists(checkpoint_file)
+    game = Game()
+    game.game_settings = {**game.default_settings, **settings, 'mode': 'Training', 'headless': True,
+                          'num_episodes': num_episodes, 'resume': resume,
+                          'checkpoint_every': num_episodes, 'checkpoint_seconds': 0}
+    game.create_env(headless=True)
+    if not resume:
+        # As the train command does; a resumed trial gets its generators back from the checkpoint
+        random.seed(settings['seed'])
+        game.env.action_space.seed(settings['seed'])
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        game.train(filename=model_file, checkpoint_file=checkpoint_file)
+
+    # A resumed sweep may find the trial already past this rung: it is scored on the rung's episodes all the same
+    metrics = load_checkpoint(checkpoint_file)['metrics']
+    episodes = min(num_episodes, len(metrics['total_rewards']))
+    rewards = metrics['total_rewards'][max(0, episodes - window):episodes]
+    pellets = metrics['collected_pellets'][max(0, episodes - window):episodes]
+    return {'score': sum(rewards) / len(rewards), 'mean_pellets': sum(pellets) / len(pellets),
+            'episodes': episodes, 'elapsed_sec': time.perf_counter() - start}
+
+
+def check_trial(trial, settings, resume):
+    """
+    Make sure a trial's checkpoint, if it has one, may be continued.
+    :param settings: The trial's settings.
+    :raise FileExistsError: If the trial has a checkpoint and resume is false.
+    :raise ValueError: If it was trained with other hyperparameters.
+    """
+    from agents.checkpoint import load_checkpoint
+
+    if not os.path.exists(trial['checkpoint']):
+        return
+    if not resume:
+        raise FileExistsError(f"{trial['checkpoint']} is from an earlier sweep; resume it or use another directory")
+    trained_with = load_checkpoint(trial['checkpoint']).get('hyperparameters') or {}
+    for name, attribute in HYPERPARAMETERS.items():
+        if trained_with.get(attribute) != settings[name]:
+            raise ValueError(f"{trial['checkpoint']} was trained with {attribute}={trained_with.get(attribute)}, "
+                             f"not {settings[name]}: the sweep it is from had another grid")
+
+
+class ResultsTable:
+    """
+    Results table written row by row as the sweep goes: CSV if the path ends in .csv, JSON lines otherwise. Every
+    row is flushed, so the table can be followed while the sweep runs.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.file = open(path, 'w', newline='')
+        self.csv = None
+        if path.endswith('.csv'):
+            self.csv = csv.DictWriter(self.file, fieldnames=TABLE_COLUMNS, extrasaction='ignore')
+            self.csv.writeheader()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+    def write(self, row):
+        if self.csv is not None:
+            self.csv.writerow(row)
+        else:
+            self.file.write(json.dumps(row) + '\n')
+        self.file.flush()
+
+
+def successive_halving(base_settings, configs, directory, table, rung_episodes=200, max_episodes=1000,
+                       kill_fraction=0.5, workers=None, window=100, resume=False, log=print):
+    """
+    Run a successive-halving sweep.
+    :param base_settings: Game settings shared by every trial (algorithm, maze, seed...).
+    :param configs: List of {setting: value} overriding base_settings, one per trial (see configurations).
+    :param directory: Where the trials' checkpoints and models go.
+    :param table: ResultsTable receiving a row per trial and rung.
+    :param rung_episodes: Episodes between rankings.
+    :param max_episodes: Episodes the surviving trials train for.
+    :param kill_fraction: Share of the trials ranked after a rung that is stopped (at least one trial goes on).
+    :param workers: Worker processes, os.cpu_count() by default.
+    :param window: Episodes averaged in a trial's score, capped at rung_episodes.
+    :param resume: Continue the sweep that left its trials in directory, with the same configs. Its rungs are
+        ranked again from the checkpoints, so the same trials are stopped, and the survivors train on.
+    :param log: Called with a progress line after every rung.
+    :return: List of the trials, dicts with trial, settings, score, episodes, status and the model file, the best
+        first.
+    :raise FileExistsError: If directory holds trials of an earlier sweep and resume is false.
+    :raise ValueError: If resuming a sweep whose trials were trained with other hyperparameters.
+    """
+    os.makedirs(directory, exist_ok=True)
+    window = min(window, rung_episodes)
+    trials = [{'trial': i, 'settings': config, 'score': None, 'episodes': 0, 'status': 'pending',
+               'checkpoint': os.path.join(directory, f"trial_{i:03d}_checkpoint.pkl"),
+               'model': os.path.join(directory, f"trial_{i:03d}.qtable")}
+              for i, config in enumerate(configs)]
+    for trial in trials:
+        check_trial(trial, {**base_settings, **trial['settings']}, resume)
+    alive = list(trials)
+    rung = 0
+
+    # spawn, as TrainingWorker: the workers import pygame and must not inherit the parent's state
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as pool:
+        while alive:
+            rung += 1
+            episodes = min(rung * rung_episodes, max_episodes)
+            futures = {pool.submit(train_trial, {**base_settings, **trial['settings']}, trial['checkpoint'],
+                                   trial['model'], episodes, window): trial
+                       for trial in alive}
+            finished = []
+            for future in as_completed(futures):
+                trial = futures[future]
+                row = {'trial': trial['trial'], 'rung': rung, **trial['settings']}
+                try:
+                    result = future.result()
+                except Exception as error:
+                    trial['status'] = 'error'
+                    table.write({**row, 'episodes': trial['episodes'], 'status': f"error: {error}"})
+                    continue
+                trial.update(score=result['score'], episodes=result['episodes'])
+                finished.append((trial, {**row, **result}))
+
+            # Rank the rung; the last rung finishes everyone left
+            finished.sort(key=lambda item: item[0]['score'], reverse=True)
+            last_rung = episodes >= max_episodes
+            keep = len(finished) if last_rung else max(1, math.ceil(len(finished) * (1 - kill_fraction)))
+            for position, (trial, row) in enumerate(finished):
+                trial['status'] = 'finished' if last_rung else 'promoted' if position < keep else 'stopped'
+                table.write({**row, 'status': trial['status']})
+            alive = [] if last_rung else [trial for trial, _ in finished[:keep]]
+            if finished:
+                best = finished[0][0]
+                log(f"[SWEEP] Rung {rung} ({episodes} episodes): {len(finished)} trials, best {best['score']:.1f} "
+                    f"(trial {best['trial']}), {len(alive)} promoted")
+
+    ranked = sorted((trial for trial in trials if trial['score'] is not None),
+                    key=lambda trial: (trial['episodes'], trial['score']), reverse=True)
+    return ranked + [trial for trial in trials if trial['score'] is None]
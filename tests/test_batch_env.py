@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game.batch_env import BatchPacmanEnv
+from game.board import GHOST, PELLET
+from game.environment import PacmanEnv
+
+
+class GhostMoves:
+    """
+    Stands in for PacmanEnv.rng during a step, choosing for every ghost the move the batch game made. Other draws
+    go to the game's generator.
+    """
+
+    def __init__(self, moves, rng):
+        self.moves = moves  # Per ghost, its (dx, dy) or None if it could not move
+        self.rng = rng
+
+    def __getattr__(self, name):
+        return getattr(self.rng, name)
+
+    def choice(self, directions):
+        if not self.moves:
+            return self.rng.choice(directions)  # The respawn, after the ghosts have moved
+        ghost_moves = self.moves[0]
+        if ghost_moves is None or ghost_moves not in directions:
+            move = directions[0]
+        else:
+            move = ghost_moves
+        if len(directions) == 1 or move == ghost_moves:
+            self.moves = self.moves[1:]  # The ghost is done: it moved or ran out of directions
+        return move
+
+
+def copy_layout(batch, env):
+    """
+    Give the PacmanEnv the pellets, ghosts and agent of the batch's only game.
+    """
+    cells = batch.cells[0, :-1].reshape(batch.width, batch.height)
+    env.board.clear()
+    env._PacmanEnv__place_pellets(np.argwhere(cells == PELLET).tolist())
+    for ghost, pos in enumerate(batch.ghost_pos[0].tolist()):
+        x, y = divmod(pos, batch.height)
+        env.board.set_cell(x, y, GHOST, ghost)
+        env.board.ghost_positions[ghost] = x, y
+    env._update_ghost_field()
+    env.agent_pos = divmod(int(batch.agent_pos[0]), batch.height)
+    env.agent_dir = int(batch.agent_dir[0])
+
+
+# Layouts where the first respawn comes after the ghosts start moving
+@pytest.mark.parametrize('seed', [1, 2, 3, 5, 8])
+def test_single_game_matches_pacman_env(seed):
+    batch = BatchPacmanEnv(1, seed=seed)
+    env = PacmanEnv(mode='Training', seed=seed, render_mode=None, obs_mode='id')
+    batch_states, _ = batch.reset(seed=seed)
+    env.reset(seed=seed)
+    copy_layout(batch, env)
+    actions = np.random.default_rng(seed).choice(3, size=400, p=[0.2, 0.2, 0.6])
+    game_rng = env.rng
+
+    for step, action in enumerate(actions.tolist()):
+        assert env.state_id() == batch_states[0]
+        ghosts_before = batch.ghost_pos[0].copy()
+        hits_before = int(batch.ghost_hits[0])
+
+        batch_states, rewards, terminated, truncated, _ = batch.step([action])
+        moved = [tuple(int(v) for v in np.subtract(divmod(int(new), batch.height), divmod(int(old), batch.height)))
+                 for old, new in zip(ghosts_before.tolist(), batch.ghost_pos[0].tolist())]
+        env.rng = GhostMoves([move if move != (0, 0) else None for move in moved], game_rng)
+        _, reward, env_terminated, env_truncated, _ = env.step(action)
+        env.rng = game_rng
+
+        assert (env_terminated, env_truncated) == (terminated[0], truncated[0]), f"step {step}"
+        # A respawn draws the spawn cell from different generators, and the rest of the reward depends on it
+        if batch.ghost_hits[0] > hits_before:
+            assert env.ghost_hits == 1
+            break
+        assert reward == pytest.approx(rewards[0]), f"step {step}"
+        if terminated[0] or truncated[0]:
+            break
+    assert step >= 50  # Long enough for the ghosts to have moved
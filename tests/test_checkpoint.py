@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import random
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from agents.checkpoint import Checkpointer, load_checkpoint, write_checkpoint
+from agents.dyna_q import DynaQ
+from agents.prioritized_sweeping import PrioritizedSweeping
+from agents.q_lambda import WatkinsQLambda
+from agents.q_learning import QLearning
+from agents.sarsa import SARSA
+from agents.sarsa_lambda import SARSALambda
+from game.environment import PacmanEnv
+
+AGENT_CLASSES = [QLearning, SARSA, WatkinsQLambda, SARSALambda, DynaQ, PrioritizedSweeping]
+EPISODES = 6
+
+
+def make_agent(agent_class):
+    env = PacmanEnv(n_pellets=8, n_ghosts=2, max_steps=200, mode='Training', seed=3, render_mode=None,
+                    obs_mode='id')
+    env.action_space.seed(3)
+    random.seed(3)
+    return agent_class(env, epsilon_decay=0.9)
+
+
+def train(agent, num_episodes, **kwargs):
+    rewards = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent.train(num_episodes=num_episodes, progress=lambda episode, epsilon, reward, sps: rewards.append(reward),
+                    **kwargs)
+    return rewards
+
+
+def save_checkpoint(agent, filename, num_episodes):
+    with Checkpointer(str(filename), every_episodes=num_episodes) as checkpoint:
+        train(agent, num_episodes, checkpoint=checkpoint)
+
+
+@pytest.mark.parametrize('agent_class', AGENT_CLASSES, ids=lambda agent_class: agent_class.__name__)
+def test_resume_matches_uninterrupted_training(tmp_path, agent_class):
+    straight = make_agent(agent_class)
+    straight_rewards = train(straight, EPISODES)
+
+    save_checkpoint(make_agent(agent_class), tmp_path / 'checkpoint.pkl', EPISODES // 2)
+    # A fresh process would start from other random states; resuming must not depend on them
+    random.seed(99)
+    resumed = make_agent(agent_class)
+    resumed_rewards = train(resumed, EPISODES, resume=str(tmp_path / 'checkpoint.pkl'))
+
+    assert resumed_rewards == straight_rewards[EPISODES // 2:]
+    assert resumed.epsilon == straight.epsilon
+    assert np.array_equal(resumed.q_table.values, straight.q_table.values)
+    assert np.array_equal(resumed.q_table.seen, straight.q_table.seen)
+
+
+def test_resume_refuses_other_algorithm(tmp_path):
+    save_checkpoint(make_agent(QLearning), tmp_path / 'checkpoint.pkl', 1)
+
+    with pytest.raises(ValueError, match='QLearning'):
+        train(make_agent(SARSA), 2, resume=str(tmp_path / 'checkpoint.pkl'))
+
+
+def test_resume_refuses_other_state_encoding(tmp_path):
+    save_checkpoint(make_agent(QLearning), tmp_path / 'checkpoint.pkl', 1)
+    # As saved on a larger grid, whose cells are numbered differently
+    state = load_checkpoint(tmp_path / 'checkpoint.pkl')
+    state['state_encoding'] = {**state['state_encoding'], 'width': 32, 'height': 32}
+    write_checkpoint(state, tmp_path / 'checkpoint.pkl')
+
+    with pytest.raises(ValueError, match='states'):
+        train(make_agent(QLearning), 2, resume=str(tmp_path / 'checkpoint.pkl'))
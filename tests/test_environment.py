@@ -0,0 +1,44 @@
+import os
+import pickle
+from pathlib import Path
+
+import gymnasium
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game import ENV_ID
+from game.environment import PacmanEnv
+
+REPOSITORY = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    # The sprites are loaded from paths relative to the repository root
+    monkeypatch.chdir(REPOSITORY)
+
+
+def test_pickle_after_render():
+    env = PacmanEnv(mode='Testing', seed=1, render_mode='rgb_array')
+    env.reset()
+    frame = env.render()
+
+    copy = pickle.loads(pickle.dumps(env))
+
+    assert np.array_equal(copy.render(), frame)
+    state, _, _, _, _ = copy.step(0)
+    assert state is not None
+
+
+@pytest.mark.parametrize('obs_mode', ['id', 'state'])
+def test_observations_in_observation_space(obs_mode):
+    env = gymnasium.make(ENV_ID, obs_mode=obs_mode)
+    state, _ = env.reset(seed=1)
+    for _ in range(50):
+        assert state in env.observation_space
+        state, _, terminated, truncated, _ = env.step(env.action_space.sample())
+        if terminated or truncated:
+            state, _ = env.reset()
@@ -0,0 +1,58 @@
+import os
+from collections import deque
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game.environment import PacmanEnv
+
+
+def distances(grid, source, target_type):
+    """
+    BFS distances from source to every object of target_type in the minigrid grid.
+    """
+    found = []
+    queue = deque([(source, 0)])
+    visited = {source}
+    while queue:
+        (x, y), distance = queue.popleft()
+        for dx, dy in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+            pos = (x + dx, y + dy)
+            if pos in visited or not (0 <= pos[0] < grid.width and 0 <= pos[1] < grid.height):
+                continue
+            cell = grid.get(*pos)
+            if cell is not None and cell.type == 'wall':
+                continue
+            visited.add(pos)
+            if cell is not None and cell.type == target_type:
+                found.append(distance + 1)
+            else:
+                queue.append((pos, distance + 1))
+    return found
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_fields_match_bfs(seed):
+    env = PacmanEnv(n_ghosts=12, n_pellets=80, mode='Training', seed=seed, render_mode=None, obs_mode='id')
+    env.reset(seed=seed)
+    rng = np.random.default_rng(seed)
+    ties = {'goal': 0, 'lava': 0}
+
+    for _ in range(300):
+        grid = env.grid  # Synced with the board
+        agent_pos = tuple(env.agent_pos)
+        assert env._nearest_pellet() == env.bfs_nearest_object(agent_pos, grid, 'goal')
+        assert env._nearest_ghost() == env.bfs_nearest_object(agent_pos, grid, 'lava')
+        for target_type in ties:
+            found = distances(grid, agent_pos, target_type)
+            ties[target_type] += bool(found) and found.count(min(found)) > 1
+
+        _, _, terminated, truncated, _ = env.step(int(rng.integers(3)))
+        if terminated or truncated:
+            env.reset()
+
+    # The nearest object is often one of several at the same distance; BFS order decides which
+    assert ties['goal'] > 0 and ties['lava'] > 0
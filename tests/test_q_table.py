@@ -0,0 +1,164 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from agents.q_learning import QLearning
+from agents.q_table import (DenseQTable, DictQTable, as_q_table, read_q_table, read_q_table_header,
+                             write_q_table)
+from game.environment import PacmanEnv
+
+
+def legacy_pickle(path, env):
+    """
+    A Q-table as the first versions saved it: a plain dict pickle keyed by state_to_key of the minigrid image
+    observation.
+    """
+    state_key = QLearning(env).state_to_key(env.reset(seed=1)[0])
+    with open(path, 'wb') as f:
+        pickle.dump({state_key: {0: -1.0, 1: 2.0, 2: 0.5}}, f)
+    return state_key
+
+
+def test_legacy_pickle_loads_for_image_observations(tmp_path):
+    env = PacmanEnv(mode='Testing', seed=1, render_mode=None, obs_mode='image')
+    state_key = legacy_pickle(tmp_path / 'q_learning_solution.pkl', env)
+    agent = QLearning(env)
+
+    agent.load_q_table(tmp_path / 'q_learning_solution.pkl')
+
+    assert isinstance(agent.q_table, DictQTable)
+    assert agent.q_table.best_action(state_key) == 1
+
+
+def test_legacy_pickle_refused_for_state_ids(tmp_path):
+    legacy_pickle(tmp_path / 'q_learning_solution.pkl',
+                  PacmanEnv(mode='Testing', seed=1, render_mode=None, obs_mode='image'))
+    agent = QLearning(PacmanEnv(mode='Testing', seed=1, render_mode=None, obs_mode='id'))
+
+    with pytest.raises(ValueError, match="obs_mode='image'"):
+        agent.load_q_table(tmp_path / 'q_learning_solution.pkl')
+
+
+def test_backends_agree_on_single_updates():
+    dense, sparse = DenseQTable(4, 3), DictQTable()
+    updates = [(0, 1, 1.0), (0, 2, 3.0), (2, 0, 2.0), (0, 1, 5.0), (3, 2, 0.5)]
+    for state_key, action, target in updates:
+        dense.update(state_key, action, target, 0.5)
+        sparse.update(state_key, action, target, 0.5)
+
+    for state_key in range(4):
+        assert dense.best_action(state_key) == sparse.best_action(state_key)
+        for action in range(3):
+            assert dense.value(state_key, action) == pytest.approx(sparse.get(state_key, {}).get(action, 0.0))
+    assert dense.max_value(0) == pytest.approx(sparse.max_value(0)) == 2.75
+    assert dense.best_action(1) is None and sparse.best_action(1) is None
+
+
+def test_untried_actions():
+    dense, sparse = DenseQTable(1, 3), DictQTable()
+    dense.update(0, 1, -4.0, 0.5)
+    sparse.update(0, 1, -4.0, 0.5)
+
+    # Untried actions keep their initial 0.0 in the dense table; the dict table has no value for them
+    assert dense.max_value(0) == 0.0
+    assert dense.best_action(0) == 0
+    assert sparse.max_value(0) == -2.0
+    assert sparse.best_action(0) == 1
+
+
+def test_update_batch_sums_repeated_pairs():
+    batched, sequential = DenseQTable(3, 2), DenseQTable(3, 2)
+    state_keys, actions, targets = np.array([0, 1, 0, 0]), np.array([1, 0, 1, 0]), np.array([2.0, -1.0, 4.0, 1.0])
+
+    batched.update_batch(state_keys, actions, targets, 0.5)
+    # Every error is computed from the values before the batch
+    for state_key, action, target in zip(state_keys, actions, targets):
+        sequential.add(int(state_key), int(action), 0.5 * (target - 0.0))
+
+    assert np.array_equal(batched.values, sequential.values)
+    assert batched.value(0, 1) == 3.0
+    assert np.array_equal(batched.seen, [True, True, False])
+
+
+def test_seen_mask():
+    table = DenseQTable(5, 2)
+    assert len(table) == 0 and 3 not in table
+
+    table.update(3, 1, 0.0, 0.1)  # An update that leaves the value at 0.0 still marks the state seen
+    table.add(1, 0, 2.0)
+
+    assert 3 in table and 1 in table and 0 not in table
+    assert len(table) == 2
+    assert table.best_action(3) == 0
+    assert table.best_action(0) is None
+
+
+def test_old_dict_pickle_wrapped(tmp_path):
+    with open(tmp_path / 'old.pkl', 'wb') as f:
+        pickle.dump({'a': {0: 1.0, 2: 3.0}}, f)
+
+    with open(tmp_path / 'old.pkl', 'rb') as f:
+        table = as_q_table(pickle.load(f))
+
+    assert isinstance(table, DictQTable)
+    assert table.best_action('a') == 2
+    assert as_q_table(table) is table
+
+
+def dense_table():
+    table = DenseQTable(6, 3)
+    table.update(1, 2, 4.0, 1.0)
+    table.update(4, 0, -1.5, 1.0)
+    return table
+
+
+def test_qtable_round_trip(tmp_path):
+    table = dense_table()
+    write_q_table(table, tmp_path / 't.qtable', state_encoding='ghosts=2')
+
+    header = read_q_table_header(tmp_path / 't.qtable')
+    loaded = read_q_table(tmp_path / 't.qtable', state_encoding='ghosts=2')
+
+    assert header['n_states'] == 6 and header['n_actions'] == 3 and header['n_seen'] == 2
+    assert header['state_encoding'] == 'ghosts=2'
+    assert header['values_offset'] % 64 == 0 and header['ids_offset'] % 64 == 0
+    assert np.array_equal(loaded.values, table.values)
+    assert np.array_equal(loaded.seen, table.seen)
+    assert loaded.best_action(1) == 2
+
+
+def test_qtable_copy_on_write(tmp_path):
+    write_q_table(dense_table(), tmp_path / 't.qtable')
+    contents = (tmp_path / 't.qtable').read_bytes()
+
+    loaded = read_q_table(tmp_path / 't.qtable')
+    loaded.update(0, 0, 10.0, 1.0)
+    loaded.update_batch(np.array([1]), np.array([2]), np.array([-3.0]), 1.0)
+    loaded.values.flush()
+
+    assert loaded.value(0, 0) == 10.0
+    assert (tmp_path / 't.qtable').read_bytes() == contents
+    assert read_q_table(tmp_path / 't.qtable').value(0, 0) == 0.0
+
+
+def test_qtable_state_encoding_mismatch(tmp_path):
+    write_q_table(dense_table(), tmp_path / 't.qtable', state_encoding='ghosts=2')
+
+    with pytest.raises(ValueError):
+        read_q_table(tmp_path / 't.qtable', state_encoding='ghosts=3')
+
+
+def test_files_without_magic_read_as_pickles(tmp_path):
+    table = DictQTable({'a': {1: 2.0}})
+    (tmp_path / 't.pkl').write_bytes(pickle.dumps(table))
+    # Another version of the format is not mistaken for this one
+    (tmp_path / 't.qtable').write_bytes(b'PACQTAB\x02' + bytes(64))
+
+    assert read_q_table_header(tmp_path / 't.pkl') is None
+    assert read_q_table_header(tmp_path / 't.qtable') is None
+    assert read_q_table(tmp_path / 't.pkl') == table
@@ -0,0 +1,66 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game.environment import PacmanEnv
+from game.recorder import FrameRecorder
+
+REPOSITORY = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    # The sprites are loaded from paths relative to the repository root
+    monkeypatch.chdir(REPOSITORY)
+
+
+def play(env, episodes):
+    """
+    Play episodes with random actions and return the number of steps of each.
+    """
+    steps = []
+    for _ in range(episodes):
+        env.reset()
+        done = False
+        steps.append(0)
+        while not done:
+            _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+            done = terminated or truncated
+            steps[-1] += 1
+    return steps
+
+
+@pytest.mark.parametrize('fmt', ['npz', 'png'])
+def test_records_selected_episodes(tmp_path, fmt):
+    recorder = FrameRecorder(tmp_path, fmt=fmt, episodes=[2, 3], block=True)
+    env = PacmanEnv(mode='Training', seed=1, max_steps=6, render_mode=None, obs_mode='id', recorder=recorder)
+
+    steps = play(env, 4)
+    recorder.close()
+
+    # One file per recorded episode, with the reset frame and one frame per step
+    if fmt == 'npz':
+        assert sorted(os.listdir(tmp_path)) == ['episode_00002.npz', 'episode_00003.npz']
+        frames = [len(np.load(tmp_path / f"episode_0000{episode}.npz").files) for episode in (2, 3)]
+    else:
+        assert sorted(os.listdir(tmp_path)) == ['episode_00002', 'episode_00003']
+        frames = [len(os.listdir(tmp_path / f"episode_0000{episode}")) for episode in (2, 3)]
+    assert frames == [steps[1] + 1, steps[2] + 1]
+    assert recorder.written_frames == sum(frames)
+    assert recorder.dropped_frames == 0
+
+
+def test_no_file_for_episode_without_frames(tmp_path):
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    with FrameRecorder(tmp_path, fmt='npz', block=True) as recorder:
+        recorder.start_episode(1)
+        recorder.start_episode(2)
+        recorder.capture(frame)
+
+    assert os.listdir(tmp_path) == ['episode_00002.npz']
+    assert np.array_equal(np.load(tmp_path / 'episode_00002.npz')['frame_00000'], frame)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from agents.replay_buffer import ReplayBuffer
+
+
+def test_ring_wraps_at_capacity():
+    buffer = ReplayBuffer(3)
+    for i in range(5):
+        buffer.add(i, i % 2, float(i), i + 1)
+
+    # Transitions 3 and 4 overwrote the two oldest, 0 and 1
+    assert len(buffer) == 3
+    assert buffer.position == 2
+    assert buffer.states.tolist() == [3, 4, 2]
+    assert buffer.next_states.tolist() == [4, 5, 3]
+    assert buffer.rewards.tolist() == [3.0, 4.0, 2.0]
+
+
+def test_sample_draws_only_filled_slots():
+    buffer = ReplayBuffer(100)
+    for i in range(3):
+        buffer.add(i + 1, 0, -1.0, i + 2)
+
+    states, actions, rewards, next_states = buffer.sample(500, np.random.default_rng(0))
+
+    # The empty slots hold zeros; none of them is ever drawn
+    assert set(states.tolist()) == {1, 2, 3}
+    assert np.array_equal(next_states, states + 1)
+    assert np.all(rewards == -1.0)
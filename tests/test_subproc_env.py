@@ -0,0 +1,54 @@
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game.subproc_env import SubprocPacmanEnv
+
+
+def test_step():
+    with SubprocPacmanEnv(2, seed=1) as env:
+        states, _ = env.reset()
+        states, rewards, terminated, truncated, info = env.step([2, 0])
+
+    assert states.shape == rewards.shape == terminated.shape == (2,)
+    assert np.array_equal(info['episode_reward'], rewards)
+
+
+def test_worker_exception_raised_with_traceback():
+    # The maze needs a 24x24 grid, so building the environment fails in the worker
+    env = SubprocPacmanEnv(2, env_kwargs={'grid_size': 10}, seed=1)
+
+    with pytest.raises(RuntimeError, match='(?s)Worker 0 failed.*Traceback.*IndexError'):
+        env.reset()
+    assert env.closed
+
+
+def test_killed_worker_raises():
+    env = SubprocPacmanEnv(2, seed=1)
+    env.reset()
+    env._processes[1].kill()
+    env._processes[1].join()
+
+    with pytest.raises(RuntimeError, match='Worker 1 died'):
+        env.step([2, 2])
+    assert env.closed
+    assert not any(process.is_alive() for process in env._processes)
+
+
+def test_close_twice_releases_shared_memory():
+    env = SubprocPacmanEnv(2, seed=1)
+    env.reset()
+    name = env._shm.name
+
+    env.close()
+    env.close()
+
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+    with pytest.raises(RuntimeError, match='closed'):
+        env.reset()
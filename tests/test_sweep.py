@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from game.settings import DEFAULT_SETTINGS
+from pacmanrl.sweep import ResultsTable, configurations, successive_halving
+
+# As the sweep command builds them; many ghosts end the episodes quickly
+BASE_SETTINGS = {**DEFAULT_SETTINGS, 'algorithm': 'Q-Learning', 'n_ghosts': 8, 'n_pellets': 10}
+GRID = {'learning_rate': [0.1, 0.5], 'discount_factor': [0.5, 0.9]}
+
+
+def sweep(directory, grid=GRID, resume=False):
+    with ResultsTable(os.path.join(directory, f"results{'_resumed' if resume else ''}.jsonl")) as table:
+        trials = successive_halving(BASE_SETTINGS, configurations(grid), directory, table, rung_episodes=2,
+                                    max_episodes=4, kill_fraction=0.5, workers=1, window=2, resume=resume,
+                                    log=lambda line: None)
+    return trials
+
+
+@pytest.fixture(scope='module')
+def finished_sweep(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('sweep'))
+    return directory, sweep(directory)
+
+
+def test_bottom_share_stopped(finished_sweep):
+    directory, trials = finished_sweep
+    with open(os.path.join(directory, 'results.jsonl')) as f:
+        rows = [json.loads(line) for line in f]
+
+    assert [trial['status'] for trial in trials] == ['finished', 'finished', 'stopped', 'stopped']
+    assert [trial['episodes'] for trial in trials] == [4, 4, 2, 2]
+    first_rung = {row['trial']: row for row in rows if row['rung'] == 1}
+    promoted = sorted(first_rung.values(), key=lambda row: row['score'], reverse=True)[:2]
+    assert {row['trial'] for row in promoted} == {trial['trial'] for trial in trials[:2]}
+    assert {row['trial'] for row in rows if row['rung'] == 2} == {trial['trial'] for trial in trials[:2]}
+    assert all(os.path.exists(trial['model']) for trial in trials)
+
+
+def test_rerun_into_same_directory_refused(finished_sweep):
+    directory, _ = finished_sweep
+
+    with pytest.raises(FileExistsError):
+        sweep(directory)
+
+
+def test_resume_with_other_grid_refused(finished_sweep):
+    directory, _ = finished_sweep
+
+    with pytest.raises(ValueError, match='another grid'):
+        sweep(directory, grid={'learning_rate': [0.3, 0.5], 'discount_factor': [0.5, 0.9]}, resume=True)
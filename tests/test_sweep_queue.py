@@ -0,0 +1,45 @@
+import pytest
+
+from agents.sweep_queue import SweepQueue
+
+
+def test_raised_priority_leaves_stale_entry():
+    queue = SweepQueue()
+    queue.push('a', 1.0)
+    queue.push('b', 2.0)
+    queue.push('a', 3.0)
+    queue.push('b', 0.5)  # Lower than its pending priority: ignored
+
+    assert len(queue) == 2
+    assert len(queue.heap) == 3
+    assert queue.pop() == ('a', 3.0)
+    assert queue.pop() == ('b', 2.0)
+    # Only the stale entry of 'a' is left, and pop skips it
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_rebuild_keeps_highest_priorities():
+    queue = SweepQueue(max_size=2)
+    for priority, pair in enumerate('abcd', start=1):
+        queue.push(pair, float(priority))
+    assert len(queue.heap) == 4
+
+    queue.push('e', 5.0)  # The heap passes 2 * max_size
+
+    assert len(queue.heap) == 2
+    assert queue.dropped == 3
+    assert queue.pop() == ('e', 5.0)
+    assert queue.pop() == ('d', 4.0)
+    assert len(queue) == 0
+
+
+def test_rebuild_drops_stale_entries():
+    queue = SweepQueue(max_size=2)
+    for priority in (1.0, 2.0, 3.0, 4.0):
+        queue.push('a', priority)
+    queue.push('b', 1.0)
+
+    # Four of the five entries belonged to 'a'; only its live one survives, so nothing pending is dropped
+    assert sorted(queue.heap) == [(-4.0, 'a'), (-1.0, 'b')]
+    assert queue.dropped == 0
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import os
+import random
+
+import numpy as np
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from agents.q_lambda import WatkinsQLambda
+from agents.q_learning import QLearning
+from agents.q_table import DenseQTable
+from agents.sarsa import SARSA
+from agents.sarsa_lambda import SARSALambda
+from agents.traces import EligibilityTraces
+from game.environment import PacmanEnv
+
+
+def test_visit_replaces_trace():
+    traces = EligibilityTraces(0.5)
+    traces.visit(0, 1)
+    traces.update(DenseQTable(2, 2), 0.0)
+    traces.visit(0, 1)
+
+    # Revisiting a pair sets its trace back to 1 instead of adding to it
+    assert traces.traces == {(0, 1): 1.0}
+
+
+def test_update_applies_step_and_decays():
+    table = DenseQTable(3, 2)
+    traces = EligibilityTraces(0.5)
+    traces.visit(0, 0)
+    traces.update(table, 2.0)
+    traces.visit(1, 1)
+    traces.update(table, 4.0)
+
+    assert table.value(0, 0) == 2.0 + 0.5 * 4.0
+    assert table.value(1, 1) == 4.0
+    assert traces.traces == {(0, 0): 0.25, (1, 1): 0.5}
+
+
+def test_traces_below_cutoff_dropped():
+    traces = EligibilityTraces(0.5, cutoff=0.2)
+    table = DenseQTable(1, 1)
+    traces.visit(0, 0)
+    for _ in range(2):
+        traces.update(table, 0.0)
+    assert traces.traces == {(0, 0): 0.25}
+
+    traces.update(table, 0.0)
+
+    assert len(traces) == 0
+    assert traces.max_length() == 3
+
+
+def test_watkins_cut_after_non_greedy_action():
+    agent = WatkinsQLambda(PacmanEnv(mode='Training', seed=1, render_mode=None, obs_mode='id'), lam=0.9)
+    agent.q_table.update(0, 1, 1.0, 1.0)  # Action 1 is greedy in state 0
+
+    agent._learn(5, 0, 0.0, 0)
+    agent._learn(0, 1, 0.0, 6)
+    assert set(agent.traces.traces) == {(5, 0), (0, 1)}
+
+    agent._learn(0, 2, 0.0, 7)
+
+    assert set(agent.traces.traces) == {(0, 2)}
+
+
+def train(agent_class, **options):
+    env = PacmanEnv(n_pellets=8, n_ghosts=2, max_steps=200, mode='Training', seed=3, render_mode=None, obs_mode='id')
+    env.action_space.seed(3)
+    random.seed(3)
+    agent = agent_class(env, epsilon_decay=0.9, **options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent.train(num_episodes=5)
+    return agent.q_table
+
+
+@pytest.mark.parametrize('trace_class, one_step_class', [(WatkinsQLambda, QLearning), (SARSALambda, SARSA)],
+                         ids=['Q(lambda)', 'SARSA(lambda)'])
+def test_lam_zero_learns_as_one_step(trace_class, one_step_class):
+    traced = train(trace_class, lam=0)
+    one_step = train(one_step_class)
+
+    assert np.array_equal(traced.values, one_step.values)
+    assert np.array_equal(traced.seen, one_step.seen)